@@ -0,0 +1,186 @@
+# =====================================================
+# VISÕES CONSOLIDADAS (MAPAS DE CALOR)
+# =====================================================
+# Quadros linha × período (área, supervisor, cliente por dia ou semana)
+# calculados com groupby sobre o df inteiro: dezenas de milhares de
+# atividades viram algumas centenas de células, desenhadas como um único
+# go.Heatmap em vez de uma barra por atividade. A ocupação por área (quantas
+# atividades em execução por dia) sai do índice de intervalos.
+import numpy as np
+import pandas as pd
+
+from intervalos import IndiceIntervalos, faixa_continua
+
+GRANULARIDADES = {"Semana": 'W', "Dia": 'D'}
+
+
+def _periodo(datas, freq):
+    # Início do período (dia, ou a segunda-feira da semana) de cada data
+    if freq == 'D':
+        return datas.dt.normalize()
+    return datas.dt.to_period(freq).dt.start_time
+
+
+def _agrupar_colunas(quadro, freq, agregar='sum'):
+    # Quadro diário -> períodos de `freq` (somando, por padrão)
+    if freq == 'D' or quadro.empty:
+        return quadro
+    periodos = quadro.columns.to_period(freq).start_time
+    return quadro.T.groupby(periodos).agg(agregar).T
+
+
+def carga_por_area(df, freq='W'):
+    """Carga (soma de LT OPERAÇÃO) por área (linhas) e período (colunas).
+
+    A carga de cada atividade é dividida igualmente entre os dias de DT INICIO
+    a DT FIM: uma atividade de duas semanas conta metade em cada uma.
+    """
+    inicio = df['DT INICIO'].dt.normalize()
+    fim = df['DT FIM'].dt.normalize()
+    lt = df['LT OPERAÇÃO'].astype('float64')
+    validas = (
+        inicio.notna() & fim.notna() & lt.notna() & df['PROG.'].notna()
+    ).to_numpy()
+    if not validas.any():
+        return pd.DataFrame()
+
+    codigos, areas = pd.factorize(df['PROG.'][validas], sort=True)
+    inicio = inicio[validas].to_numpy(dtype='datetime64[D]')
+    fim = np.maximum(fim[validas].to_numpy(dtype='datetime64[D]'), inicio)
+    lt = lt[validas].to_numpy()
+
+    taxa = lt / ((fim - inicio).astype(np.int64) + 1)
+
+    # Grade de dias da faixa contínua (sem os anos de um DT FIM digitado
+    # errado); a carga fora dela não entra no quadro
+    primeiro, ultimo = faixa_continua(inicio, fim)
+    d0 = primeiro.to_datetime64().astype('datetime64[D]')
+    n_dias = (ultimo - primeiro).days + 1
+    ini = np.clip((inicio - d0).astype(np.int64), 0, n_dias)
+    fi = np.clip((fim - d0).astype(np.int64), -1, n_dias - 1)
+    dentro = ini <= fi
+
+    # Vetor de diferenças por área: +taxa no primeiro dia, -taxa no dia
+    # seguinte ao último; a soma acumulada dá a carga de cada dia
+    delta = np.zeros((len(areas), n_dias + 1))
+    np.add.at(delta, (codigos[dentro], ini[dentro]), taxa[dentro])
+    np.add.at(delta, (codigos[dentro], fi[dentro] + 1), -taxa[dentro])
+    diaria = np.cumsum(delta[:, :-1], axis=1)
+
+    quadro = pd.DataFrame(
+        diaria,
+        index=pd.Index(np.asarray(areas), name='PROG.'),
+        columns=pd.date_range(pd.Timestamp(d0), periods=n_dias, freq='D')
+    )
+    return _agrupar_colunas(quadro, freq)
+
+
+def atrasadas_por_supervisor(df, freq='W'):
+    """Nº de atividades atrasadas por supervisor e período do DT FIM.
+
+    Precisa da coluna STATUS (definir_status).
+    """
+    atrasadas = df[(df['STATUS'] == 'Atrasado').to_numpy()]
+    atrasadas = atrasadas.dropna(subset=['SUPERVISÃO', 'DT FIM'])
+    if atrasadas.empty:
+        return pd.DataFrame()
+    return (
+        atrasadas
+        .groupby(
+            [atrasadas['SUPERVISÃO'], _periodo(atrasadas['DT FIM'], freq)],
+            observed=True
+        )
+        .size()
+        .unstack(fill_value=0)
+    )
+
+
+def progresso_por_cliente(df, freq='W'):
+    """% concluído médio por cliente e período do DT FIM.
+
+    Períodos sem atividades do cliente ficam vazios (NaN), não zero.
+    """
+    validas = df.dropna(subset=['CLIENTE', 'DT FIM'])
+    if validas.empty:
+        return pd.DataFrame()
+    return (
+        validas['% CONCLUÍDO']
+        .astype('float64')
+        .groupby(
+            [validas['CLIENTE'], _periodo(validas['DT FIM'], freq)],
+            observed=True
+        )
+        .mean()
+        .unstack()
+    )
+
+
+def simultaneas_por_area(df, freq='W', indice=None):
+    """Nº de atividades em execução por área e dia (pico do período).
+
+    `indice` é o IndiceIntervalos do df, se já houver um montado.
+    """
+    if indice is None:
+        indice = IndiceIntervalos(df)
+    return _agrupar_colunas(indice.simultaneas_por_dia(df['PROG.']), freq, 'max')
+
+
+def capacidade_sugerida(quadro, percentil=90):
+    """Capacidade inicial do alerta de sobrecarga (atividades simultâneas).
+
+    É o `percentil` das células não vazias do quadro de simultâneas.
+    """
+    valores = quadro.to_numpy()
+    valores = valores[valores > 0]
+    if not len(valores):
+        return 1
+    return max(int(np.percentile(valores, percentil)), 1)
+
+
+def sobrecarga(quadro, capacidade):
+    """Células do quadro de simultâneas acima da `capacidade`.
+
+    Retorna uma linha por (área, período) sobrecarregado, do maior excesso
+    para o menor.
+    """
+    if quadro.empty:
+        return pd.DataFrame(columns=['ÁREA', 'PERÍODO', 'ATIVAS', 'EXCESSO'])
+    longo = quadro.stack()
+    longo = longo[longo > capacidade]
+    tabela = pd.DataFrame({
+        'ÁREA': longo.index.get_level_values(0).astype(str),
+        'PERÍODO': longo.index.get_level_values(1),
+        'ATIVAS': longo.to_numpy(),
+        'EXCESSO': longo.to_numpy() - capacidade,
+    })
+    return tabela.sort_values(
+        ['EXCESSO', 'PERÍODO'], ascending=[False, True], ignore_index=True
+    )
+
+
+def figura_mapa_calor(quadro, titulo, escala='Blues', formato='.1f',
+                      unidade=''):
+    """Mapa de calor de um quadro linha × período (colunas datas)."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(
+        z=quadro.to_numpy(dtype=float),
+        x=quadro.columns,
+        y=quadro.index.astype(str),
+        colorscale=escala,
+        xgap=1,
+        ygap=1,
+        hovertemplate=(
+            "<b>%{y}</b><br>%{x|%d/%m/%Y}: %{z:" + formato + "}" +
+            unidade + "<extra></extra>"
+        )
+    ))
+    fig.update_layout(
+        title=dict(text=titulo, font=dict(size=14)),
+        xaxis=dict(type='date', side='top', tickformat='%d/%m', showgrid=False),
+        yaxis=dict(autorange='reversed', showgrid=False),
+        height=int(np.clip(len(quadro) * 24 + 120, 250, 900)),
+        margin=dict(l=200, r=40, t=80, b=20),
+        plot_bgcolor='white'
+    )
+    return fig
@@ -0,0 +1,318 @@
+# =====================================================
+# BENCHMARK DOS PAINÉIS
+# =====================================================
+# Gera planilhas sintéticas no layout real da aba "Programação Detalhada"
+# (cabeçalho na linha 7) e mede cada etapa dos dois painéis em separado:
+# leitura do Excel, normalização, % concluído/status, filtros, montagem da
+# figura, serialização em JSON e visões consolidadas. O resultado vai para
+# um arquivo JSON, para comparar versões.
+#
+# Exemplos:
+#   python benchmark.py
+#   python benchmark.py --linhas 1000 10000 --repeticoes 5
+#   python benchmark.py --saida benchmarks/antes.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import agregacoes
+import exportacao
+import historico
+import leitura
+import painel
+import risco
+from filtros import IndiceFiltros
+from intervalos import IndiceIntervalos
+
+PASTA_PLANILHAS = os.path.join(tempfile.gettempdir(), 'programacao_benchmark')
+
+AREAS = [
+    'CALDEIRARIA', 'USINAGEM', 'MONTAGEM', 'PINTURA', 'SOLDA',
+    'JATEAMENTO', 'ELÉTRICA', 'INSPEÇÃO', 'EXPEDIÇÃO', 'HIDRÁULICA',
+]
+SUPERVISORES = ['ANA', 'BRUNO', 'CARLA', 'DIEGO', 'ELISA', 'FÁBIO']
+CLIENTES = ['VALE', 'PETROBRAS', 'CSN', 'GERDAU', 'USIMINAS', 'SAMARCO',
+            'ARCELOR', 'SUZANO']
+
+# Cabeçalho como vem da planilha real (com quebra de linha e colunas que
+# os painéis não usam)
+CABECALHO = [
+    'OS', 'WK', 'PROG.', 'SUPERVISÃO', 'CLIENTE',
+    'PROGRAMAÇÃO |\nPROG. DETALHADA',
+    'DT INICIO', 'DT FIM', 'DATA CONTRATUAL',
+    'ATUALIZAÇÃO', 'LT OPERAÇÃO', '% CONCLUÍDO',
+    'RESPONSÁVEL', 'OBSERVAÇÃO', 'DESENHO', 'MATERIAL',
+]
+
+
+def gerar_planilha(n, caminho, semente=0, hoje=None):
+    """Grava uma planilha sintética com `n` atividades em `caminho`."""
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(semente)
+    hoje = (hoje or pd.Timestamp.today()).normalize()
+
+    n_os = max(n // 15, 1)
+    os_num = rng.integers(100000, 100000 + n_os * 3, n)
+    inicio = hoje + pd.to_timedelta(rng.integers(-120, 120, n), unit='D')
+    duracao = rng.integers(0, 25, n)
+    fim = inicio + pd.to_timedelta(duracao, unit='D')
+    contratual = fim + pd.to_timedelta(rng.integers(-10, 40, n), unit='D')
+    lt = rng.choice([0, 2, 4, 8, 16, 24, 40], n).astype(float)
+    atualizacao = np.round(lt * rng.random(n), 1)
+    pct = rng.choice([np.nan, 0, 0.25, 0.5, 0.75, 1.0], n)
+    wk = [f"WK{s:02d}" for s in (inicio.isocalendar().week.to_numpy())]
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Programação Detalhada")
+    ws.append(["PROGRAMAÇÃO DETALHADA - OFICINA"])
+    ws.append([f"Gerada em {hoje:%d/%m/%Y}"])
+    for _ in range(4):
+        ws.append([])
+    ws.append(CABECALHO)
+
+    areas = rng.choice(AREAS, n)
+    sups = rng.choice(SUPERVISORES, n)
+    clis = rng.choice(CLIENTES, n)
+    sem_data = rng.random(n) < 0.03
+    for i in range(n):
+        ws.append([
+            float(os_num[i]), wk[i], areas[i], sups[i], clis[i],
+            f"{areas[i].title()} - etapa {i % 37} da peça {os_num[i]}-{i % 11:02d}",
+            None if sem_data[i] else inicio[i].to_pydatetime(),
+            None if sem_data[i] else fim[i].to_pydatetime(),
+            contratual[i].to_pydatetime(),
+            float(atualizacao[i]), float(lt[i]),
+            None if np.isnan(pct[i]) else float(pct[i] * 100),
+            sups[i].title(), "", f"DES-{i:06d}", "AÇO",
+        ])
+    wb.save(caminho)
+    return caminho
+
+
+def _planilha(n, semente):
+    os.makedirs(PASTA_PLANILHAS, exist_ok=True)
+    caminho = os.path.join(PASTA_PLANILHAS, f"programacao_{n}_{semente}.xlsx")
+    if not os.path.exists(caminho):
+        gerar_planilha(n, caminho, semente)
+    return caminho
+
+
+def _medir(func, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - t)
+    return min(tempos), resultado
+
+
+def medir_painel(conteudo, app, repeticoes):
+    """Tempos (s) de cada etapa de um dos painéis para uma planilha."""
+    r = {}
+    engine = leitura.engine_excel()
+    hoje = pd.Timestamp.today().normalize()
+
+    r['validacao'], _ = _medir(lambda: leitura.validar_planilha(conteudo), repeticoes)
+
+    # Caminho do painel com a barra de progresso: prévia das primeiras linhas
+    # só quando compensa (leitura.mostra_previa) e depois a aba inteira
+    def carga_com_blocos():
+        inicio = time.perf_counter()
+        primeiro = []
+
+        def ao_ler_bloco(bloco, lidas):
+            if not primeiro:
+                primeiro.append(time.perf_counter() - inicio)
+        leitura.ler_programacao(conteudo, usar_sidecar=False, ao_ler_bloco=ao_ler_bloco)
+        return primeiro[0] if primeiro else None
+    r['carga_com_blocos'], primeiro_bloco = _medir(carga_com_blocos, repeticoes)
+    if primeiro_bloco is not None:
+        r['primeiro_bloco'] = primeiro_bloco
+
+    r['read_excel'], bruto = _medir(
+        lambda: leitura._ler_excel(conteudo, engine), 1
+    )
+    r['normalizacao'], df = _medir(
+        lambda: painel.preparar_planilha(bruto.copy()), repeticoes
+    )
+
+    def derivar():
+        d = painel.derivar_colunas(df.copy())
+        d['STATUS'] = painel.definir_status(d, hoje)
+        return d
+    r['percentual_status'], df = _medir(derivar, repeticoes)
+    memoria_bruta = painel.memoria_mb(df)
+    r['compactacao'], df = _medir(
+        lambda: painel.compactar(df.copy()), repeticoes
+    )
+
+    colunas = list(painel.FILTROS) if app == 'oficina' else ['OS', 'PROG.', 'CLIENTE']
+    r['indice_filtros'], indice = _medir(
+        lambda: IndiceFiltros(df, colunas), repeticoes
+    )
+    selecoes = {'PROG.': indice.valores['PROG.'][:3]}
+    r['filtragem'], df_filtrado = _medir(
+        lambda: indice.filtrar(df, selecoes), repeticoes
+    )
+
+    # Rótulos e hovers formatados uma vez por planilha; a figura só recorta
+    r['textos_gantt'], textos = _medir(lambda: painel.textos_gantt(df), repeticoes)
+
+    def com_textos(d):
+        return d.assign(**textos.reindex(d.index))
+
+    if app == 'oficina':
+        inicio_view, fim_view = painel.janela(hoje, 30)
+
+        def figura():
+            linhas = IndiceIntervalos(df).sobrepoe(inicio_view, fim_view)
+            linhas_filtro = indice.linhas(selecoes)
+            linhas = np.intersect1d(linhas, linhas_filtro, assume_unique=True)
+            df_gantt, rotulos = painel.preparar_gantt(
+                com_textos(df.iloc[linhas]), True
+            )
+            color_map = painel.mapa_cores(df_gantt['PROG.'].unique())
+            rotulos = rotulos[:60]
+            df_gantt = df_gantt[df_gantt['Y_LABEL'].isin(rotulos)]
+            return painel.figura_gantt(
+                df_gantt, rotulos, color_map, True, hoje,
+                faixa_x=(inicio_view, fim_view)
+            )
+    else:
+        def figura():
+            df_gantt = com_textos(df_filtrado.dropna(subset=['DT INICIO', 'DT FIM']))
+            return painel.figura_gantt_powerbi(df_gantt, True, True, hoje, 21)[0]
+
+    r['figura'], fig = _medir(figura, repeticoes)
+    r['figura_json'], spec = _medir(fig.to_json, repeticoes)
+
+    def agregar():
+        return [
+            f(df, 'W') for f in (
+                agregacoes.carga_por_area,
+                agregacoes.atrasadas_por_supervisor,
+                agregacoes.progresso_por_cliente,
+                agregacoes.simultaneas_por_area,
+            )
+        ]
+    r['agregacoes'], quadros = _medir(agregar, repeticoes)
+    r['risco'], (risco_os, _) = _medir(
+        lambda: risco.avaliar_risco(df, hoje), repeticoes
+    )
+    linhas_filtro = indice.linhas(selecoes)
+    for formato in exportacao.FORMATOS:
+        r[f'exportacao_{formato}'], _ = _medir(
+            lambda: exportacao.exportar(df, linhas_filtro, formato), repeticoes
+        )
+
+    # Histórico: gravação do retrato (um dia novo a cada repetição) e a
+    # consulta de tendência, num banco temporário
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = os.path.join(pasta, 'historico.sqlite')
+        dias = iter(range(repeticoes))
+        r['historico_gravacao'], _ = _medir(
+            lambda: historico.gravar_snapshot(
+                df, 'benchmark', hoje - pd.Timedelta(days=7 * next(dias)), banco=banco
+            ),
+            repeticoes
+        )
+        r['historico_tendencia'], _ = _medir(
+            lambda: historico.tendencia(banco=banco), repeticoes
+        )
+        r['historico_tendencia_filtrada'], _ = _medir(
+            lambda: historico.tendencia(selecoes=selecoes, banco=banco), repeticoes
+        )
+
+    info = {
+        'linhas': len(df),
+        'linhas_filtradas': len(df_filtrado),
+        'memoria_mb': round(painel.memoria_mb(df), 2),
+        'memoria_sem_compactar_mb': round(memoria_bruta, 2),
+        'traces': len(fig.data),
+        'figura_json_bytes': len(spec),
+        'celulas_agregacoes': sum(q.size for q in quadros),
+        'os_atrasarao': int((risco_os['RISCO'] == "Atrasará").sum()),
+        'engine': engine,
+        'previa': leitura.mostra_previa(conteudo, engine),
+    }
+    return r, info
+
+
+def _versao_git():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos painéis.")
+    parser.add_argument('--linhas', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--apps', nargs='+', default=['oficina', 'powerbi'],
+                        choices=['oficina', 'powerbi'])
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help="repetições por etapa (vale o menor tempo)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=None,
+                        help="arquivo JSON (padrão: benchmarks/<data>_<commit>.json)")
+    args = parser.parse_args(argv)
+
+    # O plotly só é importado ao montar a primeira figura; importado aqui,
+    # fica fora do tempo da etapa 'figura'
+    import plotly.graph_objects  # noqa: F401
+
+    versao = _versao_git()
+    resultado = {
+        'data': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': versao,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'resultados': [],
+    }
+
+    for n in args.linhas:
+        t = time.perf_counter()
+        caminho = _planilha(n, args.semente)
+        print(f"planilha {n} linhas: {caminho} ({time.perf_counter() - t:.1f}s)")
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+
+        for app in args.apps:
+            tempos, info = medir_painel(conteudo, app, args.repeticoes)
+            resultado['resultados'].append({
+                'app': app,
+                'linhas_planilha': n,
+                'tempos_s': {k: round(v, 6) for k, v in tempos.items()},
+                **info,
+            })
+            etapas = " | ".join(f"{k} {v * 1000:.0f}ms" for k, v in tempos.items())
+            print(f"  {app:8s} {etapas} | {info['traces']} traces, "
+                  f"{info['figura_json_bytes'] / 1024:.0f} KB")
+
+    saida = args.saida or os.path.join(
+        'benchmarks',
+        f"{pd.Timestamp.now():%Y%m%d_%H%M%S}_{versao or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"resultados: {saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# =====================================================
+# DIAGNÓSTICO DE DESEMPENHO
+# =====================================================
+# Cronômetro por etapa de uma execução do script do painel. Cada chamada a
+# marcar(etapa) registra o tempo desde a marca anterior, então basta uma
+# linha no fim de cada seção. Desativado, não mede nada.
+import json
+import os
+import time
+
+import pandas as pd
+
+LOG_PADRAO = os.environ.get('PROGRAMACAO_DIAGNOSTICO_LOG', 'diagnostico.jsonl')
+
+
+class Diagnostico:
+    def __init__(self, app, ativo=True):
+        self.app = app
+        self.ativo = ativo
+        self.etapas = {}
+        self.contagens = {}
+        self.inicio = time.perf_counter()
+        self._ultima = self.inicio
+
+    def marcar(self, etapa):
+        """Atribui a `etapa` o tempo decorrido desde a marca anterior."""
+        if not self.ativo:
+            return
+        agora = time.perf_counter()
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + agora - self._ultima
+        self._ultima = agora
+
+    def contar(self, **valores):
+        if self.ativo:
+            self.contagens.update(valores)
+
+    def figura(self, fig):
+        """Nº de traces e tamanho da figura serializada (o que vai ao navegador).
+
+        Chamar logo após marcar a etapa de montagem da figura.
+        """
+        if not self.ativo:
+            return
+        spec = fig.to_json()
+        self.marcar('figura_json')
+        self.contar(traces=len(fig.data), figura_bytes=len(spec))
+
+    @property
+    def total(self):
+        return self._ultima - self.inicio
+
+    def registro(self, **extra):
+        return {
+            'data': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'app': self.app,
+            'total_s': round(self.total, 6),
+            'etapas_s': {k: round(v, 6) for k, v in self.etapas.items()},
+            **self.contagens,
+            **extra,
+        }
+
+    def gravar(self, caminho=None, **extra):
+        """Acrescenta o registro desta execução a um arquivo JSONL."""
+        caminho = caminho or LOG_PADRAO
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with open(caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.registro(**extra), ensure_ascii=False) + "\n")
+        return caminho
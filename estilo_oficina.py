@@ -0,0 +1,121 @@
+# =====================================================
+# GANTT DO PAINEL DA OFICINA (ALTA PERFORMANCE)
+# =====================================================
+# Renderizador do estilo 'oficina' (ver sessao.py): Gantt com linhas grossas,
+# paginado no eixo Y, e em WebGL numa figura só acima de LIMITE_WEBGL barras.
+import streamlit as st
+
+from painel import figura_gantt, figura_gantt_densa, janela, mapa_cores, preparar_gantt
+
+APP = 'oficina'
+
+ESCALAS = {
+    'carga': 'Blues',
+    'atrasadas': 'Reds',
+    'progresso': 'Greens',
+    'ocupacao': 'YlOrRd',
+}
+
+RODAPE = "⚡ Gantt otimizado | Desenvolvido para Controle de Programação da Oficina"
+
+LINHAS_POR_PAGINA = 60
+
+# Acima deste nº de barras o Gantt passa para WebGL, com todas as linhas
+LIMITE_WEBGL = 2000
+
+
+def gantt(ctx):
+    """Desenha o Gantt e retorna o df usado nele (None se vazio)."""
+    df, hoje, diag = ctx.df, ctx.hoje, ctx.diag
+
+    st.subheader("📅 Cronograma - Visão Gantt (Alta Performance)")
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    agrupar_por_os = col1.checkbox("📋 Agrupar por OS", True)
+    mostrar_concluido = col2.checkbox("✅ Mostrar % Concluído", True)
+    periodo_view = col3.slider("Período (dias)", 14, 90, 30, 7)
+    so_periodo = col4.checkbox("🔭 Só o período visível", True)
+    so_hoje = col5.checkbox("📍 Só as ativas hoje", False)
+
+    # Janela de datas em torno de hoje
+    inicio_view, fim_view = janela(hoje, periodo_view)
+
+    # Recortes por data direto pelo índice de intervalos (busca binária + as
+    # atividades encontradas), cruzados com os filtros
+    ativas_hoje = ctx.mostrar_ativas_hoje()
+
+    if so_hoje:
+        df_gantt = df.iloc[ativas_hoje]
+    elif so_periodo:
+        # Só as atividades que cruzam a janela
+        df_gantt = df.iloc[ctx.nos_filtros(ctx.datas.sobrepoe(inicio_view, fim_view))]
+    else:
+        df_gantt = ctx.df_filtrado.dropna(subset=['DT INICIO', 'DT FIM'])
+
+    diag.contar(
+        linhas=len(df), linhas_filtradas=len(ctx.df_filtrado), linhas_gantt=len(df_gantt)
+    )
+
+    if df_gantt.empty:
+        st.warning("Sem dados válidos para o cronograma")
+        return None
+
+    df_gantt, rotulos = preparar_gantt(
+        ctx.com_textos(ctx.com_risco(df_gantt)), agrupar_por_os
+    )
+
+    # Cores pela lista completa de áreas, para não mudarem entre páginas
+    color_map = mapa_cores(df_gantt['PROG.'].unique())
+
+    faixa_x = (inicio_view, fim_view) if so_periodo else None
+    # Estado dos controles que muda a figura (com os filtros, a chave do cache)
+    estado = dict(
+        estilo=APP, agrupar_por_os=agrupar_por_os, mostrar_concluido=mostrar_concluido,
+        periodo=periodo_view, so_periodo=so_periodo, so_hoje=so_hoje
+    )
+    if len(df_gantt) > LIMITE_WEBGL:
+        # Visão da oficina inteira: um só gráfico WebGL, sem paginação
+        st.caption(
+            f"🚀 {len(df_gantt)} atividades em {len(rotulos)} linhas: modo de "
+            f"alta densidade (WebGL). Use zoom e o hover para os detalhes."
+        )
+        diag.marcar('dados_gantt')
+        fig = ctx.figura_em_cache(
+            lambda: figura_gantt_densa(
+                df_gantt, rotulos, color_map, mostrar_concluido, hoje, faixa_x=faixa_x
+            ),
+            **estado
+        )
+    else:
+        # Paginação do eixo Y, para o gráfico não crescer sem limite
+        n_paginas = max(1, -(-len(rotulos) // LINHAS_POR_PAGINA))
+        pagina = 1
+        if n_paginas > 1:
+            pagina = st.number_input(
+                f"Página (de {n_paginas}, {LINHAS_POR_PAGINA} linhas cada)",
+                min_value=1, max_value=n_paginas, value=1
+            )
+        rotulos = rotulos[(pagina - 1) * LINHAS_POR_PAGINA:pagina * LINHAS_POR_PAGINA]
+        df_gantt = df_gantt[df_gantt['Y_LABEL'].isin(rotulos)]
+        diag.marcar('dados_gantt')
+
+        fig = ctx.figura_em_cache(
+            lambda: figura_gantt(
+                df_gantt, rotulos, color_map, mostrar_concluido, hoje, faixa_x=faixa_x
+            ),
+            pagina=pagina, **estado
+        )
+    diag.marcar('figura')
+    diag.figura(fig)
+
+    st.plotly_chart(
+        fig,
+        use_container_width=True,
+        config={
+            "scrollZoom": True,
+            "displaylogo": False,
+            "modeBarButtonsToRemove": ["lasso2d", "select2d"]
+        }
+    )
+    diag.marcar('plotly_chart')
+    return df_gantt
@@ -0,0 +1,85 @@
+# ---------------- GANTT ESTILO POWER BI ----------------
+# Renderizador do estilo 'powerbi' (ver sessao.py): barras go.Bar com a
+# paleta do Power BI, linha HOJE pontilhada e legenda de cores por área.
+import streamlit as st
+
+from painel import figura_gantt_powerbi
+
+APP = 'powerbi'
+
+# Escalas das visões consolidadas nas cores da paleta Power BI
+ESCALAS = {
+    'carga': [[0, '#FFFFFF'], [1, '#4472C4']],
+    'atrasadas': [[0, '#FFFFFF'], [1, '#ED7D31']],
+    'progresso': [[0, '#FFFFFF'], [1, '#70AD47']],
+    'ocupacao': [[0, '#FFFFFF'], [1, '#9E480E']],
+}
+
+RODAPE = "💡 Desenvolvido para Controle de Programação da Oficina"
+
+
+def gantt(ctx):
+    """Desenha o Gantt e a legenda; retorna o df usado (None se vazio)."""
+    df, hoje, diag = ctx.df, ctx.hoje, ctx.diag
+
+    st.subheader("📅 Cronograma - Visão Gantt (Estilo Power BI)")
+
+    # Controles
+    col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+    with col_c1:
+        agrupar_por_os = st.checkbox("📋 Agrupar por OS", value=True, key="agrupar")
+    with col_c2:
+        mostrar_concluido = st.checkbox("✅ Mostrar % Concluído", value=True, key="concluido")
+    with col_c3:
+        periodo_view = st.slider("Período (dias)", 14, 60, 21, 7, key="periodo")
+    with col_c4:
+        so_hoje = st.checkbox("📍 Só as ativas hoje", value=False, key="so_hoje")
+
+    # Atividades em execução hoje, pelo índice de intervalos
+    ativas_hoje = ctx.mostrar_ativas_hoje()
+
+    # Preparar dados
+    if so_hoje:
+        df_gantt = df.iloc[ativas_hoje]
+    else:
+        df_gantt = ctx.df_filtrado.dropna(subset=['DT INICIO', 'DT FIM'])
+    diag.contar(linhas=len(df), linhas_filtradas=len(ctx.df_filtrado), linhas_gantt=len(df_gantt))
+    diag.marcar('dados_gantt')
+
+    if df_gantt.empty:
+        st.warning("Sem dados válidos para o cronograma")
+        return None
+
+    fig, color_map = ctx.figura_em_cache(
+        lambda: figura_gantt_powerbi(
+            ctx.com_textos(ctx.com_risco(df_gantt)), agrupar_por_os, mostrar_concluido,
+            hoje, periodo_view
+        ),
+        estilo=APP, agrupar_por_os=agrupar_por_os, mostrar_concluido=mostrar_concluido,
+        periodo=periodo_view, so_hoje=so_hoje
+    )
+    areas_unicas = sorted(color_map)
+    diag.marcar('figura')
+    diag.figura(fig)
+
+    st.plotly_chart(fig, use_container_width=True)
+    diag.marcar('plotly_chart')
+
+    # Legenda de cores (estilo Power BI)
+    st.markdown("#### 🎨 Legenda - Áreas (PROG.)")
+    cols_legenda = st.columns(min(len(areas_unicas), 5))
+    # Atividades por área numa passada só
+    contagem = df_gantt['PROG.'].value_counts()
+    for i, area in enumerate(areas_unicas):
+        with cols_legenda[i % 5]:
+            cor = color_map[area]
+            qtd = contagem.get(area, 0)
+            st.markdown(
+                f'<div style="display:flex; align-items:center; gap:8px;">'
+                f'<div style="width:20px; height:20px; background-color:{cor}; border-radius:3px;"></div>'
+                f'<span style="font-size:12px;">{area} ({qtd})</span>'
+                f'</div>',
+                unsafe_allow_html=True
+            )
+    diag.marcar('legenda')
+    return df_gantt
@@ -0,0 +1,270 @@
+# =====================================================
+# EXPORTAÇÃO DO RECORTE FILTRADO
+# =====================================================
+# As linhas que passam pelos filtros, com o % CONCLUÍDO calculado e o
+# STATUS, em xlsx, Parquet ou CSV. O arquivo é escrito em memória bloco a
+# bloco: cada bloco sai do df por posição (LINHAS_POR_BLOCO linhas), então
+# nunca há uma cópia inteira do recorte nem todas as células como objetos
+# Python ao mesmo tempo.
+#
+# O xlsx é escrito direto (como a leitura em leitura.py lê direto): o XML
+# das células de um bloco é montado coluna a coluna, com operações em
+# arrays, e vai comprimido para o zip à medida que sai. As bibliotecas de
+# escrita (openpyxl, xlsxwriter) tratam célula a célula em Python e levam
+# de 15 a 35 s para 100 mil linhas.
+import io
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from painel import formatar_datas
+
+LINHAS_POR_BLOCO = 5000
+
+ABA_EXPORTACAO = "Programação Filtrada"
+
+# Colunas auxiliares do df que não vão para o arquivo
+COLUNAS_INTERNAS = ['% CONCLUÍDO_ORIGINAL']
+
+# formato -> (rótulo, extensão, tipo MIME)
+FORMATOS = {
+    'xlsx': (
+        "Excel (.xlsx)", 'xlsx',
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    ),
+    'parquet': ("Parquet", 'parquet', 'application/vnd.apache.parquet'),
+    'csv': ("CSV (Excel pt-BR)", 'csv', 'text/csv'),
+}
+
+
+def _blocos(df, linhas, colunas, linhas_por_bloco):
+    # Recortes de até `linhas_por_bloco` linhas, nas posições `linhas`
+    posicoes = df.columns.get_indexer(colunas)
+    for inicio in range(0, len(linhas), linhas_por_bloco):
+        yield df.iloc[linhas[inicio:inicio + linhas_por_bloco], posicoes]
+
+
+# =====================================================
+# XLSX ESCRITO DIRETO
+# =====================================================
+# Partes fixas do pacote: uma aba, com os estilos de data e do cabeçalho
+_XLSX_FIXOS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{ABA_EXPORTACAO}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    # Estilos das células: 0 normal, 1 data, 2 data e hora, 3 cabeçalho
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="2"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/>'
+        '<numFmt numFmtId="165" formatCode="dd/mm/yyyy hh:mm"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="4">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+        '</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+_INICIO_ABA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    # Cabeçalho congelado
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+    'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    '<sheetData>'
+)
+_FIM_ABA = '</sheetData></worksheet>'
+
+# Caracteres de controle não são aceitos no XML; o Excel limita o texto a
+# 32767 caracteres por célula
+_CONTROLE = '[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]'
+MAX_TEXTO_CELULA = 32767
+
+EPOCA_EXCEL = pd.Timestamp('1899-12-30')
+
+
+def _letra_coluna(i):
+    # 0 -> 'A', 25 -> 'Z', 26 -> 'AA'
+    letras = ""
+    i += 1
+    while i:
+        i, resto = divmod(i - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _textos_xml(serie):
+    # Texto escapado de cada linha (None nos vazios); nas categorias, só os
+    # valores distintos são tratados
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        distintos = _textos_xml(pd.Series(serie.cat.categories.astype(str)))
+        return np.append(distintos, None)[codigos]
+    vazio = serie.isna().to_numpy()
+    texto = (
+        serie.astype(object).where(~vazio, "").astype(str)
+        .str.slice(0, MAX_TEXTO_CELULA)
+        .str.replace(_CONTROLE, "", regex=True)
+        .map(escape)
+        .to_numpy(dtype=object)
+    )
+    texto[vazio] = None
+    return texto
+
+
+def _numeros_xml(valores):
+    # repr de cada float (o texto mais curto que volta ao mesmo número) e
+    # quais são vazios (NaN)
+    vazio = ~np.isfinite(valores)
+    textos = [repr(v) for v in np.where(vazio, 0.0, valores).tolist()]
+    return np.array(textos, dtype=object), vazio
+
+
+def _celulas(serie, refs, so_data):
+    # XML da célula de cada linha ('' nos vazios)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # Datas do Excel: dias (com fração) desde 30/12/1899
+        dias = (serie - EPOCA_EXCEL) / pd.Timedelta(days=1)
+        numeros, vazio = _numeros_xml(dias.to_numpy(dtype='float64'))
+        estilo = 1 if so_data else 2
+        xml = '<c r="' + refs + f'" s="{estilo}"><v>' + numeros + '</v></c>'
+    elif pd.api.types.is_numeric_dtype(serie):
+        numeros, vazio = _numeros_xml(serie.to_numpy(dtype='float64', na_value=np.nan))
+        xml = '<c r="' + refs + '"><v>' + numeros + '</v></c>'
+    else:
+        texto = _textos_xml(serie)
+        vazio = pd.isna(texto)
+        texto[vazio] = ""
+        xml = (
+            '<c r="' + refs + '" t="inlineStr"><is><t xml:space="preserve">' +
+            texto + '</t></is></c>'
+        )
+    xml[vazio] = ""
+    return xml
+
+
+def _escrever_xlsx(blocos, colunas, so_datas, saida):
+    letras = [_letra_coluna(i) for i in range(len(colunas))]
+    # Compressão rápida (nível 1): o arquivo fica ~25% maior e sai bem mais rápido
+    with zipfile.ZipFile(saida, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as xlsx:
+        for nome, conteudo in _XLSX_FIXOS.items():
+            xlsx.writestr(nome, conteudo)
+
+        with xlsx.open('xl/worksheets/sheet1.xml', 'w') as aba:
+            cabecalho = "".join(
+                f'<c r="{letra}1" s="3" t="inlineStr"><is><t>{escape(str(c))}</t></is></c>'
+                for letra, c in zip(letras, colunas)
+            )
+            aba.write((_INICIO_ABA + f'<row r="1">{cabecalho}</row>').encode('utf-8'))
+
+            linha = 2
+            for bloco in blocos:
+                numeros = np.array(
+                    [str(i) for i in range(linha, linha + len(bloco))], dtype=object
+                )
+                xml = '<row r="' + numeros + '">'
+                for letra, c in zip(letras, colunas):
+                    xml = xml + _celulas(bloco[c], letra + numeros, c in so_datas)
+                xml = xml + '</row>'
+                aba.write("".join(xml.tolist()).encode('utf-8'))
+                linha += len(bloco)
+            aba.write(_FIM_ABA.encode('utf-8'))
+
+
+def _escrever_parquet(blocos, esquema, saida):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Um row group por bloco, com o esquema do df inteiro (tipos iguais em
+    # todos os blocos, mesmo num recorte vazio)
+    with pq.ParquetWriter(saida, esquema) as escritor:
+        for bloco in blocos:
+            escritor.write_table(
+                pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False)
+            )
+
+
+def _escrever_csv(blocos, colunas, saida):
+    # ';' e vírgula decimal, com BOM: abre direto no Excel em português
+    texto = io.TextIOWrapper(saida, encoding='utf-8-sig', newline='')
+    cabecalho = True
+    for bloco in blocos:
+        # Datas já como texto: o date_format do to_csv formata linha a linha
+        datas = bloco.select_dtypes('datetime')
+        bloco = bloco.assign(**{c: formatar_datas(datas[c]) for c in datas.columns})
+        bloco.to_csv(texto, sep=';', decimal=',', index=False, header=cabecalho)
+        cabecalho = False
+    if cabecalho:
+        texto.write(";".join(colunas) + "\r\n")
+    texto.flush()
+    texto.detach()
+
+
+def exportar(df, linhas=None, formato='xlsx', linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Arquivo (BytesIO, no início) com as linhas `linhas` do df.
+
+    `linhas` são posições (None = todas), como Contexto.linhas_filtro.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+    linhas = np.arange(len(df)) if linhas is None else np.asarray(linhas)
+    colunas = [c for c in df.columns if c not in COLUNAS_INTERNAS]
+    blocos = _blocos(df, linhas, colunas, linhas_por_bloco)
+
+    saida = io.BytesIO()
+    if formato == 'xlsx':
+        # Datas sem hora saem como data (dd/mm/aaaa no Excel), não data e hora
+        datas = df[colunas].select_dtypes('datetime')
+        so_datas = {
+            c for c in datas.columns
+            if ((datas[c].dt.normalize() == datas[c]) | datas[c].isna()).all()
+        }
+        _escrever_xlsx(blocos, colunas, so_datas, saida)
+    elif formato == 'parquet':
+        import pyarrow as pa
+
+        esquema = pa.Schema.from_pandas(df[colunas].iloc[:0], preserve_index=False)
+        _escrever_parquet(blocos, esquema, saida)
+    else:
+        _escrever_csv(blocos, colunas, saida)
+    saida.seek(0)
+    return saida
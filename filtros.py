@@ -0,0 +1,106 @@
+# =====================================================
+# ÍNDICE DOS FILTROS
+# =====================================================
+# Montado uma vez por planilha. Cada coluna de filtro vira códigos inteiros
+# (pd.factorize) e, para cada valor, a lista ordenada das linhas que o têm.
+# Uma seleção combinada parte da menor lista e vai descartando as linhas
+# que não batem com as outras colunas, sem copiar o DataFrame.
+import numpy as np
+import pandas as pd
+
+
+class IndiceFiltros:
+    def __init__(self, df, colunas):
+        self.n = len(df)
+        self.colunas = list(colunas)
+        self.codigos = {}
+        self.valores = {}
+        self.totais = {}
+        self._ordem = {}
+        self._inicio = {}
+        self._posicao = {}
+
+        for col in self.colunas:
+            codigos, valores = pd.factorize(df[col], sort=True)
+            codigos = codigos.astype(np.int32)
+            totais = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+
+            self.codigos[col] = codigos
+            self.valores[col] = list(valores)
+            self.totais[col] = totais
+            self._posicao[col] = {v: i for i, v in enumerate(self.valores[col])}
+
+            # Listas de linhas por valor, no formato CSR: linhas do valor i
+            # ficam em _ordem[_inicio[i]:_inicio[i + 1]]
+            ordem = np.argsort(codigos, kind='stable').astype(np.int64)
+            vazios = int((codigos < 0).sum())
+            self._ordem[col] = ordem[vazios:]
+            self._inicio[col] = np.concatenate(([0], np.cumsum(totais)))
+
+    def _codigos_sel(self, col, valores):
+        pos = self._posicao[col]
+        return np.unique(
+            np.array([pos[v] for v in valores if v in pos], dtype=np.int64)
+        )
+
+    def _linhas_col(self, col, codigos_sel):
+        ordem = self._ordem[col]
+        inicio = self._inicio[col]
+        partes = [ordem[inicio[c]:inicio[c + 1]] for c in codigos_sel]
+        if not partes:
+            return np.empty(0, dtype=np.int64)
+        if len(partes) == 1:
+            return partes[0]
+        return np.sort(np.concatenate(partes))
+
+    def linhas(self, selecoes, ignorar=None):
+        """Posições das linhas que atendem a todas as seleções.
+
+        `selecoes` mapeia coluna -> valores escolhidos; colunas sem valores
+        não filtram. Retorna None quando nada filtra (todas as linhas).
+        """
+        ativos = {}
+        for col, valores in selecoes.items():
+            if col == ignorar or not valores:
+                continue
+            ativos[col] = self._codigos_sel(col, valores)
+        if not ativos:
+            return None
+
+        # Começa pela coluna mais seletiva
+        base = min(ativos, key=lambda c: self.totais[c][ativos[c]].sum())
+        linhas = self._linhas_col(base, ativos.pop(base))
+
+        for col, codigos_sel in ativos.items():
+            if not len(linhas):
+                break
+            permitido = np.zeros(len(self.valores[col]) + 1, dtype=bool)
+            permitido[codigos_sel + 1] = True
+            linhas = linhas[permitido[self.codigos[col][linhas] + 1]]
+        return linhas
+
+    def contagens(self, col, selecoes):
+        """Quantidade de linhas por valor de `col` sob as demais seleções."""
+        linhas = self.linhas(selecoes, ignorar=col)
+        if linhas is None:
+            return self.totais[col]
+        codigos = self.codigos[col][linhas]
+        return np.bincount(
+            codigos[codigos >= 0], minlength=len(self.valores[col])
+        )
+
+    def opcoes(self, col, selecoes):
+        """Valores ainda disponíveis em `col` (mais os já selecionados)."""
+        contagens = self.contagens(col, selecoes)
+        selecionados = set(selecoes.get(col) or [])
+        return {
+            v: int(n)
+            for v, n in zip(self.valores[col], contagens)
+            if n > 0 or v in selecionados
+        }
+
+    def filtrar(self, df, selecoes):
+        linhas = self.linhas(selecoes)
+        if linhas is None:
+            return df
+        return df.iloc[linhas]
@@ -0,0 +1,303 @@
+# =====================================================
+# GANTT VETORIZADO
+# =====================================================
+# Monta as barras do cronograma com um trace por (área, concluído/restante)
+# em vez de um trace por atividade. Usado pelos dois painéis.
+# O plotly só é importado ao montar os traces (início mais rápido de quem
+# só lê e trata a planilha, como o relatório e os processos de leitura).
+import numpy as np
+import pandas as pd
+
+
+def calcular_parcial(df, mostrar_concluido, dias_inteiros=False):
+    """Retorna (dt_parcial, dividir, restante) para cada linha do df.
+
+    `dividir` marca as barras que são separadas em parte concluída e
+    restante; `restante` marca as que ainda têm parte restante a desenhar.
+    """
+    inicio = df['DT INICIO']
+    fim = df['DT FIM']
+    pct = df['% CONCLUÍDO'].fillna(0)
+
+    if dias_inteiros:
+        dur_total = (fim - inicio).dt.days.clip(lower=1)
+        dias = (dur_total * pct / 100).round()
+    else:
+        dias = (fim - inicio).dt.days * (pct / 100)
+
+    dt_parcial = inicio + pd.to_timedelta(dias, unit='D')
+
+    if mostrar_concluido:
+        dividir = pct > 0
+    else:
+        dividir = pd.Series(False, index=df.index)
+    restante = dividir & (pct < 100)
+
+    return dt_parcial, dividir, restante
+
+
+def _customdata(df, colunas):
+    if not colunas:
+        return None
+    return df[colunas].astype(object).to_numpy()
+
+
+def _segmentos(inicio, fim, y, customdata):
+    # Segmentos separados por None: [x0, x1, None, x0, x1, None, ...]
+    n = len(inicio)
+    x = np.full(n * 3, None, dtype=object)
+    x[0::3] = inicio.astype(object).to_numpy()
+    x[1::3] = fim.astype(object).to_numpy()
+
+    yy = np.full(n * 3, None, dtype=object)
+    yy[0::3] = y
+    yy[1::3] = y
+
+    cd = None
+    if customdata is not None:
+        cd = np.repeat(customdata, 3, axis=0)
+    return x, yy, cd
+
+
+def tracos_gantt_linhas(df, y_col, color_map, mostrar_concluido,
+                        hovertemplate=None, customdata_cols=None,
+                        largura=18, cor_padrao='#999999'):
+    """Barras do Gantt como linhas grossas (go.Scatter)."""
+    import plotly.graph_objects as go
+
+    dt_parcial, dividir, restante = calcular_parcial(
+        df, mostrar_concluido, dias_inteiros=True
+    )
+    fim_cheio = df['DT FIM'].where(~dividir, dt_parcial)
+
+    tracos = []
+    grupos = df.groupby('PROG.', sort=False, dropna=False).indices
+    for area, idx in grupos.items():
+        cor = color_map.get(area, cor_padrao)
+        df_area = df.iloc[idx]
+        y = df_area[y_col].to_numpy(dtype=object)
+        cd = _customdata(df_area, customdata_cols)
+
+        x, yy, cd_seg = _segmentos(
+            df_area['DT INICIO'], fim_cheio.iloc[idx], y, cd
+        )
+        tracos.append(go.Scatter(
+            x=x,
+            y=yy,
+            mode='lines',
+            line=dict(color=cor, width=largura),
+            customdata=cd_seg,
+            hovertemplate=hovertemplate,
+            showlegend=False
+        ))
+
+        mask = restante.iloc[idx].to_numpy()
+        if mask.any():
+            x, yy, cd_seg = _segmentos(
+                dt_parcial.iloc[idx][mask],
+                df_area['DT FIM'][mask],
+                y[mask],
+                None if cd is None else cd[mask]
+            )
+            tracos.append(go.Scatter(
+                x=x,
+                y=yy,
+                mode='lines',
+                line=dict(color=cor, width=largura, dash='dot'),
+                opacity=0.4,
+                customdata=cd_seg,
+                hovertemplate=hovertemplate,
+                showlegend=False
+            ))
+
+    return tracos
+
+
+def _duracao_ms(inicio, fim):
+    return ((fim - inicio).dt.total_seconds() * 1000).to_numpy()
+
+
+def tracos_gantt_barras(df, y_col, color_map, mostrar_concluido,
+                        hovertemplate=None, hovertemplate_restante=None,
+                        customdata_cols=None, largura=0.6,
+                        cor_padrao='#808080'):
+    """Barras do Gantt como go.Bar horizontais com `base` na data de início."""
+    import plotly.graph_objects as go
+
+    dt_parcial, dividir, restante = calcular_parcial(df, mostrar_concluido)
+    fim_cheio = df['DT FIM'].where(~dividir, dt_parcial)
+
+    tracos = []
+    grupos = df.groupby('PROG.', sort=False, dropna=False).indices
+    for area, idx in grupos.items():
+        cor = color_map.get(area, cor_padrao)
+        df_area = df.iloc[idx]
+        y = df_area[y_col].to_numpy()
+        cd = _customdata(df_area, customdata_cols)
+
+        tracos.append(go.Bar(
+            x=_duracao_ms(df_area['DT INICIO'], fim_cheio.iloc[idx]),
+            y=y,
+            base=df_area['DT INICIO'].to_numpy(),
+            orientation='h',
+            marker=dict(color=cor, line=dict(width=0)),
+            width=largura,
+            customdata=cd,
+            hovertemplate=hovertemplate,
+            showlegend=False
+        ))
+
+        mask = restante.iloc[idx].to_numpy()
+        if mask.any():
+            parcial = dt_parcial.iloc[idx][mask]
+            tracos.append(go.Bar(
+                x=_duracao_ms(parcial, df_area['DT FIM'][mask]),
+                y=y[mask],
+                base=parcial.to_numpy(),
+                orientation='h',
+                marker=dict(color=cor, opacity=0.3, line=dict(width=0)),
+                width=largura,
+                customdata=None if cd is None else cd[mask],
+                hovertemplate=hovertemplate_restante or hovertemplate,
+                showlegend=False
+            ))
+
+    return tracos
+
+
+def _ms(serie):
+    # Datas em milissegundos (float): o eixo 'date' do Plotly aceita números,
+    # e arrays float vão como binário (base64) no JSON da figura
+    return serie.to_numpy(dtype='datetime64[ms]').astype('int64').astype(float)
+
+
+def _segmentos_numericos(inicio, fim, y, texto):
+    # Como _segmentos, mas com NaN nos intervalos (mantém os arrays float)
+    n = len(inicio)
+    x = np.full(n * 3, np.nan)
+    x[0::3] = inicio
+    x[1::3] = fim
+
+    # Posições no eixo Y cabem em float32 (metade do tamanho no JSON)
+    yy = np.full(n * 3, np.nan, dtype=np.float32)
+    yy[0::3] = y
+    yy[1::3] = y
+
+    tt = None
+    if texto is not None:
+        tt = np.full(n * 3, None, dtype=object)
+        tt[0::3] = texto
+        tt[1::3] = texto
+    return x, yy, tt
+
+
+def tracos_gantt_webgl(df, y, color_map, mostrar_concluido, texto=None,
+                       largura=4, cor_padrao='#999999'):
+    """Barras do Gantt em WebGL (go.Scattergl), para cronogramas grandes.
+
+    `y` é a posição numérica de cada linha do df no eixo Y e `texto` o hover
+    de cada atividade (opcional).
+    """
+    import plotly.graph_objects as go
+
+    dt_parcial, dividir, restante = calcular_parcial(
+        df, mostrar_concluido, dias_inteiros=True
+    )
+    inicio = _ms(df['DT INICIO'])
+    fim = _ms(df['DT FIM'])
+    parcial = _ms(dt_parcial)
+    fim_cheio = np.where(dividir.to_numpy(), parcial, fim)
+    restante = restante.to_numpy()
+    y = np.asarray(y, dtype=float)
+    if texto is not None:
+        texto = np.asarray(texto, dtype=object)
+
+    tracos = []
+    grupos = df.groupby('PROG.', sort=False, dropna=False).indices
+    for area, idx in grupos.items():
+        cor = color_map.get(area, cor_padrao)
+        tx = None if texto is None else texto[idx]
+
+        x, yy, tt = _segmentos_numericos(inicio[idx], fim_cheio[idx], y[idx], tx)
+        tracos.append(go.Scattergl(
+            x=x,
+            y=yy,
+            mode='lines',
+            line=dict(color=cor, width=largura),
+            text=tt,
+            hoverinfo='text' if tt is not None else 'skip',
+            showlegend=False
+        ))
+
+        mask = restante[idx]
+        if mask.any():
+            sel = idx[mask]
+            x, yy, tt = _segmentos_numericos(
+                parcial[sel], fim[sel], y[sel],
+                None if texto is None else texto[sel]
+            )
+            tracos.append(go.Scattergl(
+                x=x,
+                y=yy,
+                mode='lines',
+                line=dict(color=cor, width=largura),
+                opacity=0.4,
+                text=tt,
+                hoverinfo='text' if tt is not None else 'skip',
+                showlegend=False
+            ))
+
+    return tracos
+
+
+def tracos_risco(df, y, webgl=False):
+    """Prolongamento das atividades que puxam o atraso de uma OS.
+
+    Para as linhas com CAUSA ATRASO (ver risco.py), um traço tracejado
+    vermelho do DT FIM até o FIM PROJETADO e um 'x' no fim projetado. `y` é a
+    posição de cada linha do df no eixo Y (rótulo ou número, como nas barras).
+    """
+    import plotly.graph_objects as go
+
+    mask = df['CAUSA ATRASO'].to_numpy(dtype=bool)
+    if not mask.any():
+        return []
+    sel = df[mask]
+    y = np.asarray(y)[mask]
+    texto = (
+        "<b>Fim projetado " + sel['FIM PROJETADO'].dt.strftime('%d/%m/%Y') +
+        "</b><br>Folga: " + sel['FOLGA (DIAS)'].astype('Int64').astype(str) +
+        " dia(s)"
+    ).to_numpy(dtype=object)
+
+    if webgl:
+        Scatter = go.Scattergl
+        fim, projetado = _ms(sel['DT FIM']), _ms(sel['FIM PROJETADO'])
+        x, yy, tt = _segmentos_numericos(fim, projetado, y, texto)
+    else:
+        Scatter = go.Scatter
+        fim, projetado = sel['DT FIM'], sel['FIM PROJETADO']
+        x, yy, tt = _segmentos(fim, projetado, y, texto[:, None])
+        tt = tt[:, 0]
+        projetado = projetado.astype(object).to_numpy()
+
+    return [
+        Scatter(
+            x=x,
+            y=yy,
+            mode='lines',
+            line=dict(color='#C00000', width=2, dash='dash'),
+            text=tt,
+            hoverinfo='text',
+            showlegend=False
+        ),
+        Scatter(
+            x=projetado,
+            y=y,
+            mode='markers',
+            marker=dict(color='#C00000', symbol='x', size=8),
+            text=texto,
+            hoverinfo='text',
+            showlegend=False
+        ),
+    ]
@@ -0,0 +1,358 @@
+# =====================================================
+# HISTÓRICO DE PLANILHAS (SQLITE)
+# =====================================================
+# Cada planilha carregada é gravada como um retrato (snapshot) datado num
+# arquivo SQLite local, com o STATUS do dia. As tendências (atrasadas por
+# semana, evolução do % concluído de uma OS...) saem de uma consulta só nos
+# índices do banco, sem reabrir as planilhas antigas. Os totais de cada
+# retrato (sem filtros) são gravados junto com ele, em `totais`: a tendência
+# sem filtros lê uma linha por retrato.
+#
+# Para gravar planilhas antigas de uma vez:
+#   python historico.py sem10.xlsx sem11.xlsx --data 2026-03-06 2026-03-13
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+BANCO_PADRAO = os.environ.get('PROGRAMACAO_HISTORICO_DB', 'historico.sqlite')
+
+# Coluna do df -> coluna da tabela atividades
+COLUNAS_BANCO = {
+    'OS': 'os',
+    'WK': 'wk',
+    'PROG.': 'prog',
+    'SUPERVISÃO': 'supervisao',
+    'CLIENTE': 'cliente',
+    'ORIGEM': 'origem',
+    'PROGRAMAÇÃO | PROG. DETALHADA': 'descricao',
+    'DT INICIO': 'dt_inicio',
+    'DT FIM': 'dt_fim',
+    'DATA CONTRATUAL': 'data_contratual',
+    'LT OPERAÇÃO': 'lt_operacao',
+    '% CONCLUÍDO': 'pct_concluido',
+    'STATUS': 'status',
+}
+COLUNAS_DATA = ['DT INICIO', 'DT FIM', 'DATA CONTRATUAL']
+COLUNAS_NUMERICAS = ['LT OPERAÇÃO', '% CONCLUÍDO']
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    chave TEXT NOT NULL,
+    nome TEXT,
+    data TEXT NOT NULL,
+    gravado_em TEXT NOT NULL,
+    linhas INTEGER NOT NULL,
+    UNIQUE (chave, data)
+);
+CREATE INDEX IF NOT EXISTS snapshots_data ON snapshots (data);
+
+CREATE TABLE IF NOT EXISTS atividades (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    os TEXT,
+    wk TEXT,
+    prog TEXT,
+    supervisao TEXT,
+    cliente TEXT,
+    origem TEXT,
+    descricao TEXT,
+    dt_inicio TEXT,
+    dt_fim TEXT,
+    data_contratual TEXT,
+    lt_operacao REAL,
+    pct_concluido REAL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS atividades_snapshot_status ON atividades (snapshot_id, status);
+CREATE INDEX IF NOT EXISTS atividades_os ON atividades (os, snapshot_id);
+CREATE INDEX IF NOT EXISTS atividades_wk ON atividades (wk, snapshot_id);
+CREATE INDEX IF NOT EXISTS atividades_dt_fim ON atividades (dt_fim);
+
+CREATE TABLE IF NOT EXISTS totais (
+    snapshot_id INTEGER PRIMARY KEY REFERENCES snapshots (id) ON DELETE CASCADE,
+    atividades INTEGER NOT NULL,
+    os INTEGER NOT NULL,
+    atrasadas INTEGER,
+    concluidas INTEGER,
+    pct_medio REAL
+);
+"""
+
+# Os mesmos agregados da tendência com filtros, para um retrato inteiro
+TOTAIS_SQL = """
+    INSERT INTO totais (snapshot_id, atividades, os, atrasadas, concluidas, pct_medio)
+    SELECT snapshot_id, COUNT(*), COUNT(DISTINCT os), SUM(status = 'Atrasado'),
+           SUM(status = 'Concluído'), AVG(pct_concluido)
+    FROM atividades
+    WHERE snapshot_id IN ({})
+    GROUP BY snapshot_id
+"""
+
+# Semana ISO (segunda a domingo) identificada pelo domingo que a fecha;
+# strftime('%W') partia em duas a semana da virada do ano
+SEMANA_SQL = "date(data, 'weekday 0')"
+
+
+# Bancos já preparados neste processo (tabelas, WAL e totais dos retratos
+# antigos): nas conexões seguintes, a cada rerun, só vão os PRAGMAs da conexão
+_PREPARADOS = set()
+_TRAVA_PREPARO = threading.Lock()
+
+
+def conectar(banco=None):
+    """Conexão com o banco do histórico (cria as tabelas se preciso)."""
+    banco = banco or BANCO_PADRAO
+    pasta = os.path.dirname(banco)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.realpath(banco)
+    novo = not os.path.exists(caminho)
+    con = sqlite3.connect(banco, timeout=30)
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA foreign_keys=ON")
+    if novo or caminho not in _PREPARADOS:
+        with _TRAVA_PREPARO:
+            # WAL (gravado no arquivo): os painéis consultam enquanto outra
+            # sessão grava
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(ESQUEMA)
+            _completar_totais(con)
+            _PREPARADOS.add(caminho)
+    return con
+
+
+def _completar_totais(con):
+    # Retratos gravados antes da tabela de totais existir
+    faltando = [i for (i,) in con.execute(
+        "SELECT id FROM snapshots WHERE id NOT IN (SELECT snapshot_id FROM totais)"
+    )]
+    if faltando:
+        with con:
+            con.execute(TOTAIS_SQL.format(", ".join("?" * len(faltando))), faltando)
+
+
+def _valores(df, coluna):
+    # Lista de valores Python (None nos vazios) para o executemany
+    serie = df[coluna]
+    if coluna in COLUNAS_DATA:
+        serie = serie.dt.strftime('%Y-%m-%d')
+    elif coluna in COLUNAS_NUMERICAS:
+        serie = serie.astype('float64')
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def gravar_snapshot(df, chave, data, nome=None, banco=None):
+    """Grava o df (com STATUS) como o retrato de `data`.
+
+    Idempotente: a mesma planilha (`chave`) no mesmo dia é gravada uma vez.
+    Retorna o id do snapshot, ou None se o banco não pôde ser gravado.
+    """
+    data = pd.Timestamp(data).strftime('%Y-%m-%d')
+    colunas = [c for c in COLUNAS_BANCO if c in df.columns]
+    try:
+        with closing(conectar(banco)) as con, con:
+            existente = con.execute(
+                "SELECT id FROM snapshots WHERE chave = ? AND data = ?", (chave, data)
+            ).fetchone()
+            if existente is not None:
+                return existente[0]
+
+            snapshot_id = con.execute(
+                "INSERT INTO snapshots (chave, nome, data, gravado_em, linhas) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (chave, nome, data, time.strftime('%Y-%m-%d %H:%M:%S'), len(df))
+            ).lastrowid
+
+            # Inserção em lote, coluna a coluna, numa transação só
+            valores = [_valores(df, c) for c in colunas]
+            nomes = ", ".join(['snapshot_id'] + [COLUNAS_BANCO[c] for c in colunas])
+            marcas = ", ".join("?" * (len(colunas) + 1))
+            con.executemany(
+                f"INSERT INTO atividades ({nomes}) VALUES ({marcas})",
+                zip(np.full(len(df), snapshot_id).tolist(), *valores)
+            )
+            con.execute(TOTAIS_SQL.format("?"), (snapshot_id,))
+            return snapshot_id
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def _filtros_sql(selecoes):
+    # WHERE das seleções dos filtros do painel ({coluna: [valores]})
+    condicoes, parametros = [], []
+    for coluna, valores in (selecoes or {}).items():
+        if valores and coluna in COLUNAS_BANCO:
+            condicoes.append(
+                f"a.{COLUNAS_BANCO[coluna]} IN ({', '.join('?' * len(valores))})"
+            )
+            parametros += [str(v) for v in valores]
+    return "".join(f" AND {c}" for c in condicoes), parametros
+
+
+def tendencia(desde=None, selecoes=None, por_semana=True, banco=None):
+    """Atividades, atrasadas, concluídas e % médio por retrato.
+
+    Com `por_semana`, fica o último retrato de cada planilha (pelo nome; a
+    chave muda a cada revisão) em cada semana ISO, e as planilhas da semana
+    são somadas numa linha. `selecoes` são as dos filtros do painel; sem
+    elas, os totais gravados com cada retrato são lidos direto. Uma linha
+    por retrato (ou semana), em ordem de data.
+    """
+    filtro, parametros = _filtros_sql(selecoes)
+    desde = pd.Timestamp(desde or '1900-01-01').strftime('%Y-%m-%d')
+    grupo = SEMANA_SQL if por_semana else "id"
+    retratos = f"""
+        WITH retratos AS (
+            SELECT id, data, {grupo} AS grupo,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY COALESCE(nome, chave), {grupo}
+                       ORDER BY data DESC, id DESC
+                   ) AS ordem
+            FROM snapshots
+            WHERE data >= ?
+        )
+    """
+    if filtro:
+        por_retrato = f"""
+            SELECT r.id, r.data, r.grupo,
+                   COUNT(*) AS atividades,
+                   COUNT(DISTINCT a.os) AS os,
+                   SUM(a.status = 'Atrasado') AS atrasadas,
+                   SUM(a.status = 'Concluído') AS concluidas,
+                   AVG(a.pct_concluido) AS pct_medio
+            FROM retratos r
+            JOIN atividades a ON a.snapshot_id = r.id
+            WHERE r.ordem = 1{filtro}
+            GROUP BY r.id
+        """
+    else:
+        por_retrato = """
+            SELECT r.id, r.data, r.grupo, t.atividades, t.os, t.atrasadas,
+                   t.concluidas, t.pct_medio
+            FROM retratos r
+            JOIN totais t ON t.snapshot_id = r.id
+            WHERE r.ordem = 1
+        """
+    # % médio das planilhas da semana ponderado pelo nº de atividades
+    consulta = retratos + f"""
+        SELECT MAX(data) AS "DATA",
+               SUM(atividades) AS "ATIVIDADES",
+               SUM(os) AS "OS",
+               SUM(atrasadas) AS "ATRASADAS",
+               SUM(concluidas) AS "CONCLUÍDAS",
+               SUM(pct_medio * atividades)
+                   / SUM(CASE WHEN pct_medio IS NOT NULL THEN atividades END)
+                   AS "% CONCLUÍDO MÉDIO"
+        FROM ({por_retrato})
+        GROUP BY grupo
+        ORDER BY MAX(data), MIN(id)
+    """
+    with closing(conectar(banco)) as con:
+        tabela = pd.read_sql_query(consulta, con, params=[desde] + parametros)
+    tabela['DATA'] = pd.to_datetime(tabela['DATA'])
+    return tabela
+
+
+def evolucao_os(os_, desde=None, banco=None):
+    """% concluído, atrasadas e último DT FIM de uma OS em cada retrato."""
+    desde = pd.Timestamp(desde or '1900-01-01').strftime('%Y-%m-%d')
+    consulta = """
+        SELECT s.data AS "DATA",
+               COUNT(*) AS "ATIVIDADES",
+               AVG(a.pct_concluido) AS "% CONCLUÍDO MÉDIO",
+               SUM(a.status = 'Atrasado') AS "ATRASADAS",
+               MAX(a.dt_fim) AS "ÚLTIMO DT FIM"
+        FROM atividades a
+        JOIN snapshots s ON s.id = a.snapshot_id
+        WHERE a.os = ? AND s.data >= ?
+        GROUP BY s.id
+        ORDER BY s.data, s.id
+    """
+    with closing(conectar(banco)) as con:
+        tabela = pd.read_sql_query(consulta, con, params=[str(os_), desde])
+    for coluna in ['DATA', 'ÚLTIMO DT FIM']:
+        tabela[coluna] = pd.to_datetime(tabela[coluna])
+    return tabela
+
+
+def resumo(banco=None):
+    """Nº de retratos, o período coberto (primeira e última data) e o id do
+    último retrato gravado (muda a cada gravação; serve de chave de cache)."""
+    with closing(conectar(banco)) as con:
+        return con.execute(
+            "SELECT COUNT(*), MIN(data), MAX(data), MAX(id) FROM snapshots"
+        ).fetchone()
+
+
+def figura_tendencia(tabela, titulo):
+    """Linhas de atrasadas e concluídas e o % médio (eixo da direita)."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for coluna, cor in [('ATRASADAS', '#C00000'), ('CONCLUÍDAS', '#70AD47')]:
+        fig.add_trace(go.Scatter(
+            x=tabela['DATA'], y=tabela[coluna], name=coluna.capitalize(),
+            mode='lines+markers', line=dict(color=cor, width=2)
+        ))
+    fig.add_trace(go.Scatter(
+        x=tabela['DATA'], y=tabela['% CONCLUÍDO MÉDIO'], name="% concluído médio",
+        mode='lines', line=dict(color='#4472C4', dash='dot'), yaxis='y2'
+    ))
+    fig.update_layout(
+        title=dict(text=titulo, font=dict(size=14)),
+        xaxis=dict(type='date', tickformat='%d/%m/%y', showgrid=True),
+        yaxis=dict(title="Atividades", rangemode='tozero'),
+        yaxis2=dict(
+            title="%", overlaying='y', side='right', range=[0, 100], showgrid=False
+        ),
+        height=380,
+        margin=dict(l=60, r=60, t=60, b=20),
+        hovermode='x unified',
+        legend=dict(orientation='h', y=-0.15),
+        plot_bgcolor='white'
+    )
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava planilhas no histórico.")
+    parser.add_argument('planilhas', nargs='+')
+    parser.add_argument(
+        '--data', nargs='+',
+        help="data de cada planilha (AAAA-MM-DD; padrão: hoje)"
+    )
+    parser.add_argument('--banco', default=None, help=f"padrão: {BANCO_PADRAO}")
+    args = parser.parse_args()
+
+    import painel
+    from leitura import hash_conteudo
+
+    datas = args.data or [None] * len(args.planilhas)
+    if len(datas) != len(args.planilhas):
+        parser.error("informe uma --data para cada planilha")
+
+    for caminho, data in zip(args.planilhas, datas):
+        data = pd.Timestamp(data or pd.Timestamp.today()).normalize()
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+        chave = hash_conteudo(conteudo)
+        df, _ = painel.carregar(conteudo, chave)
+        df = df.assign(STATUS=painel.definir_status(df, data))
+        snapshot_id = gravar_snapshot(
+            df, chave, data, os.path.basename(caminho), args.banco
+        )
+        if snapshot_id is None:
+            print(f"{caminho}: erro ao gravar no banco", file=sys.stderr)
+        else:
+            print(f"{caminho}: {len(df)} atividades em {data:%d/%m/%Y} (retrato {snapshot_id})")
+
+
+if __name__ == '__main__':
+    main()
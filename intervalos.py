@@ -0,0 +1,136 @@
+# =====================================================
+# ÍNDICE DE INTERVALOS (DT INICIO / DT FIM)
+# =====================================================
+# Montado uma vez por planilha. As atividades ficam separadas em classes de
+# duração (até 1 h, 4 h, 16 h, 64 h..., de 4 em 4 vezes) e, em cada classe,
+# ordenadas pelo início. Numa classe em que nenhuma dura mais que D, as que
+# cruzam [a, b] estão entre as que começam em [a - D, b]: duas buscas
+# binárias limitam o trecho e só ele é conferido. Como as durações de uma
+# classe diferem no máximo 4×, a maior parte do trecho cruza [a, b]; uma
+# atividade longa (ou com o DT FIM digitado errado) fica na classe dela e
+# não alarga a busca das outras.
+#
+# Para contagens basta uma varredura dos extremos ordenados: ativas em [a, b]
+# = (nº de inícios <= b) - (nº de fins < a), duas buscas binárias, sem listar
+# as atividades.
+import numpy as np
+import pandas as pd
+
+# Um salto maior que este entre datas vizinhas (ex.: ano digitado errado)
+# não estica a grade de dias dos quadros
+SALTO_MAX_GRADE = np.timedelta64(366, 'D')
+
+
+def faixa_continua(inicio, fim):
+    """(primeiro dia, último dia) da grade diária de atividades [inicio, fim].
+
+    Vai do primeiro início ao último fim do bloco contínuo de datas que
+    contém a mediana: datas isoladas a mais de SALTO_MAX_GRADE das demais
+    ficam de fora da grade (as atividades delas ainda contam nos dias dela).
+    """
+    inicio = np.sort(np.asarray(inicio, dtype='datetime64[ns]'))
+    fim = np.sort(np.asarray(fim, dtype='datetime64[ns]'))
+    meio = len(inicio) // 2
+    saltos = np.flatnonzero(np.diff(inicio[:meio + 1]) > SALTO_MAX_GRADE)
+    primeiro = inicio[saltos[-1] + 1] if len(saltos) else inicio[0]
+    saltos = meio + np.flatnonzero(np.diff(fim[meio:]) > SALTO_MAX_GRADE)
+    ultimo = fim[saltos[0]] if len(saltos) else fim[-1]
+    return pd.Timestamp(primeiro).normalize(), pd.Timestamp(max(primeiro, ultimo)).normalize()
+
+
+class IndiceIntervalos:
+    def __init__(self, df, col_inicio='DT INICIO', col_fim='DT FIM'):
+        inicio = df[col_inicio].to_numpy(dtype='datetime64[ns]')
+        fim = df[col_fim].to_numpy(dtype='datetime64[ns]')
+
+        validas = ~(np.isnat(inicio) | np.isnat(fim))
+        posicoes = np.flatnonzero(validas)
+        ordem = np.argsort(inicio[posicoes], kind='stable')
+
+        self.posicoes = posicoes[ordem]
+        self.inicio = inicio[self.posicoes]
+        # Fim antes do início (erro de digitação) conta como um instante só,
+        # para as contagens por extremos não ficarem negativas
+        self.fim = np.maximum(fim[self.posicoes], self.inicio)
+        self.fim_ordenado = np.sort(self.fim)
+
+        # (inícios, fins, posições, maior duração) de cada classe de duração,
+        # na ordem do início (a seleção mantém a ordem do índice); os
+        # instantes em ns (int64), que as buscas comparam mais rápido
+        inicio_ns = self.inicio.view(np.int64)
+        fim_ns = self.fim.view(np.int64)
+        duracao = fim_ns - inicio_ns
+        horas = duracao / 3.6e12
+        classe = np.ceil(np.log(np.maximum(horas, 1)) / np.log(4)).astype(np.int64)
+        self.classes = []
+        for c in np.unique(classe):
+            sel = np.flatnonzero(classe == c)
+            self.classes.append(
+                (inicio_ns[sel], fim_ns[sel], self.posicoes[sel], duracao[sel].max())
+            )
+
+    def __len__(self):
+        return len(self.posicoes)
+
+    def sobrepoe(self, a, b):
+        """Posições (no df original, ordenadas) das atividades que cruzam [a, b]."""
+        a = pd.Timestamp(a).as_unit('ns').value
+        b = pd.Timestamp(b).as_unit('ns').value
+        partes = [np.empty(0, dtype=self.posicoes.dtype)]
+        for inicio, fim, posicoes, maior_duracao in self.classes:
+            # Começam em [a - maior duração, b] (b + 1 exclusivo: ns inteiros)
+            ini, fim_trecho = np.searchsorted(inicio, [a - maior_duracao, b + 1])
+            partes.append(posicoes[ini:fim_trecho][fim[ini:fim_trecho] >= a])
+        return np.sort(np.concatenate(partes))
+
+    def ativas_em(self, dia):
+        """Posições das atividades em execução em algum momento do `dia`."""
+        dia = pd.Timestamp(dia).normalize()
+        return self.sobrepoe(dia, dia + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns'))
+
+    def contar(self, a, b):
+        """Nº de atividades que cruzam [a, b], sem listá-las."""
+        a = np.datetime64(pd.Timestamp(a), 'ns')
+        b = np.datetime64(pd.Timestamp(b), 'ns')
+        return int(
+            np.searchsorted(self.inicio, b, side='right') -
+            np.searchsorted(self.fim_ordenado, a, side='left')
+        )
+
+    def simultaneas_por_dia(self, grupos, inicio=None, fim=None):
+        """Nº de atividades em execução em cada dia, por grupo (ex.: área).
+
+        `grupos` é uma coluna do df do índice. Retorna um DataFrame grupo ×
+        dia, de `inicio` a `fim` (por padrão, a faixa_continua das atividades:
+        um DT FIM digitado anos à frente não vira milhares de colunas).
+        """
+        valores = pd.Series(grupos).to_numpy()[self.posicoes]
+        validas = pd.notna(valores)
+        if not validas.any():
+            return pd.DataFrame()
+        codigos, nomes = pd.factorize(valores[validas], sort=True)
+        ini_validas = self.inicio[validas]
+        fim_validas = self.fim[validas]
+
+        faixa = faixa_continua(ini_validas, fim_validas)
+        inicio = faixa[0] if inicio is None else pd.Timestamp(inicio).normalize()
+        fim = faixa[1] if fim is None else pd.Timestamp(fim).normalize()
+        dias = pd.date_range(inicio, fim, freq='D')
+        d0 = dias.to_numpy(dtype='datetime64[ns]')
+        d1 = d0 + np.timedelta64(1, 'D') - np.timedelta64(1, 'ns')
+
+        contagens = np.empty((len(nomes), len(dias)), dtype=np.int32)
+        for g in range(len(nomes)):
+            # Inícios já estão ordenados (o índice é ordenado pelo início)
+            no_grupo = codigos == g
+            ini_g = ini_validas[no_grupo]
+            fim_g = np.sort(fim_validas[no_grupo])
+            contagens[g] = (
+                np.searchsorted(ini_g, d1, side='right') -
+                np.searchsorted(fim_g, d0, side='left')
+            )
+        return pd.DataFrame(
+            contagens,
+            index=pd.Index(np.asarray(nomes), name=getattr(grupos, 'name', None)),
+            columns=dias
+        )
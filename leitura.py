@@ -0,0 +1,727 @@
+# =====================================================
+# LEITURA DA PLANILHA
+# =====================================================
+# Lê só as colunas usadas pelos painéis da aba "Programação Detalhada",
+# com o engine mais rápido disponível (calamine > openpyxl), e grava um
+# arquivo Parquet ao lado (sidecar) chaveado pelo hash do conteúdo, para que
+# reabrir a mesma planilha não precise passar pelo Excel de novo. A pasta
+# dos sidecars tem limite de tamanho e de idade (limpar_cache).
+# Antes da leitura completa, o início da aba é conferido (validar_planilha).
+import hashlib
+import io
+import os
+import posixpath
+import tempfile
+import time
+import zipfile
+from contextlib import closing
+from xml.etree import ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+ABA = "Programação Detalhada"
+LINHA_CABECALHO = 6
+
+COLUNAS = [
+    'OS', 'WK', 'PROG.', 'SUPERVISÃO', 'CLIENTE',
+    'PROGRAMAÇÃO | PROG. DETALHADA',
+    'DT INICIO', 'DT FIM', 'DATA CONTRATUAL',
+    'ATUALIZAÇÃO', 'LT OPERAÇÃO', '% CONCLUÍDO',
+]
+COLUNAS_DATA = ['DT INICIO', 'DT FIM', 'DATA CONTRATUAL']
+COLUNAS_NUMERICAS = ['ATUALIZAÇÃO', 'LT OPERAÇÃO', '% CONCLUÍDO']
+
+# Mudar quando COLUNAS ou o tratamento abaixo mudar, para invalidar sidecars
+VERSAO_SIDECAR = 2
+
+PASTA_CACHE = os.environ.get(
+    'PROGRAMACAO_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'programacao_oficina')
+)
+# Limites da pasta dos sidecars: acima de CACHE_MAX_MB, ou sem uso há mais de
+# CACHE_MAX_DIAS, saem os usados há mais tempo. Os usados nos últimos
+# CACHE_EM_USO_S segundos ficam (ler_varias ainda vai abri-los).
+CACHE_MAX_MB = float(os.environ.get('PROGRAMACAO_CACHE_MB', 1024))
+CACHE_MAX_DIAS = float(os.environ.get('PROGRAMACAO_CACHE_DIAS', 30))
+CACHE_EM_USO_S = 600
+
+
+def normalizar_nome(nome):
+    return ' '.join(str(nome).replace('\n', ' ').split())
+
+
+def normalizar_colunas(df):
+    df.columns = (
+        df.columns
+        .str.strip()
+        .str.replace('\n', ' ', regex=False)
+        .str.replace(r'\s+', ' ', regex=True)
+    )
+    return df
+
+
+def hash_conteudo(conteudo):
+    return hashlib.md5(conteudo).hexdigest()
+
+
+def engine_excel():
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+
+def _erros_calamine():
+    # Erros do calamine com pacotes fora do padrão (ex.: sharedStrings fora
+    # de xl/), que o leitor em blocos lê seguindo as relações do pacote
+    try:
+        from python_calamine import CalamineError
+        return (CalamineError,)
+    except ImportError:
+        return ()
+
+
+def mostra_previa(conteudo, engine=None):
+    """Se ler_programacao manda as primeiras linhas antes da leitura inteira.
+
+    Só com o calamine e em planilhas a partir de TAMANHO_MIN_PREVIA bytes;
+    nas menores a leitura inteira termina antes da prévia.
+    """
+    if engine is None:
+        engine = engine_excel()
+    return engine == 'calamine' and len(conteudo) >= TAMANHO_MIN_PREVIA
+
+
+def _caminho_sidecar(chave):
+    return os.path.join(PASTA_CACHE, f"{chave}_v{VERSAO_SIDECAR}.parquet")
+
+
+def _usar_sidecar(caminho):
+    # True se o sidecar existe; a data de modificação marca o último uso,
+    # que decide a ordem de saída em limpar_cache
+    try:
+        os.utime(caminho)
+        return True
+    except OSError:
+        return False
+
+
+def _ler_sidecar(chave):
+    caminho = _caminho_sidecar(chave)
+    if not _usar_sidecar(caminho):
+        return None
+    try:
+        return pd.read_parquet(caminho)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def _gravar_sidecar(df, chave):
+    try:
+        os.makedirs(PASTA_CACHE, exist_ok=True)
+        caminho = _caminho_sidecar(chave)
+        temp = f"{caminho}.{os.getpid()}.tmp"
+        df.to_parquet(temp, index=False)
+        os.replace(temp, caminho)
+    except (ImportError, OSError, ValueError):
+        return False
+    limpar_cache()
+    return True
+
+
+def limpar_cache(max_mb=None, max_dias=None):
+    """Apaga os sidecars usados há mais tempo além dos limites da pasta.
+
+    Sidecars de outra VERSAO_SIDECAR e temporários largados saem primeiro.
+    Roda a cada sidecar gravado. Retorna o nº de arquivos apagados.
+    """
+    max_bytes = (CACHE_MAX_MB if max_mb is None else max_mb) * 1e6
+    max_idade = (CACHE_MAX_DIAS if max_dias is None else max_dias) * 86400
+    atual = f"_v{VERSAO_SIDECAR}.parquet"
+    try:
+        with os.scandir(PASTA_CACHE) as entradas:
+            arquivos = [
+                (a.name.endswith(atual), a.stat().st_mtime, a.stat().st_size, a.path)
+                for a in entradas
+                if a.is_file() and a.name.endswith(('.parquet', '.tmp'))
+            ]
+    except OSError:
+        return 0
+
+    agora = time.time()
+    total = sum(tamanho for _, _, tamanho, _ in arquivos)
+    apagados = 0
+    for valido, uso, tamanho, caminho in sorted(arquivos):
+        idade = agora - uso
+        if idade < CACHE_EM_USO_S:
+            continue
+        if valido and total <= max_bytes and idade <= max_idade:
+            break
+        try:
+            os.remove(caminho)
+        except OSError:
+            continue
+        total -= tamanho
+        apagados += 1
+    return apagados
+
+
+def _ler_excel(conteudo, engine):
+    colunas = set(COLUNAS)
+    df = pd.read_excel(
+        io.BytesIO(conteudo),
+        sheet_name=ABA,
+        header=LINHA_CABECALHO,
+        usecols=lambda c: normalizar_nome(c) in colunas,
+        engine=engine
+    )
+    return _tipar_colunas(normalizar_colunas(df))
+
+
+def _tipar_colunas(df):
+    # Tipagem das colunas com valores misturados, para o Parquet aceitar.
+    # Datas e números já saem no tipo final; o resto vira texto.
+    for col in df.columns:
+        if col in COLUNAS_DATA:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        elif col in COLUNAS_NUMERICAS:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        elif df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def ler_programacao(conteudo, chave=None, usar_sidecar=True, ao_ler_bloco=None):
+    """Lê a aba "Programação Detalhada" a partir dos bytes do xlsx.
+
+    Retorna (df, tempos), onde `tempos` tem a duração em segundos de cada
+    etapa e de onde os dados vieram ('sidecar', o engine do Excel ou
+    'blocos'). Uma planilha sem a aba, o cabeçalho ou as colunas esperadas
+    levanta PlanilhaInvalida antes da leitura completa.
+
+    Com `ao_ler_bloco`, as linhas chegam também em blocos enquanto a aba é
+    lida: ao_ler_bloco(bloco, linhas_lidas). Com o calamine, só uma prévia
+    com as primeiras linhas (nas planilhas grandes) e depois a leitura rápida
+    da aba inteira; sem ele, a leitura toda é feita em blocos.
+    """
+    tempos = {}
+
+    t = time.perf_counter()
+    if chave is None:
+        chave = hash_conteudo(conteudo)
+    tempos['hash'] = time.perf_counter() - t
+
+    if usar_sidecar:
+        t = time.perf_counter()
+        df = _ler_sidecar(chave)
+        tempos['ler_sidecar'] = time.perf_counter() - t
+        if df is not None:
+            tempos['origem'] = 'sidecar'
+            return df, tempos
+
+    engine = engine_excel()
+    t = time.perf_counter()
+    if ao_ler_bloco is None:
+        validar_planilha(conteudo)
+        tempos['validacao'] = time.perf_counter() - t
+    elif engine == 'calamine':
+        if mostra_previa(conteudo, engine):
+            with closing(ler_em_blocos(conteudo, LINHAS_PREVIA)) as blocos:
+                primeiro = next(blocos)
+            ao_ler_bloco(primeiro, len(primeiro))
+            tempos['previa'] = time.perf_counter() - t
+        else:
+            validar_planilha(conteudo)
+            tempos['validacao'] = time.perf_counter() - t
+    else:
+        engine = 'blocos'
+
+    t = time.perf_counter()
+    if engine == 'calamine':
+        try:
+            df = _ler_excel(conteudo, engine)
+        except _erros_calamine():
+            engine = 'blocos'
+    elif engine != 'blocos':
+        df = _ler_excel(conteudo, engine)
+    if engine == 'blocos':
+        df = _ler_em_blocos(conteudo, ao_ler_bloco)
+    tempos['ler_excel'] = time.perf_counter() - t
+    tempos['origem'] = engine
+
+    if usar_sidecar:
+        t = time.perf_counter()
+        _gravar_sidecar(df, chave)
+        tempos['gravar_sidecar'] = time.perf_counter() - t
+
+    return df, tempos
+
+
+# =====================================================
+# VÁRIAS PLANILHAS
+# =====================================================
+# Cada planilha (bytes enviados ou arquivo de uma pasta) é lida num processo
+# separado, que grava o sidecar Parquet e devolve só a chave. O processo
+# principal junta os sidecars como tabelas Arrow, marcando a origem, e só
+# converte para DataFrame no fim: nunca há um DataFrame bruto por planilha
+# na memória ao mesmo tempo.
+#
+# O painel só lê pastas do servidor dentro de PROGRAMACAO_PASTAS (várias
+# separadas por os.pathsep); sem nenhuma configurada, não lê pasta alguma.
+PASTAS_PERMITIDAS = [
+    os.path.realpath(p)
+    for p in os.environ.get('PROGRAMACAO_PASTAS', '').split(os.pathsep) if p
+]
+
+
+def caminho_permitido(caminho, raizes=None):
+    """True se `caminho`, com os links resolvidos, fica dentro de uma das
+    `raizes` (padrão: PASTAS_PERMITIDAS)."""
+    real = os.path.realpath(caminho)
+    return any(
+        os.path.commonpath([real, raiz]) == raiz
+        for raiz in (PASTAS_PERMITIDAS if raizes is None else raizes)
+    )
+
+
+def listar_planilhas(pasta, raizes=None):
+    """Arquivos .xlsx de uma pasta (sem os temporários '~$' do Excel).
+
+    A pasta precisa estar dentro de uma das `raizes` (caminho_permitido);
+    se não estiver, levanta PermissionError. Links que apontam para fora
+    delas são ignorados.
+    """
+    if not pasta:
+        return []
+    if not caminho_permitido(pasta, raizes):
+        raise PermissionError(f"Pasta fora das permitidas: {pasta}")
+    if not os.path.isdir(pasta):
+        return []
+    caminhos = (
+        os.path.join(pasta, nome) for nome in os.listdir(pasta)
+        if nome.lower().endswith('.xlsx') and not nome.startswith('~$')
+    )
+    return sorted(c for c in caminhos if caminho_permitido(c, raizes))
+
+
+def _conteudo(origem):
+    if isinstance(origem, (bytes, bytearray)):
+        return bytes(origem)
+    with open(origem, 'rb') as f:
+        return f.read()
+
+
+def chave_fontes(fontes):
+    """Chave única para um conjunto de (nome, bytes ou caminho).
+
+    Bytes entram pelo hash do conteúdo; caminhos, por tamanho e data de
+    modificação (sem reler o arquivo).
+    """
+    partes = []
+    for nome, origem in fontes:
+        if isinstance(origem, (bytes, bytearray)):
+            partes.append(f"{nome}|{hash_conteudo(origem)}")
+        else:
+            st = os.stat(origem)
+            partes.append(f"{nome}|{os.path.abspath(origem)}|{st.st_size}|{st.st_mtime_ns}")
+    return hash_conteudo("\n".join(partes).encode('utf-8'))
+
+
+def _ler_fonte(fonte):
+    # Executado nos processos filhos
+    nome, origem = fonte
+    t = time.perf_counter()
+    conteudo = _conteudo(origem)
+    chave = hash_conteudo(conteudo)
+
+    if _usar_sidecar(_caminho_sidecar(chave)):
+        return nome, chave, None, 'sidecar', time.perf_counter() - t
+
+    try:
+        validar_planilha(conteudo)
+    except PlanilhaInvalida as e:
+        raise PlanilhaInvalida(f"{nome}: {e}") from None
+    engine = engine_excel()
+    df = _ler_excel(conteudo, engine)
+    if _gravar_sidecar(df, chave):
+        df = None
+    return nome, chave, df, engine, time.perf_counter() - t
+
+
+def _juntar_sidecars(lidas):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabelas = []
+    for nome, chave, _ in lidas:
+        tabela = pq.read_table(_caminho_sidecar(chave))
+        tabelas.append(tabela.append_column(
+            'ORIGEM', pa.array([nome] * tabela.num_rows, pa.string())
+        ))
+    try:
+        tabela = pa.concat_tables(tabelas, promote_options='permissive')
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Tipos que não se conciliam entre planilhas (ex.: OS número numa e
+        # texto noutra): o pandas junta essas colunas como object
+        return pd.concat([t.to_pandas() for t in tabelas], ignore_index=True)
+    return tabela.to_pandas()
+
+
+def ler_varias(fontes, processos=None):
+    """Lê várias planilhas e junta numa só, com a coluna ORIGEM.
+
+    `fontes` é uma lista de (nome, bytes ou caminho do xlsx). Retorna
+    (df, tempos), como ler_programacao.
+    """
+    tempos = {}
+    if not fontes:
+        raise ValueError("Nenhuma planilha informada")
+
+    t = time.perf_counter()
+    processos = min(processos or os.cpu_count() or 1, len(fontes))
+    if processos > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn, não fork: o servidor Streamlit tem várias threads, e um
+        # fork copiaria travas seguradas por elas (ex.: a do registro)
+        with ProcessPoolExecutor(
+            max_workers=processos, mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            resultados = list(executor.map(_ler_fonte, fontes))
+    else:
+        resultados = [_ler_fonte(f) for f in fontes]
+    tempos['ler_planilhas'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    em_disco = [(nome, chave, df) for nome, chave, df, _, _ in resultados if df is None]
+    em_memoria = [(nome, df) for nome, _, df, _, _ in resultados if df is not None]
+
+    partes = []
+    if em_disco:
+        try:
+            partes.append(_juntar_sidecars(em_disco))
+        except ImportError:
+            partes.extend(
+                _ler_sidecar(chave).assign(ORIGEM=nome) for nome, chave, _ in em_disco
+            )
+    partes.extend(df.assign(ORIGEM=nome) for nome, df in em_memoria)
+    df = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+    df['ORIGEM'] = df['ORIGEM'].astype('category')
+    tempos['juntar'] = time.perf_counter() - t
+
+    origens = pd.Series([r[3] for r in resultados]).value_counts()
+    tempos['origem'] = f"{len(fontes)} planilhas (" + ", ".join(
+        f"{n} {o}" for o, n in origens.items()
+    ) + ")"
+    return df, tempos
+
+
+# =====================================================
+# VALIDAÇÃO E LEITURA EM BLOCOS
+# =====================================================
+# O XML da aba é lido direto do .xlsx (um zip), linha a linha, sem montar a
+# planilha inteira: o cabeçalho é conferido nas primeiras linhas, com erro
+# em milissegundos se a aba ou as colunas não estão lá, e as linhas de dados
+# saem em blocos já tipados, para o painel mostrar números enquanto lê.
+# Os textos compartilhados (sharedStrings) são lidos só até o índice usado.
+# As partes do pacote são achadas pelas relações (_rels), e as datas seguem
+# o sistema do livro (1900 ou 1904).
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PACOTE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Linhas do início da aba onde o cabeçalho é procurado, para a mensagem de erro
+LINHAS_BUSCA_CABECALHO = 30
+
+LINHAS_POR_BLOCO = 5000
+
+# Com o calamine, planilhas abaixo deste tamanho (bytes) são lidas inteiras
+# em menos de um segundo; nas maiores, as LINHAS_PREVIA primeiras vêm antes.
+# A prévia custa ~100 ms a mais (XML das primeiras linhas em Python): abaixo
+# do limite ela chegaria depois da leitura inteira
+TAMANHO_MIN_PREVIA = 2_000_000
+LINHAS_PREVIA = 1000
+
+# Datas do Excel são dias desde esta data (sistema 1900, o padrão) ou, com
+# date1904 no workbook.xml, desde 01/01/1904
+ORIGEM_DATA_EXCEL = pd.Timestamp('1899-12-30')
+ORIGEM_DATA_EXCEL_1904 = pd.Timestamp('1904-01-01')
+
+
+class PlanilhaInvalida(ValueError):
+    """Planilha sem a aba, o cabeçalho ou as colunas que os painéis usam."""
+
+
+def _abrir_xlsx(conteudo):
+    try:
+        return zipfile.ZipFile(io.BytesIO(conteudo))
+    except zipfile.BadZipFile:
+        raise PlanilhaInvalida(
+            "O arquivo não é uma planilha .xlsx (Excel 2007 ou mais novo)"
+        ) from None
+
+
+def _alvo(parte, alvo):
+    # Target de uma relação: absoluto no pacote ou relativo à pasta da parte
+    if alvo.startswith('/'):
+        return alvo.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(parte), alvo))
+
+
+def _relacoes(xlsx, parte):
+    # {Id: (Type, parte de destino)} do .rels da `parte` ('' = o pacote)
+    pasta, nome = posixpath.split(parte)
+    relacoes = ET.fromstring(xlsx.read(posixpath.join(pasta, '_rels', nome + '.rels')))
+    return {
+        r.get('Id'): (r.get('Type', ''), _alvo(parte, r.get('Target', '')))
+        for r in relacoes.iter(_NS_PACOTE + 'Relationship')
+    }
+
+
+def _partes_livro(xlsx, aba):
+    """(XML da aba, XML dos textos compartilhados ou None, origem das datas).
+
+    Os caminhos saem das relações do pacote (_rels), não de nomes fixos.
+    """
+    try:
+        livro = next(
+            alvo for tipo, alvo in _relacoes(xlsx, '').values()
+            if tipo.endswith('/officeDocument')
+        )
+        relacoes = _relacoes(xlsx, livro)
+        raiz = ET.fromstring(xlsx.read(livro))
+    except (KeyError, StopIteration, ET.ParseError):
+        raise PlanilhaInvalida("O arquivo não é uma planilha .xlsx válida") from None
+
+    ids = {a.get('name'): a.get(_NS_REL + 'id') for a in raiz.iter(_NS + 'sheet')}
+    if aba not in ids:
+        raise PlanilhaInvalida(
+            f'Aba "{aba}" não encontrada. Abas da planilha: '
+            + ", ".join(f'"{nome}"' for nome in ids)
+        )
+    if ids[aba] not in relacoes:
+        raise PlanilhaInvalida(f'Aba "{aba}" sem o XML correspondente no arquivo')
+    textos = next(
+        (alvo for tipo, alvo in relacoes.values() if tipo.endswith('/sharedStrings')),
+        None
+    )
+    # Planilhas no sistema de datas de 1904 (Excel antigo do Mac)
+    propriedades = raiz.find(_NS + 'workbookPr')
+    data1904 = propriedades is not None and propriedades.get('date1904') in ('1', 'true')
+    origem = ORIGEM_DATA_EXCEL_1904 if data1904 else ORIGEM_DATA_EXCEL
+    return relacoes[ids[aba]][1], textos, origem
+
+
+def _texto(elemento):
+    # <si> / <is>: texto simples em <t> ou em trechos <r><t> (sem a fonética <rPh>)
+    simples = elemento.find(_NS + 't')
+    if simples is not None:
+        return simples.text or ''
+    return ''.join(r.findtext(_NS + 't') or '' for r in elemento.iter(_NS + 'r'))
+
+
+class _TextosCompartilhados:
+    """sharedStrings lido sob demanda, até o maior índice pedido."""
+
+    def __init__(self, xlsx, caminho):
+        self._textos = []
+        self._eventos = None
+        if caminho is not None and caminho in xlsx.namelist():
+            self._eventos = ET.iterparse(xlsx.open(caminho))
+
+    def __getitem__(self, i):
+        while i >= len(self._textos):
+            for _, elemento in self._eventos or ():
+                if elemento.tag == _NS + 'si':
+                    self._textos.append(_texto(elemento))
+                    elemento.clear()
+                    break
+            else:
+                raise PlanilhaInvalida(f"Texto compartilhado {i} não encontrado")
+        return self._textos[i]
+
+
+def _indice_coluna(referencia):
+    # 'AB12' -> 27
+    indice = 0
+    for letra in referencia:
+        if letra.isdigit():
+            break
+        indice = indice * 26 + ord(letra) - 64
+    return indice - 1
+
+
+def _valor_celula(celula, textos):
+    tipo = celula.get('t')
+    if tipo == 'inlineStr':
+        texto = celula.find(_NS + 'is')
+        return None if texto is None else _texto(texto)
+    valor = celula.findtext(_NS + 'v')
+    # Sem valor, vazio (fórmula sem resultado gravado) ou erro (#N/D...)
+    if not valor or tipo == 'e':
+        return None
+    if tipo == 's':
+        return textos[int(valor)]
+    if tipo in ('str', 'd'):
+        return valor
+    if tipo == 'b':
+        return valor == '1'
+    # Números inteiros saem como int, como no pandas.read_excel
+    numero = float(valor)
+    return int(numero) if numero.is_integer() else numero
+
+
+def _linhas_aba(xlsx, caminho, textos):
+    """(nº da linha no Excel, {índice da coluna: valor}) das linhas da aba."""
+    numero = 0
+    for _, elemento in ET.iterparse(xlsx.open(caminho)):
+        if elemento.tag != _NS + 'row':
+            continue
+        numero = int(elemento.get('r', numero + 1))
+        valores = {}
+        posicao = -1
+        for celula in elemento:
+            referencia = celula.get('r')
+            posicao = _indice_coluna(referencia) if referencia else posicao + 1
+            valor = _valor_celula(celula, textos)
+            if valor is not None:
+                valores[posicao] = valor
+        yield numero, valores
+        elemento.clear()
+
+
+def _conferir_cabecalho(linhas, aba, linha_cabecalho):
+    # Consome as linhas até o cabeçalho e devolve {coluna: posição}, na
+    # ordem da aba; se não estiver na linha esperada, procura nas primeiras
+    # linhas para dizer onde está ou o que falta
+    esperada = linha_cabecalho + 1
+    melhor = None
+    for numero, valores in linhas:
+        if numero > LINHAS_BUSCA_CABECALHO:
+            break
+        nomes = {
+            normalizar_nome(v): i for i, v in valores.items() if isinstance(v, str)
+        }
+        achadas = {c: nomes[c] for c in COLUNAS if c in nomes}
+        if numero == esperada and len(achadas) == len(COLUNAS):
+            return dict(sorted(achadas.items(), key=lambda item: item[1]))
+        if achadas and (melhor is None or len(achadas) > len(melhor[1])):
+            melhor = (numero, achadas)
+
+    if melhor is None:
+        raise PlanilhaInvalida(
+            f'Cabeçalho não encontrado na aba "{aba}": nenhuma das colunas '
+            f'esperadas nas primeiras {LINHAS_BUSCA_CABECALHO} linhas '
+            f'(o cabeçalho deve estar na linha {esperada})'
+        )
+    numero, achadas = melhor
+    faltam = [c for c in COLUNAS if c not in achadas]
+    if not faltam:
+        raise PlanilhaInvalida(
+            f'O cabeçalho da aba "{aba}" está na linha {numero}, '
+            f'mas deve estar na linha {esperada}'
+        )
+    onde = "" if numero == esperada else f", que deve estar na linha {esperada}"
+    raise PlanilhaInvalida(
+        f'Faltam colunas no cabeçalho da aba "{aba}" (linha {numero}{onde}): '
+        + ", ".join(faltam)
+    )
+
+
+def validar_planilha(conteudo, aba=ABA, linha_cabecalho=LINHA_CABECALHO):
+    """Confere a aba, a linha do cabeçalho e as colunas lendo só o início.
+
+    Retorna {coluna: posição na aba}; levanta PlanilhaInvalida com o motivo.
+    """
+    with _abrir_xlsx(conteudo) as xlsx:
+        caminho, textos, _ = _partes_livro(xlsx, aba)
+        with closing(_linhas_aba(xlsx, caminho, _TextosCompartilhados(xlsx, textos))) as linhas:
+            return _conferir_cabecalho(linhas, aba, linha_cabecalho)
+
+
+def _datas_excel(serie, origem):
+    # Datas vêm como nº de dias (serial do Excel) ou, às vezes, como texto
+    numeros = pd.to_numeric(serie, errors='coerce')
+    # O Excel guarda as horas com precisão de milissegundo
+    datas = (origem + pd.to_timedelta(numeros, unit='D')).dt.round('ms')
+    textos = serie.where(numeros.isna())
+    if textos.notna().any():
+        datas = datas.fillna(pd.to_datetime(textos, errors='coerce'))
+    return datas.astype('datetime64[us]')
+
+
+def _bloco(linhas, colunas, origem):
+    # Tipos inferidos por coluna, como no pandas.read_excel (vazios = NaN)
+    valores = list(zip(*linhas)) if linhas else [()] * len(colunas)
+    bloco = pd.DataFrame({
+        col: pd.Series(v, dtype=None if v else object)
+        for col, v in zip(colunas, valores)
+    })
+    for col in bloco.columns:
+        if bloco[col].dtype == object:
+            bloco[col] = bloco[col].where(bloco[col].notna(), np.nan)
+    for col in COLUNAS_DATA:
+        bloco[col] = _datas_excel(bloco[col], origem)
+    return _tipar_colunas(bloco)
+
+
+def _linhas_em_blocos(conteudo, linhas_por_bloco, aba, linha_cabecalho):
+    # (colunas, linhas, origem das datas) a cada `linhas_por_bloco` linhas,
+    # com os valores crus
+    with _abrir_xlsx(conteudo) as xlsx:
+        caminho, textos, origem = _partes_livro(xlsx, aba)
+        with closing(_linhas_aba(xlsx, caminho, _TextosCompartilhados(xlsx, textos))) as linhas:
+            posicoes = _conferir_cabecalho(linhas, aba, linha_cabecalho)
+            colunas = list(posicoes)
+            indices = list(posicoes.values())
+
+            acumuladas = []
+            enviou = False
+            ultima = linha_cabecalho + 1
+            for numero, valores in linhas:
+                if not valores:
+                    continue
+                # Linhas em branco entre os dados ficam (vazias), como no
+                # pandas; as do fim da aba, não
+                acumuladas.extend([None] * len(indices) for _ in range(numero - ultima - 1))
+                ultima = numero
+                acumuladas.append([valores.get(i) for i in indices])
+                while len(acumuladas) >= linhas_por_bloco:
+                    yield colunas, acumuladas[:linhas_por_bloco], origem
+                    acumuladas = acumuladas[linhas_por_bloco:]
+                    enviou = True
+            if acumuladas or not enviou:
+                yield colunas, acumuladas, origem
+
+
+def ler_em_blocos(conteudo, linhas_por_bloco=LINHAS_POR_BLOCO, aba=ABA,
+                  linha_cabecalho=LINHA_CABECALHO):
+    """DataFrames de até `linhas_por_bloco` linhas, na ordem da aba.
+
+    O cabeçalho é conferido antes do primeiro bloco (PlanilhaInvalida). Há
+    sempre ao menos um bloco (vazio, se a aba não tiver dados). Os tipos são
+    inferidos bloco a bloco: uma coluna pode sair numérica num e texto noutro.
+    """
+    for colunas, linhas, origem in _linhas_em_blocos(
+        conteudo, linhas_por_bloco, aba, linha_cabecalho
+    ):
+        yield _bloco(linhas, colunas, origem)
+
+
+def _ler_em_blocos(conteudo, ao_ler_bloco=None):
+    """A aba inteira, lida em blocos; o mesmo df que a leitura pelo pandas.
+
+    Os blocos tipados vão para `ao_ler_bloco`; o df final é montado das
+    linhas cruas, com os tipos inferidos na coluna inteira.
+    """
+    todas = []
+    for colunas, linhas, origem in _linhas_em_blocos(
+        conteudo, LINHAS_POR_BLOCO, ABA, LINHA_CABECALHO
+    ):
+        todas.extend(linhas)
+        if ao_ler_bloco is not None:
+            ao_ler_bloco(_bloco(linhas, colunas, origem), len(todas))
+    return _bloco(todas, colunas, origem)
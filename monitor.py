@@ -0,0 +1,109 @@
+# =====================================================
+# ACOMPANHAMENTO DE UMA PLANILHA NO DISCO
+# =====================================================
+# Para a planilha que os programadores salvam numa unidade de rede montada
+# no servidor. Uma thread por arquivo confere tamanho e data de modificação
+# (os.stat, sem abrir o arquivo) a cada `intervalo` segundos. Só quando
+# eles mudam o arquivo é lido; se o conteúdo (hash) também mudou, a
+# planilha nova é tratada ali mesmo, fora da thread do painel.
+#
+# A troca é atômica: o estado (versão, valor, erro) é um objeto só,
+# substituído numa atribuição. Quem lê `estado` vê a versão antiga inteira
+# ou a nova inteira, nunca uma mistura. Se a leitura falhar (ex.: arquivo
+# ainda sendo salvo), a versão anterior continua valendo e a leitura é
+# tentada de novo quando o arquivo mudar outra vez.
+import os
+import threading
+import time
+from collections import namedtuple
+
+from leitura import hash_conteudo
+
+INTERVALO_PADRAO = float(os.environ.get('PROGRAMACAO_MONITOR_INTERVALO', 5))
+
+# versao: nº da leitura publicada (0 = nenhuma ainda); valor: o que
+# `carregar` devolveu; erro: a exceção da última tentativa (None se deu certo)
+Estado = namedtuple('Estado', 'versao chave valor atualizado_em erro')
+
+
+class MonitorPlanilha:
+    """Relê `caminho` numa thread sempre que o arquivo muda.
+
+    `carregar(conteudo, chave, anterior)` trata a planilha nova e devolve o
+    valor publicado em `estado.valor` (`anterior` é o valor da versão
+    anterior, ou None na primeira leitura).
+    """
+
+    def __init__(self, caminho, carregar, intervalo=INTERVALO_PADRAO):
+        self.caminho = os.path.abspath(caminho)
+        self.nome = os.path.basename(caminho)
+        self.intervalo = intervalo
+        self._carregar = carregar
+        self._assinatura = None     # (tamanho, mtime) da última leitura
+        self._estado = Estado(0, None, None, None, None)
+        self._lido = threading.Event()      # primeira tentativa concluída
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._rodar, name=f"monitor {self.nome}", daemon=True
+        )
+
+    @property
+    def estado(self):
+        return self._estado
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+
+    def aguardar(self, timeout=None):
+        """Espera a primeira leitura e retorna o estado."""
+        self._lido.wait(timeout)
+        return self._estado
+
+    def _rodar(self):
+        while True:
+            self.conferir()
+            self._lido.set()
+            if self._parar.wait(self.intervalo):
+                return
+
+    def conferir(self):
+        """Relê o arquivo se ele mudou. Retorna True se publicou versão nova."""
+        try:
+            info = os.stat(self.caminho)
+        except OSError as e:
+            self._falhar(e, None)
+            return False
+        assinatura = (info.st_size, info.st_mtime_ns)
+        if assinatura == self._assinatura:
+            return False
+
+        anterior = self._estado
+        try:
+            with open(self.caminho, 'rb') as f:
+                conteudo = f.read()
+            chave = hash_conteudo(conteudo)
+            if chave == anterior.chave:
+                # Arquivo salvo de novo sem mudança: nada a tratar
+                self._assinatura = assinatura
+                if anterior.erro is not None:
+                    self._estado = anterior._replace(erro=None)
+                return False
+            valor = self._carregar(conteudo, chave, anterior.valor)
+        except Exception as e:
+            self._falhar(e, assinatura)
+            return False
+
+        self._assinatura = assinatura
+        self._estado = Estado(
+            anterior.versao + 1, chave, valor, time.time(), None
+        )
+        return True
+
+    def _falhar(self, erro, assinatura):
+        # Mantém a versão publicada; a assinatura que falhou não é relida
+        self._assinatura = assinatura
+        self._estado = self._estado._replace(erro=erro)
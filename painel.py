@@ -0,0 +1,567 @@
+# =====================================================
+# NÚCLEO DO PAINEL (SEM STREAMLIT)
+# =====================================================
+# Carga, tratamento, filtros, KPIs e figura do Gantt, para uso tanto pelos
+# apps Streamlit quanto pelo relatório em linha de comando (relatorio.py).
+# O plotly só é importado quando uma figura é montada.
+import time
+
+import numpy as np
+import pandas as pd
+
+from gantt import (
+    tracos_gantt_barras, tracos_gantt_linhas, tracos_gantt_webgl, tracos_risco
+)
+from leitura import hash_conteudo, ler_programacao, ler_varias
+from revisoes import comparar_revisoes, tabela_mudancas
+
+STATUS_CATEGORIAS = ["Planejado", "Em Andamento", "Atrasado", "Concluído"]
+
+# Rótulo da área no Gantt da oficina quando PROG. está em branco
+AREA_VAZIA = "SEM ÁREA"
+
+FILTROS = {
+    'OS': "OS",
+    'WK': "Semana (WK)",
+    'PROG.': "Área",
+    'SUPERVISÃO': "Supervisor",
+    'CLIENTE': "Cliente",
+}
+
+# Esquema compacto do df carregado: categorias para as colunas de poucos
+# valores distintos e texto em Arrow na descrição. Os numéricos ficam em
+# float64: em float32, 99.999999% vira 100.0 e a atividade passaria a
+# "Concluído"
+COLUNAS_CATEGORIA = ['OS', 'WK', 'PROG.', 'SUPERVISÃO', 'CLIENTE', 'ORIGEM']
+COLUNAS_TEXTO = ['PROGRAMAÇÃO | PROG. DETALHADA']
+
+# Paleta Power BI
+CORES_POWERBI = [
+    '#4472C4', '#ED7D31', '#A5A5A5', '#FFC000',
+    '#5B9BD5', '#70AD47', '#264478', '#9E480E'
+]
+
+# Paleta do painel estilo Power BI (com dois tons a mais)
+CORES_POWERBI_ESTENDIDA = [
+    '#4472C4',  # Azul
+    '#ED7D31',  # Laranja
+    '#A5A5A5',  # Cinza
+    '#FFC000',  # Amarelo
+    '#5B9BD5',  # Azul claro
+    '#70AD47',  # Verde
+    '#264478',  # Azul escuro
+    '#9E480E',  # Marrom
+    '#636363',  # Cinza escuro
+    '#997300',  # Amarelo escuro
+]
+
+# =====================================================
+# TRATAMENTO
+# =====================================================
+def calcular_percentual(df):
+    original = df['% CONCLUÍDO_ORIGINAL']
+    lt = df['LT OPERAÇÃO']
+    return pd.Series(
+        np.select(
+            [original.notna(), lt > 0],
+            [original, df['ATUALIZAÇÃO'] / lt * 100],
+            0.0
+        ),
+        index=df.index
+    )
+
+def definir_status(df, hoje):
+    fim = df['DT FIM']
+    pct = df['% CONCLUÍDO']
+    vencida = fim < hoje
+    status = np.select(
+        [fim.isna(), vencida & (pct >= 100), vencida, pct > 0],
+        ["Planejado", "Concluído", "Atrasado", "Em Andamento"],
+        "Planejado"
+    )
+    return pd.Series(
+        pd.Categorical(status, categories=STATUS_CATEGORIAS),
+        index=df.index
+    )
+
+def preparar_planilha(df):
+    df = df.dropna(subset=['OS'])
+
+    df['OS'] = (
+        df['OS']
+        .astype(str)
+        .str.replace('.0', '', regex=False)
+        .str.strip()
+    )
+
+    # Datas
+    for col in ['DT INICIO', 'DT FIM', 'DATA CONTRATUAL']:
+        df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # Numéricos
+    df['ATUALIZAÇÃO'] = pd.to_numeric(df['ATUALIZAÇÃO'], errors='coerce').fillna(0)
+    df['LT OPERAÇÃO'] = pd.to_numeric(df['LT OPERAÇÃO'], errors='coerce')
+
+    # WK
+    df['WK'] = df['WK'].astype(str).str.strip().replace('nan', pd.NA)
+
+    # Percentual lido da planilha
+    df['% CONCLUÍDO_ORIGINAL'] = pd.to_numeric(
+        df['% CONCLUÍDO'], errors='coerce'
+    )
+    return df
+
+def derivar_colunas(df):
+    df['% CONCLUÍDO'] = calcular_percentual(df).clip(0, 100)
+    return df
+
+def compactar(df):
+    """Converte o df tratado para o esquema compacto (pode ser reaplicado)."""
+    for col in COLUNAS_CATEGORIA:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in COLUNAS_TEXTO:
+        if col in df.columns:
+            # 'str' é Arrow no pandas 3 quando o pyarrow está instalado
+            df[col] = df[col].astype('str')
+    return df
+
+def memoria_mb(*dfs):
+    """Memória (MB) ocupada pelos DataFrames, contando cada objeto uma vez."""
+    vistos = {id(df): df for df in dfs if df is not None}
+    return sum(
+        df.memory_usage(deep=True).sum() for df in vistos.values()
+    ) / 1e6
+
+def carregar(conteudo, chave=None, ao_ler_bloco=None):
+    """Lê e trata a planilha (sem o STATUS). Retorna (df, tempos).
+
+    `ao_ler_bloco` recebe as linhas brutas enquanto são lidas (ver
+    leitura.ler_programacao).
+    """
+    if chave is None:
+        chave = hash_conteudo(conteudo)
+    df, tempos = ler_programacao(conteudo, chave, ao_ler_bloco=ao_ler_bloco)
+
+    t = time.perf_counter()
+    df = compactar(derivar_colunas(preparar_planilha(df)))
+    tempos['tratamento'] = time.perf_counter() - t
+
+    return df, tempos
+
+def carregar_revisao(conteudo, chave, df_anterior, ao_ler_bloco=None):
+    """Nova revisão de uma planilha já carregada.
+
+    A planilha é tratada inteira, como em carregar (as colunas derivadas são
+    vetorizadas: recalcular tudo sai mais barato que casar as linhas com a
+    revisão anterior). A comparação só monta a tabela de mudanças.
+    Retorna (df, tempos, tabela de mudanças).
+    """
+    df, tempos = carregar(conteudo, chave, ao_ler_bloco)
+
+    t = time.perf_counter()
+    tabela = mudancas_entre(df_anterior, df)
+    tempos['comparacao'] = time.perf_counter() - t
+
+    return df, tempos, tabela
+
+def mudancas_entre(df_anterior, df):
+    """Tabela de mudanças entre duas revisões já carregadas."""
+    return tabela_mudancas(df_anterior, df, comparar_revisoes(df_anterior, df))
+
+def carregar_varias(fontes, processos=None):
+    """Como carregar, para várias planilhas juntas (coluna ORIGEM).
+
+    `fontes` é uma lista de (nome, bytes ou caminho do xlsx).
+    """
+    df, tempos = ler_varias(fontes, processos)
+
+    t = time.perf_counter()
+    df = compactar(derivar_colunas(preparar_planilha(df)))
+    tempos['tratamento'] = time.perf_counter() - t
+
+    return df, tempos
+
+# =====================================================
+# FILTROS E KPIs
+# =====================================================
+def filtrar(df, selecoes):
+    mascara = None
+    for col, valores in selecoes.items():
+        if valores:
+            m = df[col].isin(valores).to_numpy()
+            mascara = m if mascara is None else mascara & m
+    if mascara is None:
+        return df
+    return df[mascara]
+
+def calcular_kpis(df):
+    return {
+        "Total OS": int(df['OS'].nunique()),
+        "Atividades": len(df),
+        "Concluídas": int((df['STATUS'] == 'Concluído').sum()),
+        "Atrasadas": int((df['STATUS'] == 'Atrasado').sum()),
+    }
+
+# =====================================================
+# GANTT
+# =====================================================
+def janela(hoje, periodo_dias):
+    return hoje - pd.Timedelta(days=7), hoje + pd.Timedelta(days=periodo_dias)
+
+def na_janela(df, inicio_view, fim_view):
+    return df[(df['DT INICIO'] <= fim_view) & (df['DT FIM'] >= inicio_view)]
+
+def mapa_cores(areas):
+    # Área vazia (NaN) não entra: não se ordena com texto
+    return {
+        a: CORES_POWERBI[i % len(CORES_POWERBI)]
+        for i, a in enumerate(sorted(pd.Series(areas).dropna().unique()))
+    }
+
+def formatar_datas(serie, formato='%d/%m/%Y'):
+    """Datas como texto, com o strftime só nas datas distintas.
+
+    Poucas centenas de datas se repetem em milhares de linhas; o resultado é
+    uma categoria, que guarda cada texto uma vez.
+    """
+    codigos, datas = pd.factorize(serie)
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, datas.strftime(formato)), index=serie.index
+    )
+
+def textos_gantt(df):
+    """Rótulos do eixo Y e textos do hover do Gantt, para todas as linhas.
+
+    Operações de texto por coluna, sem laço por linha: calculado uma vez por
+    planilha (ver Contexto.com_textos) e só recortado a cada figura.
+    """
+    # No pandas 3, astype(str) mantém o NaN: sem o fillna, células em branco
+    # virariam rótulos NaN
+    os_ = df['OS'].astype(str)
+    prog = df['PROG.'].astype(str).fillna(AREA_VAZIA)
+    area = (
+        prog.str.strip().str.replace(r'\s+', ' ', regex=True).replace('', AREA_VAZIA)
+    )
+    descricao = df['PROGRAMAÇÃO | PROG. DETALHADA']
+    return pd.DataFrame({
+        # preparar_gantt (painel da oficina)
+        'AREA GANTT': area,
+        'Y_LABEL OS': "OS " + os_ + " | " + descricao.str[:45].fillna(""),
+        'Y_LABEL AREA': area + " | OS " + os_,
+        # figura_gantt_powerbi
+        'ROTULO OS': "  " + descricao.str[:40].fillna(""),
+        'ROTULO AREA': prog + " - OS " + os_,
+        'HOVER_DESC': descricao.str[:50].fillna(""),
+        'HOVER_INICIO': formatar_datas(df['DT INICIO']),
+        'HOVER_FIM': formatar_datas(df['DT FIM']),
+    }, index=df.index)
+
+def com_textos(df_gantt):
+    """df_gantt com as colunas de textos_gantt (calculadas se faltarem)."""
+    if 'HOVER_FIM' in df_gantt.columns:
+        return df_gantt
+    return df_gantt.assign(**textos_gantt(df_gantt))
+
+def preparar_gantt(df_gantt, agrupar_por_os):
+    """Normaliza a área, monta o Y_LABEL e ordena as linhas.
+
+    Retorna (df_gantt, rótulos do eixo Y na ordem em que são desenhados).
+    """
+    df_gantt = com_textos(df_gantt)
+    # OS vem como categoria no df compactado
+    df_gantt = df_gantt.assign(**{
+        'PROG.': df_gantt['AREA GANTT'],
+        'OS': df_gantt['OS'].astype(str),
+        'Y_LABEL': df_gantt['Y_LABEL OS' if agrupar_por_os else 'Y_LABEL AREA'],
+    })
+
+    df_gantt = df_gantt.sort_values(['OS', 'DT INICIO'])
+
+    # Linhas do eixo Y na ordem em que os traces as desenham (áreas na
+    # ordem em que aparecem)
+    codigos_area, _ = pd.factorize(df_gantt['PROG.'])
+    df_gantt = df_gantt.iloc[np.argsort(codigos_area, kind='stable')]
+    return df_gantt, df_gantt['Y_LABEL'].unique()
+
+def figura_gantt(df_gantt, rotulos, color_map, mostrar_concluido, hoje,
+                 faixa_x=None):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Um trace por (área, concluído/restante), com segmentos separados por None
+    fig.add_traces(tracos_gantt_linhas(
+        df_gantt,
+        'Y_LABEL',
+        color_map,
+        mostrar_concluido,
+        hovertemplate=(
+            "<b>%{customdata[0]}</b><br>"
+            "Área: %{customdata[1]}<br>"
+            "Concluído: %{customdata[2]:.0f}%<extra></extra>"
+        ),
+        customdata_cols=['Y_LABEL', 'PROG.', '% CONCLUÍDO']
+    ))
+
+    # Atraso projetado além do prazo contratual (colunas de risco.py)
+    if 'CAUSA ATRASO' in df_gantt.columns:
+        fig.add_traces(tracos_risco(df_gantt, df_gantt['Y_LABEL'].to_numpy(dtype=object)))
+
+    # Linha HOJE
+    fig.add_shape(
+        type="line",
+        x0=hoje,
+        x1=hoje,
+        y0=-1,
+        y1=len(rotulos),
+        line=dict(color="black", dash="dot", width=2)
+    )
+
+    fig.add_annotation(
+        x=hoje,
+        y=-0.5,
+        text="HOJE",
+        showarrow=False,
+        font=dict(size=10, weight="bold"),
+        bgcolor="white",
+        bordercolor="black",
+        borderwidth=1
+    )
+
+    # Layout
+    fig.update_layout(
+        xaxis=dict(
+            type='date',
+            side='top',
+            tickformat='%d/%m',
+            showgrid=True,
+            range=list(faixa_x) if faixa_x is not None else None
+        ),
+        yaxis=dict(
+            type='category',
+            categoryorder='array',
+            categoryarray=list(rotulos),
+            autorange='reversed'
+        ),
+        height=max(500, len(rotulos) * 30),
+        margin=dict(l=420, r=120, t=50, b=20),
+        plot_bgcolor='white',
+        showlegend=False
+    )
+    return fig
+
+def figura_gantt_densa(df_gantt, rotulos, color_map, mostrar_concluido, hoje,
+                       faixa_x=None, max_rotulos=150, max_hover_completo=20000):
+    """Gantt em WebGL com todas as linhas num só gráfico.
+
+    O eixo Y é numérico; com mais de `max_rotulos` linhas os rótulos saem do
+    eixo e ficam só no hover. Acima de `max_hover_completo` atividades o
+    hover fica curto (OS | área | %), para a figura não passar de dezenas de MB.
+    """
+    import plotly.graph_objects as go
+
+    n = len(rotulos)
+    y = pd.Index(rotulos).get_indexer(df_gantt['Y_LABEL'])
+    pct = df_gantt['% CONCLUÍDO'].fillna(0).round().astype(int).astype(str) + "%"
+    if len(df_gantt) <= max_hover_completo:
+        texto = (
+            "<b>" + df_gantt['Y_LABEL'] + "</b><br>Área: " + df_gantt['PROG.'] +
+            "<br>Concluído: " + pct
+        )
+    else:
+        texto = "OS " + df_gantt['OS'] + " | " + df_gantt['PROG.'] + " | " + pct
+
+    altura = int(np.clip(n * 6, 500, 1600))
+    largura = float(np.clip(altura / max(n, 1) * 0.7, 1, 18))
+
+    fig = go.Figure()
+    fig.add_traces(tracos_gantt_webgl(
+        df_gantt, y, color_map, mostrar_concluido,
+        texto=texto.to_numpy(dtype=object), largura=largura
+    ))
+    if 'CAUSA ATRASO' in df_gantt.columns:
+        fig.add_traces(tracos_risco(df_gantt, y, webgl=True))
+
+    # Linha HOJE
+    fig.add_shape(
+        type="line",
+        x0=hoje,
+        x1=hoje,
+        y0=-1,
+        y1=n,
+        line=dict(color="black", dash="dot", width=2)
+    )
+
+    mostrar_rotulos = n <= max_rotulos
+    fig.update_layout(
+        xaxis=dict(
+            type='date',
+            side='top',
+            tickformat='%d/%m',
+            showgrid=True,
+            range=list(faixa_x) if faixa_x is not None else None
+        ),
+        yaxis=dict(
+            tickmode='array' if mostrar_rotulos else 'auto',
+            tickvals=list(range(n)) if mostrar_rotulos else None,
+            ticktext=list(rotulos) if mostrar_rotulos else None,
+            showticklabels=mostrar_rotulos,
+            showgrid=False,
+            zeroline=False,
+            range=[n, -1]
+        ),
+        height=altura,
+        margin=dict(l=420 if mostrar_rotulos else 20, r=120, t=50, b=20),
+        hovermode='closest',
+        plot_bgcolor='white',
+        showlegend=False
+    )
+    return fig
+
+def figura_gantt_powerbi(df_gantt, agrupar_por_os, mostrar_concluido, hoje,
+                         periodo_view):
+    """Gantt do painel estilo Power BI (go.Bar, eixo Y numérico).
+
+    Retorna (fig, mapa de cores por área).
+    """
+    import plotly.graph_objects as go
+
+    # Paleta de cores por área (similar ao Power BI)
+    areas_unicas = sorted(df_gantt['PROG.'].dropna().unique())
+    color_map = {
+        area: CORES_POWERBI_ESTENDIDA[i % len(CORES_POWERBI_ESTENDIDA)]
+        for i, area in enumerate(areas_unicas)
+    }
+
+    # OS vem como categoria no df compactado
+    df_gantt = com_textos(df_gantt).assign(OS=df_gantt['OS'].astype(str))
+
+    # Ordenar dados
+    if agrupar_por_os:
+        df_gantt = df_gantt.sort_values(['OS', 'DT INICIO'])
+    else:
+        df_gantt = df_gantt[df_gantt['PROG.'].notna()]
+        df_gantt = df_gantt.sort_values(['PROG.', 'DT INICIO'])
+
+    # Criar figura
+    fig = go.Figure()
+
+    # Calcular período de visualização
+    data_min = df_gantt['DT INICIO'].min()
+    data_max = df_gantt['DT FIM'].max()
+    data_inicio_view = min(data_min, hoje - pd.Timedelta(days=7))
+    data_fim_view = max(data_max, hoje + pd.Timedelta(days=periodo_view))
+
+    # Posições no eixo Y (o df já está na ordem em que as linhas aparecem)
+    n = len(df_gantt)
+    if agrupar_por_os:
+        # Agrupado por OS: uma linha de título por OS (sem barra) antes das
+        # atividades dela. Cada atividade desce uma posição por título acima
+        grupo, lista_os = pd.factorize(df_gantt['OS'])
+        y_positions = np.arange(n) + grupo + 1
+        primeiras = np.flatnonzero(np.diff(grupo, prepend=-1))
+        titulos = primeiras + np.arange(len(primeiras))
+
+        y_labels = np.empty(n + len(titulos), dtype=object)
+        y_labels[y_positions] = df_gantt['ROTULO OS'].to_numpy(dtype=object)
+        y_labels[titulos] = ("OS " + pd.Index(lista_os, dtype=object)).to_numpy()
+    else:
+        # Agrupado por Área
+        y_positions = np.arange(n)
+        y_labels = df_gantt['ROTULO AREA'].to_numpy(dtype=object)
+    y_labels = y_labels.tolist()
+    df_gantt = df_gantt.assign(
+        Y_POS=y_positions,
+        HOVER_RESTANTE=100 - df_gantt['% CONCLUÍDO']
+    )
+
+    # Textos do hover (um único hovertemplate por trace + customdata)
+    hovertemplate = (
+        "<b>%{customdata[0]}</b><br>" +
+        "OS: %{customdata[1]}<br>" +
+        "Área: %{customdata[2]}<br>" +
+        "Início: %{customdata[3]}<br>" +
+        "Fim: %{customdata[4]}"
+    )
+    if mostrar_concluido:
+        hovertemplate += "<br>Concluído: %{customdata[5]:.0f}%"
+    hovertemplate += "<extra></extra>"
+
+    # Um trace por (área, concluído/restante)
+    fig.add_traces(tracos_gantt_barras(
+        df_gantt,
+        'Y_POS',
+        color_map,
+        mostrar_concluido and agrupar_por_os,
+        hovertemplate=hovertemplate,
+        hovertemplate_restante="Restante: %{customdata[6]:.0f}%<extra></extra>",
+        customdata_cols=[
+            'HOVER_DESC', 'OS', 'PROG.', 'HOVER_INICIO', 'HOVER_FIM',
+            '% CONCLUÍDO', 'HOVER_RESTANTE'
+        ]
+    ))
+    if 'CAUSA ATRASO' in df_gantt.columns:
+        fig.add_traces(tracos_risco(df_gantt, df_gantt['Y_POS'].to_numpy()))
+
+    # Layout estilo Power BI
+    fig.update_layout(
+        xaxis=dict(
+            title="",
+            type='date',
+            range=[data_inicio_view, data_fim_view],
+            tickformat='%d/%m',
+            dtick=86400000,
+            tickangle=0,
+            showgrid=True,
+            gridcolor='rgba(0, 0, 0, 0.1)',
+            gridwidth=1,
+            showline=True,
+            linecolor='rgba(0, 0, 0, 0.2)',
+            tickfont=dict(size=10, color='#666666')
+        ),
+        yaxis=dict(
+            title="",
+            tickmode='array',
+            tickvals=list(range(len(y_labels))),
+            ticktext=y_labels,
+            autorange='reversed',
+            showgrid=False,
+            showline=True,
+            linecolor='rgba(0, 0, 0, 0.2)',
+            tickfont=dict(size=10, color='#333333')
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        barmode='overlay',
+        height=max(500, len(y_labels) * 30),
+        margin=dict(l=300, r=150, t=60, b=60),
+        font=dict(color='#333333'),
+        hovermode='closest',
+        showlegend=False
+    )
+
+    # Linha HOJE (estilo Power BI - pontilhada preta)
+    fig.add_shape(
+        type="line",
+        x0=hoje,
+        x1=hoje,
+        y0=-0.5,
+        y1=len(y_labels) - 0.5,
+        line=dict(color="black", width=2, dash="dot")
+    )
+
+    # Anotação HOJE
+    fig.add_annotation(
+        x=hoje,
+        y=-1,
+        text="HOJE",
+        showarrow=False,
+        font=dict(size=10, color="black", weight="bold"),
+        bgcolor="white",
+        bordercolor="black",
+        borderwidth=1,
+        borderpad=3
+    )
+
+    return fig, color_map
@@ -0,0 +1,231 @@
+# =====================================================
+# REGISTRO DE PLANILHAS DO SERVIDOR
+# =====================================================
+# Um só registro por processo guarda cada planilha tratada uma única vez,
+# chaveada pelo hash do conteúdo, junto com o que é derivado dela (índices,
+# tabela de mudanças). As sessões não guardam DataFrames: guardam uma
+# Reserva, e enquanto houver reserva viva a planilha não sai do registro.
+# Quando a sessão termina a reserva é coletada e a contagem cai; acima de
+# `max_entradas` saem primeiro as planilhas sem reserva usadas há mais tempo.
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class Conjunto:
+    """Planilha carregada, compartilhada entre sessões (somente leitura)."""
+
+    def __init__(self, chave, df, tempos, derivados=None):
+        self.chave = chave
+        self.df = df
+        self.tempos = tempos
+        # nome -> (versão, valor)
+        self._derivados = {
+            nome: (None, valor) for nome, valor in (derivados or {}).items()
+        }
+        # Uma trava por nome, só para o cálculo: enquanto uma sessão calcula
+        # um derivado (ex.: grava o retrato no histórico), as outras leem ou
+        # calculam os demais sem esperar
+        self._travas = {}
+        self._trava = threading.Lock()
+
+    def derivado(self, nome, calcular, versao=None):
+        """Valor derivado da planilha, calculado uma vez só por `calcular()`.
+
+        Se o valor depende de algo além da planilha (ex.: o dia de hoje),
+        esse algo vai em `versao`: numa versão nova o valor é recalculado e
+        substitui o anterior, em vez de ficar uma entrada por dia.
+        """
+        with self._trava:
+            atual = self._derivados.get(nome)
+            if atual is not None and atual[0] == versao:
+                return atual[1]
+            trava = self._travas.setdefault(nome, threading.Lock())
+        with trava:
+            # Outra sessão pode ter calculado enquanto esta esperava
+            with self._trava:
+                atual = self._derivados.get(nome)
+            if atual is not None and atual[0] == versao:
+                return atual[1]
+            valor = calcular()
+            with self._trava:
+                self._derivados[nome] = (versao, valor)
+            return valor
+
+
+class Reserva:
+    """Referência de uma sessão a um Conjunto do registro."""
+
+    def __init__(self, conjunto):
+        self.conjunto = conjunto
+
+    @property
+    def chave(self):
+        return self.conjunto.chave
+
+    @property
+    def df(self):
+        return self.conjunto.df
+
+    @property
+    def tempos(self):
+        return self.conjunto.tempos
+
+    def derivado(self, nome, calcular, versao=None):
+        return self.conjunto.derivado(nome, calcular, versao)
+
+
+class RegistroDatasets:
+    def __init__(self, max_entradas=8):
+        self.max_entradas = max_entradas
+        self._conjuntos = OrderedDict()   # do uso mais antigo ao mais recente
+        self._reservas = {}               # chave -> nº de reservas vivas
+        self._carregando = {}             # chave -> [trava da carga, nº de threads]
+        # RLock: o finalize de uma Reserva pode rodar (coleta de lixo) com a
+        # trava já tomada pela mesma thread
+        self._trava = threading.RLock()
+
+    def __contains__(self, chave):
+        with self._trava:
+            return chave in self._conjuntos
+
+    def __len__(self):
+        with self._trava:
+            return len(self._conjuntos)
+
+    def obter(self, chave, carregar):
+        """Reserva da planilha `chave`, carregando-a se ainda não estiver aqui.
+
+        `carregar()` devolve (df, tempos) ou (df, tempos, derivados). Várias
+        sessões pedindo a mesma chave ao mesmo tempo esperam uma única carga.
+        """
+        # A trava da carga sai do dicionário só quando nenhuma thread a usa
+        # mais; senão uma thread nova criaria outra e carregaria em paralelo
+        with self._trava:
+            carga = self._carregando.setdefault(chave, [threading.Lock(), 0])
+            carga[1] += 1
+        try:
+            with carga[0]:
+                with self._trava:
+                    conjunto = self._conjuntos.get(chave)
+                    if conjunto is not None:
+                        return self._reservar(conjunto)
+
+                conjunto = Conjunto(chave, *carregar())
+                with self._trava:
+                    self._conjuntos[chave] = conjunto
+                    return self._reservar(conjunto)
+        finally:
+            with self._trava:
+                carga[1] -= 1
+                if not carga[1]:
+                    del self._carregando[chave]
+
+    def _reservar(self, conjunto):
+        self._conjuntos.move_to_end(conjunto.chave)
+        self._reservas[conjunto.chave] = self._reservas.get(conjunto.chave, 0) + 1
+        reserva = Reserva(conjunto)
+        weakref.finalize(reserva, self._liberar, conjunto.chave)
+        self._podar()
+        return reserva
+
+    def _liberar(self, chave):
+        with self._trava:
+            restantes = self._reservas.get(chave, 0) - 1
+            if restantes > 0:
+                self._reservas[chave] = restantes
+            else:
+                self._reservas.pop(chave, None)
+            self._podar()
+
+    def _podar(self):
+        excesso = len(self._conjuntos) - self.max_entradas
+        for chave in list(self._conjuntos):
+            if excesso <= 0:
+                break
+            if not self._reservas.get(chave):
+                del self._conjuntos[chave]
+                excesso -= 1
+
+    def resumo(self):
+        """Nº de planilhas, de reservas (sessões) e memória (MB) do registro."""
+        with self._trava:
+            dfs = [c.df for c in self._conjuntos.values()]
+            reservas = sum(self._reservas.values())
+        return {
+            'planilhas': len(dfs),
+            'reservas': reservas,
+            'memoria_mb': float(sum(
+                df.memory_usage(deep=True).sum() for df in dfs
+            )) / 1e6,
+        }
+
+
+# =====================================================
+# CACHE DE FIGURAS DO SERVIDOR
+# =====================================================
+# Figuras do Gantt já montadas, compartilhadas entre sessões. A chave é a
+# planilha mais o estado normalizado dos filtros e controles, então voltar
+# a uma combinação já vista (ou outra sessão pedir a mesma) não monta a
+# figura de novo. LRU limitado pelo nº de figuras e pelo tamanho estimado.
+def _tamanho_figura(valor):
+    # Bytes aproximados dos arrays dos traces, o grosso de uma figura;
+    # `valor` pode ser a figura ou uma tupla que a contém
+    itens = valor if isinstance(valor, tuple) else (valor,)
+    total = 0
+    for fig in itens:
+        for traco in getattr(fig, 'data', ()):
+            for nome in ('x', 'y', 'base', 'text', 'customdata'):
+                array = getattr(traco, nome, None)
+                if array is None or isinstance(array, str):
+                    continue
+                if getattr(array, 'dtype', None) is not None and array.dtype != object:
+                    total += array.nbytes
+                else:
+                    total += 64 * len(array)
+    return total
+
+
+class CacheFiguras:
+    def __init__(self, max_entradas=32, max_mb=512):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_mb * 1e6
+        self._figuras = OrderedDict()   # chave -> (valor, bytes)
+        self._bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self._trava = threading.Lock()
+
+    def obter(self, chave, montar):
+        """(valor, acertou): do cache, ou montado por `montar()` e guardado."""
+        with self._trava:
+            if chave in self._figuras:
+                self._figuras.move_to_end(chave)
+                self.acertos += 1
+                return self._figuras[chave][0], True
+            self.faltas += 1
+
+        valor = montar()
+        tamanho = _tamanho_figura(valor)
+        with self._trava:
+            if chave not in self._figuras and tamanho <= self.max_bytes:
+                self._figuras[chave] = (valor, tamanho)
+                self._bytes += tamanho
+            while self._figuras and (
+                len(self._figuras) > self.max_entradas or self._bytes > self.max_bytes
+            ):
+                _, (_, removido) = self._figuras.popitem(last=False)
+                self._bytes -= removido
+        return valor, False
+
+    def resumo(self):
+        """Nº de figuras, memória estimada (MB), acertos, faltas e taxa."""
+        with self._trava:
+            pedidos = self.acertos + self.faltas
+            return {
+                'figuras': len(self._figuras),
+                'memoria_mb': self._bytes / 1e6,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'taxa_acertos': self.acertos / pedidos if pedidos else 0.0,
+            }
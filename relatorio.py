@@ -0,0 +1,214 @@
+# =====================================================
+# RELATÓRIO ESTÁTICO (SEM STREAMLIT)
+# =====================================================
+# Gera o mesmo painel (KPIs + Gantt) em HTML autocontido, e opcionalmente
+# PNG, a partir de uma ou mais planilhas, para envio por e-mail.
+#
+# Exemplos:
+#   python relatorio.py programacao.xlsx
+#   python relatorio.py sem10.xlsx sem11.xlsx --filtro CLIENTE=VALE
+#   python relatorio.py programacao.xlsx --por SUPERVISÃO --png --processos 4
+import argparse
+import html
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import painel
+
+
+def _nome_arquivo(texto):
+    return re.sub(r'[^\w.-]+', '_', str(texto)).strip('_') or 'sem_nome'
+
+
+def _pagina_html(titulo, subtitulo, kpis, corpo):
+    cartoes = "".join(
+        f'<div class="kpi"><span>{html.escape(k)}</span><b>{v}</b></div>'
+        for k, v in kpis.items()
+    )
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(titulo)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; color: #333; }}
+.kpis {{ display: flex; gap: 16px; margin: 16px 0; }}
+.kpi {{ border: 1px solid #ddd; border-radius: 6px; padding: 12px 20px; }}
+.kpi span {{ display: block; font-size: 12px; color: #666; }}
+.kpi b {{ font-size: 24px; }}
+</style>
+</head>
+<body>
+<h1>PAINEL DE CONTROLE: PROGRAMAÇÃO MTR</h1>
+<p>{html.escape(subtitulo)}</p>
+<div class="kpis">{cartoes}</div>
+{corpo}
+</body>
+</html>
+"""
+
+
+def gerar_relatorio(caminho, selecoes, saida, nome=None, periodo=30,
+                    agrupar_por_os=True, mostrar_concluido=True, png=False):
+    """Gera o relatório de uma planilha com um conjunto de filtros.
+
+    Retorna a lista de arquivos gravados.
+    """
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+
+    df, _ = painel.carregar(conteudo)
+    hoje = pd.Timestamp.today().normalize()
+    df['STATUS'] = painel.definir_status(df, hoje)
+
+    df_filtrado = painel.filtrar(df, selecoes)
+    kpis = painel.calcular_kpis(df_filtrado)
+
+    inicio_view, fim_view = painel.janela(hoje, periodo)
+    df_gantt = painel.na_janela(df_filtrado, inicio_view, fim_view)
+
+    filtros_txt = "; ".join(
+        f"{painel.FILTROS.get(c, c)}: {', '.join(map(str, v))}"
+        for c, v in selecoes.items() if v
+    ) or "sem filtros"
+    subtitulo = (
+        f"{os.path.basename(caminho)} | {filtros_txt} | "
+        f"{inicio_view:%d/%m/%Y} a {fim_view:%d/%m/%Y}"
+    )
+
+    fig = None
+    if df_gantt.empty:
+        corpo = "<p>Sem dados válidos para o cronograma no período.</p>"
+    else:
+        df_gantt, rotulos = painel.preparar_gantt(df_gantt, agrupar_por_os)
+        fig = painel.figura_gantt(
+            df_gantt,
+            rotulos,
+            painel.mapa_cores(df_gantt['PROG.'].unique()),
+            mostrar_concluido,
+            hoje,
+            faixa_x=(inicio_view, fim_view)
+        )
+        corpo = fig.to_html(full_html=False, include_plotlyjs=True)
+
+    os.makedirs(saida, exist_ok=True)
+    base = os.path.join(
+        saida, _nome_arquivo(nome or os.path.splitext(os.path.basename(caminho))[0])
+    )
+
+    gravados = []
+    with open(f"{base}.html", 'w', encoding='utf-8') as f:
+        f.write(_pagina_html("Programação Oficina", subtitulo, kpis, corpo))
+    gravados.append(f"{base}.html")
+
+    if png and fig is not None:
+        # Requer o pacote kaleido; sem ele, fica só o HTML
+        try:
+            fig.write_image(f"{base}.png", width=1600)
+            gravados.append(f"{base}.png")
+        except (ImportError, ValueError, RuntimeError) as e:
+            print(f"⚠️ PNG não gerado para {base}: {e}", file=sys.stderr)
+
+    return gravados
+
+
+def _executar(tarefa):
+    try:
+        return tarefa, gerar_relatorio(**tarefa), None
+    except Exception as e:
+        return tarefa, [], e
+
+
+def _ler_filtros(itens):
+    selecoes = {}
+    for item in itens or []:
+        col, sep, valores = item.partition('=')
+        if not sep or col not in painel.FILTROS:
+            raise SystemExit(
+                f"Filtro inválido: {item!r} (use COLUNA=V1,V2 com COLUNA em "
+                f"{', '.join(painel.FILTROS)})"
+            )
+        selecoes.setdefault(col, []).extend(
+            v.strip() for v in valores.split(',') if v.strip()
+        )
+    return selecoes
+
+
+def montar_tarefas(args):
+    selecoes = _ler_filtros(args.filtro)
+    base = dict(
+        saida=args.saida,
+        periodo=args.periodo,
+        agrupar_por_os=not args.por_area,
+        mostrar_concluido=not args.sem_concluido,
+        png=args.png,
+    )
+
+    tarefas = []
+    for caminho in args.planilhas:
+        nome = os.path.splitext(os.path.basename(caminho))[0]
+        if not args.por:
+            tarefas.append(dict(base, caminho=caminho, selecoes=selecoes, nome=nome))
+            continue
+
+        # Um relatório por valor da coluna (a leitura grava o sidecar, então
+        # os processos filhos não passam pelo Excel de novo)
+        with open(caminho, 'rb') as f:
+            df, _ = painel.carregar(f.read())
+        df = painel.filtrar(df, selecoes)
+        for valor in sorted(df[args.por].dropna().unique()):
+            tarefas.append(dict(
+                base,
+                caminho=caminho,
+                selecoes={**selecoes, args.por: [valor]},
+                nome=f"{nome}_{valor}",
+            ))
+    return tarefas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Gera o painel da Programação Oficina em HTML/PNG."
+    )
+    parser.add_argument('planilhas', nargs='+', help="arquivos .xlsx")
+    parser.add_argument('--saida', default='relatorios',
+                        help="pasta de saída (padrão: relatorios)")
+    parser.add_argument('--filtro', action='append', metavar='COLUNA=V1,V2',
+                        help="filtro; pode ser repetido")
+    parser.add_argument('--por', choices=list(painel.FILTROS),
+                        help="um relatório por valor desta coluna")
+    parser.add_argument('--periodo', type=int, default=30,
+                        help="dias após hoje no Gantt (padrão: 30)")
+    parser.add_argument('--por-area', action='store_true',
+                        help="rótulos por área em vez de por OS")
+    parser.add_argument('--sem-concluido', action='store_true',
+                        help="não destacar o %% concluído nas barras")
+    parser.add_argument('--png', action='store_true',
+                        help="gravar também PNG (requer kaleido)")
+    parser.add_argument('--processos', type=int, default=os.cpu_count(),
+                        help="processos em paralelo (padrão: nº de CPUs)")
+    args = parser.parse_args(argv)
+
+    tarefas = montar_tarefas(args)
+    if args.processos > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=args.processos) as executor:
+            resultados = list(executor.map(_executar, tarefas))
+    else:
+        resultados = [_executar(t) for t in tarefas]
+
+    falhas = 0
+    for tarefa, gravados, erro in resultados:
+        if erro is not None:
+            falhas += 1
+            print(f"❌ {tarefa['nome']}: {erro}", file=sys.stderr)
+        for caminho in gravados:
+            print(f"✅ {caminho}")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# =====================================================
+# REVISÕES DA PLANILHA
+# =====================================================
+# Compara uma nova revisão da planilha com a anterior, linha a linha, pela
+# chave OS + descrição da atividade, para a tabela do que mudou entre elas.
+import numpy as np
+import pandas as pd
+
+COLUNAS_CHAVE = ['OS', 'PROGRAMAÇÃO | PROG. DETALHADA']
+
+# Colunas de origem comparadas entre revisões (o % CONCLUÍDO é derivado;
+# o valor lido da planilha fica em % CONCLUÍDO_ORIGINAL)
+COLUNAS_COMPARADAS = [
+    'OS', 'WK', 'PROG.', 'SUPERVISÃO', 'CLIENTE',
+    'PROGRAMAÇÃO | PROG. DETALHADA',
+    'DT INICIO', 'DT FIM', 'DATA CONTRATUAL',
+    'ATUALIZAÇÃO', 'LT OPERAÇÃO', '% CONCLUÍDO_ORIGINAL',
+]
+
+
+def _chave_linhas(df, colunas):
+    # Chaves repetidas são diferenciadas pela ordem de ocorrência
+    ocorrencia = df.groupby(colunas, dropna=False, sort=False).cumcount()
+    partes = [df[c].astype(object).to_numpy() for c in colunas]
+    return pd.MultiIndex.from_arrays(partes + [ocorrencia.to_numpy()])
+
+
+def _iguais(a, b):
+    a = pd.Series(a)
+    b = pd.Series(b)
+    return (a.eq(b) | (a.isna() & b.isna())).to_numpy()
+
+
+def comparar_revisoes(anterior, atual, colunas=None, chave=None):
+    """Compara duas revisões já tratadas.
+
+    Retorna um dict com posições (iloc): 'inseridas' e 'alteradas' em
+    `atual`, 'removidas' em `anterior`, e 'correspondencia', que dá para
+    cada linha de `atual` a posição em `anterior` (-1 se inserida).
+    Em 'campos' ficam, para cada linha alterada, as colunas que mudaram.
+    """
+    chave = chave or COLUNAS_CHAVE
+    colunas = [
+        c for c in (colunas or COLUNAS_COMPARADAS)
+        if c in anterior.columns and c in atual.columns
+    ]
+
+    idx_ant = _chave_linhas(anterior, chave)
+    idx_atu = _chave_linhas(atual, chave)
+
+    correspondencia = idx_ant.get_indexer(idx_atu)
+    inseridas = np.flatnonzero(correspondencia < 0)
+    removidas = np.flatnonzero(~idx_ant.isin(idx_atu))
+
+    comuns = np.flatnonzero(correspondencia >= 0)
+    mudou = np.zeros((len(comuns), len(colunas)), dtype=bool)
+    for j, col in enumerate(colunas):
+        mudou[:, j] = ~_iguais(
+            atual[col].to_numpy()[comuns],
+            anterior[col].to_numpy()[correspondencia[comuns]]
+        )
+    linhas_alteradas = mudou.any(axis=1)
+    alteradas = comuns[linhas_alteradas]
+    campos = [
+        [colunas[j] for j in np.flatnonzero(linha)]
+        for linha in mudou[linhas_alteradas]
+    ]
+
+    return {
+        'inseridas': inseridas,
+        'alteradas': alteradas,
+        'removidas': removidas,
+        'correspondencia': correspondencia,
+        'campos': campos,
+    }
+
+
+def tabela_mudancas(anterior, atual, revisao, colunas=None):
+    """DataFrame com uma linha por atividade inserida, alterada ou removida."""
+    colunas = colunas or [
+        'OS', 'PROGRAMAÇÃO | PROG. DETALHADA', 'PROG.', 'DT INICIO', 'DT FIM'
+    ]
+    colunas = [c for c in colunas if c in atual.columns]
+
+    partes = []
+    if len(revisao['inseridas']):
+        partes.append(
+            atual.iloc[revisao['inseridas']][colunas]
+            .assign(MUDANÇA="Inserida", CAMPOS="")
+        )
+    if len(revisao['alteradas']):
+        partes.append(
+            atual.iloc[revisao['alteradas']][colunas]
+            .assign(MUDANÇA="Alterada",
+                    CAMPOS=[", ".join(c) for c in revisao['campos']])
+        )
+    if len(revisao['removidas']):
+        partes.append(
+            anterior.iloc[revisao['removidas']][colunas]
+            .assign(MUDANÇA="Removida", CAMPOS="")
+        )
+    if not partes:
+        return pd.DataFrame(columns=['MUDANÇA'] + colunas + ['CAMPOS'])
+    return pd.concat(partes, ignore_index=True)[['MUDANÇA'] + colunas + ['CAMPOS']]
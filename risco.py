@@ -0,0 +1,92 @@
+# =====================================================
+# RISCO DE PRAZO CONTRATUAL POR OS
+# =====================================================
+# Projeta o fim de cada atividade a partir do trabalho que falta
+# (LT OPERAÇÃO × o que resta do % CONCLUÍDO) e compara com a DATA
+# CONTRATUAL da linha. A folga da OS é a menor folga entre as atividades
+# dela; as que passam da data contratual são as que puxam o atraso.
+# Tudo em operações por coluna e groupby, sem laço por OS: roda a cada
+# mudança de filtro.
+import numpy as np
+import pandas as pd
+
+# LT OPERAÇÃO em horas de trabalho; um dia útil de trabalho por atividade
+HORAS_POR_DIA = 8
+
+# Folga (dias) abaixo da qual a OS é marcada "Em risco"
+MARGEM_DIAS = 7
+
+RISCOS = ["Atrasará", "Em risco", "No prazo", "Sem data contratual"]
+
+
+def projetar_fim(df, hoje, horas_por_dia=HORAS_POR_DIA):
+    """Fim projetado de cada atividade.
+
+    Concluídas terminam no DT FIM. As demais não terminam antes de começar
+    (ou de hoje, se já deviam ter começado) mais os dias do trabalho que
+    falta, nem antes do DT FIM planejado.
+    """
+    pct = df['% CONCLUÍDO'].astype('float64').fillna(0).clip(0, 100)
+    lt = df['LT OPERAÇÃO'].astype('float64').fillna(0).clip(lower=0)
+    dias = np.ceil(lt * (100 - pct) / 100 / horas_por_dia)
+
+    inicio = df['DT INICIO'].where(df['DT INICIO'] > hoje, hoje)
+    fim_trabalho = inicio + pd.to_timedelta(dias, unit='D')
+    fim = df['DT FIM'].where(df['DT FIM'] >= fim_trabalho, fim_trabalho)
+    return fim.where(pct < 100, df['DT FIM'])
+
+
+def avaliar_risco(df, hoje, horas_por_dia=HORAS_POR_DIA, margem_dias=MARGEM_DIAS):
+    """Risco de prazo por OS e por atividade.
+
+    Retorna (por_os, atividades):
+    - por_os: uma linha por OS, da menor folga para a maior, com DATA
+      CONTRATUAL (a mais cedo da OS), FIM PROJETADO (o último), FOLGA
+      (DIAS), RISCO e o nº de atividades que passam da data contratual;
+    - atividades: alinhado ao df, com FIM PROJETADO, FOLGA (DIAS) e CAUSA
+      ATRASO (a atividade termina depois da data contratual).
+    """
+    fim = projetar_fim(df, hoje, horas_por_dia)
+    folga_atividade = (df['DATA CONTRATUAL'] - fim).dt.days
+    causa = (folga_atividade < 0).to_numpy()
+    atividades = pd.DataFrame({
+        'FIM PROJETADO': fim,
+        'FOLGA (DIAS)': folga_atividade,
+        'CAUSA ATRASO': causa,
+    }, index=df.index)
+
+    por_os = (
+        pd.DataFrame({
+            'OS': df['OS'],
+            'CLIENTE': df['CLIENTE'],
+            'DATA CONTRATUAL': df['DATA CONTRATUAL'],
+            'FIM PROJETADO': fim,
+            'FOLGA (DIAS)': folga_atividade,
+            'CAUSA ATRASO': causa,
+        })
+        .groupby('OS', observed=True, sort=False)
+        .agg(**{
+            'CLIENTE': ('CLIENTE', 'first'),
+            'DATA CONTRATUAL': ('DATA CONTRATUAL', 'min'),
+            'FIM PROJETADO': ('FIM PROJETADO', 'max'),
+            'FOLGA (DIAS)': ('FOLGA (DIAS)', 'min'),
+            'ATIVIDADES': ('FIM PROJETADO', 'size'),
+            'ATIVIDADES CRÍTICAS': ('CAUSA ATRASO', 'sum'),
+        })
+        .reset_index()
+    )
+
+    folga = por_os['FOLGA (DIAS)']
+    por_os['FOLGA (DIAS)'] = folga.astype('Int64')
+    por_os['RISCO'] = pd.Categorical(
+        np.select(
+            [folga.isna(), folga < 0, folga <= margem_dias],
+            ["Sem data contratual", "Atrasará", "Em risco"],
+            "No prazo"
+        ),
+        categories=RISCOS
+    )
+    por_os = por_os.sort_values(
+        ['FOLGA (DIAS)', 'OS'], na_position='last', kind='stable', ignore_index=True
+    )
+    return por_os, atividades
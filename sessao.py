@@ -0,0 +1,797 @@
+# =====================================================
+# PAINEL STREAMLIT (PARTE COMUM)
+# =====================================================
+# Upload, carga, STATUS, filtros, KPIs, visões consolidadas, tabela,
+# memória e diagnóstico são iguais nos dois painéis e ficam aqui, sobre o
+# mesmo modelo de dados: a Reserva da planilha no registro do processo.
+# O que muda entre os painéis é só o desenho do Gantt, feito por um módulo
+# de estilo (renderizador) importado quando o painel é aberto:
+#
+#   ESTILOS[nome] -> módulo com APP, ESCALAS, RODAPE e gantt(ctx)
+import importlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agregacoes import (
+    GRANULARIDADES, atrasadas_por_supervisor, capacidade_sugerida,
+    carga_por_area, figura_mapa_calor, progresso_por_cliente,
+    simultaneas_por_area, sobrecarga
+)
+from diagnostico import Diagnostico
+from exportacao import FORMATOS, exportar
+from filtros import IndiceFiltros
+from historico import evolucao_os, figura_tendencia, gravar_snapshot, resumo, tendencia
+from intervalos import IndiceIntervalos
+from leitura import (
+    PASTAS_PERMITIDAS, PlanilhaInvalida, caminho_permitido, chave_fontes,
+    hash_conteudo, listar_planilhas
+)
+from painel import (
+    FILTROS, calcular_kpis, carregar, carregar_revisao, carregar_varias,
+    definir_status, derivar_colunas, memoria_mb, mudancas_entre,
+    preparar_planilha, textos_gantt
+)
+from monitor import INTERVALO_PADRAO, MonitorPlanilha
+from registro import CacheFiguras, RegistroDatasets
+from risco import avaliar_risco
+from tabela import COLUNAS_TABELA, IndiceTabela, pagina
+
+ESTILOS = {
+    'oficina': 'estilo_oficina',
+    'powerbi': 'estilo_powerbi',
+}
+
+LINHAS_POR_PAGINA_TABELA = 50
+
+
+class Contexto:
+    """Estado de uma execução do painel, passado ao renderizador do Gantt."""
+
+    def __init__(self, diag):
+        self.diag = diag
+        self.reservas = st.session_state.setdefault('reservas', {})
+        self.reserva = None
+        self.df = None              # planilha + STATUS (o df do registro não muda)
+        self.hoje = None
+        self.tempos_carga = None
+        self.mudancas = None
+        self.indice = None          # IndiceFiltros
+        self.selecoes = None
+        self.linhas_filtro = None   # posições filtradas (None = todas)
+        self.df_filtrado = None
+        self.snapshot = None        # id do retrato no histórico (None se não gravou)
+        self.risco_os = None        # risco de prazo por OS (risco.py)
+        self.risco_atividades = None
+
+    @property
+    def datas(self):
+        return indice_intervalos(self.reserva)
+
+    def nos_filtros(self, linhas):
+        """Posições `linhas` que também passam pelos filtros."""
+        if self.linhas_filtro is None:
+            return linhas
+        return np.intersect1d(linhas, self.linhas_filtro, assume_unique=True)
+
+    def mostrar_ativas_hoje(self):
+        """Mostra e retorna as posições das atividades em execução hoje."""
+        ativas = self.nos_filtros(self.datas.ativas_em(self.hoje))
+        st.caption(
+            f"📍 {len(ativas)} atividade(s) em execução hoje ({self.hoje:%d/%m/%Y})"
+        )
+        return ativas
+
+    def figura_em_cache(self, montar, **estado):
+        """Figura do cache do servidor, ou montada por `montar()` e guardada.
+
+        A chave é a planilha, o dia, os filtros e o `estado` dos controles
+        que mudam a figura.
+        """
+        filtros = tuple(sorted(
+            (col, tuple(sorted(map(str, valores))))
+            for col, valores in self.selecoes.items() if valores
+        ))
+        chave = (self.reserva.chave, self.hoje, filtros, tuple(sorted(estado.items())))
+        valor, acertou = cache_figuras().obter(chave, montar)
+        self.diag.contar(figura_do_cache=int(acertou))
+        return valor
+
+    def com_textos(self, df_gantt):
+        """df_gantt com os rótulos e textos de hover pré-formatados."""
+        textos = self.reserva.derivado('textos_gantt', lambda: textos_gantt(self.reserva.df))
+        return df_gantt.assign(**textos.reindex(df_gantt.index))
+
+    def com_risco(self, df_gantt):
+        """df_gantt com FIM PROJETADO, FOLGA (DIAS) e CAUSA ATRASO."""
+        risco = self.risco_atividades.reindex(df_gantt.index)
+        return df_gantt.assign(**{
+            'FIM PROJETADO': risco['FIM PROJETADO'],
+            'FOLGA (DIAS)': risco['FOLGA (DIAS)'],
+            'CAUSA ATRASO': risco['CAUSA ATRASO'].fillna(False).astype(bool),
+        })
+
+
+# =====================================================
+# REGISTRO E ÍNDICES
+# =====================================================
+# Registro único do processo: cada planilha (pelo hash do conteúdo) é lida e
+# tratada uma vez e compartilhada, somente leitura, por todas as sessões e
+# pelos dois painéis. A sessão guarda só reservas e o estado dos filtros. O
+# STATUS depende da data de hoje e fica fora do registro.
+@st.cache_resource
+def registro_planilhas():
+    return RegistroDatasets(max_entradas=8)
+
+@st.cache_resource
+def cache_figuras():
+    return CacheFiguras(
+        max_entradas=int(os.environ.get('PROGRAMACAO_CACHE_FIGURAS', 32)),
+        max_mb=int(os.environ.get('PROGRAMACAO_CACHE_FIGURAS_MB', 512))
+    )
+
+# Um monitor por arquivo acompanhado, compartilhado pelas sessões. A thread
+# dele reserva cada versão nova no registro, já com a tabela de mudanças
+# para a versão anterior
+@st.cache_resource(max_entries=4, on_release=lambda m: m.parar())
+def monitor_planilha(caminho):
+    registro = registro_planilhas()
+
+    def carregar_versao(conteudo, chave, anterior):
+        if anterior is None:
+            return registro.obter(chave, lambda: carregar(conteudo, chave))
+
+        def carregar_nova():
+            df, tempos, tabela = carregar_revisao(conteudo, chave, anterior.df)
+            return df, tempos, {('mudancas', anterior.chave): tabela}
+        return registro.obter(chave, carregar_nova)
+
+    return MonitorPlanilha(caminho, carregar_versao).iniciar()
+
+def reservar(chave, carregar_fn, mensagem):
+    registro = registro_planilhas()
+    if chave in registro:
+        return registro.obter(chave, carregar_fn)
+    with st.spinner(mensagem):
+        return registro.obter(chave, carregar_fn)
+
+# Índices montados uma vez por planilha, guardados junto dela no registro
+def indice_filtros(reserva, colunas):
+    return reserva.derivado(
+        ('filtros', tuple(colunas)),
+        lambda: IndiceFiltros(reserva.df, list(colunas))
+    )
+
+def indice_intervalos(reserva):
+    return reserva.derivado('intervalos', lambda: IndiceIntervalos(reserva.df))
+
+def indice_tabela(reserva):
+    return reserva.derivado('tabela', lambda: IndiceTabela(reserva.df))
+
+# Visões consolidadas: sem filtros, calculadas uma vez por planilha (a que
+# depende do STATUS, uma vez por dia: `versao` é o dia, e o valor do dia
+# anterior é substituído); com filtros, direto sobre o recorte.
+# `opcoes` só valem para a planilha inteira (ex.: o índice de intervalos dela)
+def agregacao(ctx, calcular, freq, filtrado, *versao, **opcoes):
+    if filtrado:
+        return calcular(ctx.df_filtrado, freq)
+    return ctx.reserva.derivado(
+        (calcular.__name__, freq), lambda: calcular(ctx.df, freq, **opcoes), versao
+    )
+
+# =====================================================
+# UPLOAD E CARGA
+# =====================================================
+# Planilha acompanhada por padrão; outras, só dentro de PROGRAMACAO_PASTAS
+ARQUIVO_PADRAO = os.environ.get('PROGRAMACAO_ARQUIVO', '')
+
+def arquivo_permitido(caminho):
+    if ARQUIVO_PADRAO and os.path.realpath(caminho) == os.path.realpath(ARQUIVO_PADRAO):
+        return True
+    return caminho_permitido(caminho)
+
+def ler_fontes(app):
+    """Planilhas escolhidas na barra lateral e o diagnóstico da execução.
+
+    Retorna (fontes, diag), com `fontes` uma lista de (nome, bytes ou caminho).
+    """
+    uploaded_files = st.sidebar.file_uploader(
+        "📂 Carregue a(s) planilha(s) Excel", type=["xlsx"], accept_multiple_files=True
+    )
+    # Só com pastas liberadas no servidor (PROGRAMACAO_PASTAS)
+    pasta = None
+    if PASTAS_PERMITIDAS:
+        pasta = st.sidebar.text_input(
+            "📁 Ou uma pasta com planilhas (no servidor)",
+            help="Dentro de: " + ", ".join(PASTAS_PERMITIDAS)
+        )
+    arquivo = None
+    if ARQUIVO_PADRAO or PASTAS_PERMITIDAS:
+        arquivo = st.sidebar.text_input(
+            "🔄 Ou acompanhar uma planilha (no servidor)",
+            value=ARQUIVO_PADRAO,
+            help="O painel recarrega sozinho quando o arquivo é salvo de novo"
+        )
+
+    # Diagnóstico de desempenho: ?diagnostico=1 na URL ou a chave abaixo
+    st.session_state.setdefault(
+        'diagnostico', st.query_params.get('diagnostico') == '1'
+    )
+    diag = Diagnostico(
+        app, st.sidebar.toggle("🩺 Diagnóstico de desempenho", key='diagnostico')
+    )
+
+    fontes = [(f.name, f.getvalue()) for f in uploaded_files or []]
+    if pasta:
+        try:
+            planilhas_pasta = listar_planilhas(pasta)
+            if not planilhas_pasta:
+                st.sidebar.warning("Nenhuma planilha .xlsx nessa pasta")
+            fontes += [(os.path.basename(c), c) for c in planilhas_pasta]
+        except PermissionError:
+            st.sidebar.warning("Pasta fora das liberadas no servidor")
+    if arquivo and not fontes:
+        if not arquivo_permitido(arquivo):
+            st.sidebar.warning("Arquivo fora dos liberados no servidor")
+        elif os.path.isfile(arquivo):
+            monitor = monitor_planilha(os.path.abspath(arquivo))
+            fontes = [(monitor.nome, monitor)]
+        else:
+            st.sidebar.warning("Arquivo não encontrado")
+    return fontes, diag
+
+class PreviaCarga:
+    """KPIs parciais enquanto a planilha é lida em blocos (leitura.py).
+
+    `atualizar` é o ao_ler_bloco da leitura: trata só o bloco novo e soma
+    aos números dos anteriores.
+    """
+
+    def __init__(self):
+        self.espaco = st.empty()
+        self.hoje = pd.Timestamp.today().normalize()
+        self.os = set()
+        self.kpis = {}
+
+    def atualizar(self, bloco, linhas_lidas):
+        df = derivar_colunas(preparar_planilha(bloco))
+        df = df.assign(STATUS=definir_status(df, self.hoje))
+        for rotulo, valor in calcular_kpis(df).items():
+            self.kpis[rotulo] = self.kpis.get(rotulo, 0) + valor
+        self.os.update(df['OS'].unique())
+        self.kpis["Total OS"] = len(self.os)
+
+        with self.espaco.container():
+            st.caption(f"⏳ Lendo a planilha: {linhas_lidas} linhas até agora")
+            for coluna, (rotulo, valor) in zip(st.columns(4), self.kpis.items()):
+                coluna.metric(rotulo, valor)
+
+    def limpar(self):
+        self.espaco.empty()
+
+@st.fragment(run_every=INTERVALO_PADRAO)
+def situacao_monitor(monitor, versao):
+    """Situação da planilha acompanhada; recarrega o painel na versão nova."""
+    estado = monitor.estado
+    if estado.versao != versao:
+        st.rerun()
+    if estado.atualizado_em is not None:
+        st.caption(
+            f"🔄 {monitor.nome}: versão de "
+            f"{time.strftime('%d/%m %H:%M:%S', time.localtime(estado.atualizado_em))}, "
+            f"conferida a cada {monitor.intervalo:g} s"
+        )
+    if estado.erro is not None:
+        st.warning(
+            f"⚠️ Última leitura de {monitor.nome} falhou: {estado.erro}"
+            + (" (mostrando a versão anterior)" if estado.valor is not None else "")
+        )
+
+def versao_monitorada(monitor):
+    """Reserva da última versão lida pelo monitor (espera a primeira leitura)."""
+    estado = monitor.estado
+    if estado.versao == 0:
+        with st.spinner(f"Lendo {monitor.nome}..."):
+            estado = monitor.aguardar()
+    with st.sidebar:
+        situacao_monitor(monitor, estado.versao)
+    if estado.valor is None:
+        raise estado.erro
+    return estado.valor
+
+def carregar_sessao(ctx, fontes):
+    """Reserva a planilha no registro e calcula o STATUS de hoje."""
+    diag = ctx.diag
+    reservas = ctx.reservas
+    anterior = None
+    if isinstance(fontes[0][1], MonitorPlanilha):
+        # Planilha acompanhada: a versão nova já foi tratada pelo monitor
+        reserva = versao_monitorada(fontes[0][1])
+        diag.marcar('upload')
+        reservas.pop('varias', None)
+        atual = reservas.get('atual')
+        if atual is not None and atual.chave != reserva.chave:
+            reservas['anterior'] = atual
+        anterior = reservas.get('anterior')
+        reservas['atual'] = reserva
+    elif len(fontes) > 1 or not isinstance(fontes[0][1], bytes):
+        # Várias planilhas: sem comparação de revisões
+        chave = chave_fontes(fontes)
+        diag.marcar('upload')
+        reserva = reservas.get('varias')
+        if reserva is None or reserva.chave != chave:
+            reserva = reservar(
+                chave, lambda: carregar_varias(fontes), "Lendo planilhas..."
+            )
+        reservas['varias'] = reserva
+    else:
+        conteudo = fontes[0][1]
+        chave = hash_conteudo(conteudo)
+        diag.marcar('upload')
+        reservas.pop('varias', None)
+
+        # Revisões desta sessão: a atual e a anterior (para o que mudou)
+        atual = reservas.get('atual')
+        if atual is not None and atual.chave != chave:
+            reservas['anterior'] = atual
+        anterior = reservas.get('anterior')
+
+        if atual is not None and atual.chave == chave:
+            # Mesma planilha da interação anterior: a reserva já é da sessão
+            reserva = atual
+        else:
+            # Planilha nova: números parciais aparecem enquanto ela é lida
+            previa = PreviaCarga()
+            if anterior is not None:
+                # Nova revisão: tratada inteira e comparada com a anterior
+                def carregar_nova():
+                    df, tempos, tabela = carregar_revisao(
+                        conteudo, chave, anterior.df, ao_ler_bloco=previa.atualizar
+                    )
+                    return df, tempos, {('mudancas', anterior.chave): tabela}
+
+                reserva = reservar(
+                    chave, carregar_nova, "Comparando com a revisão anterior..."
+                )
+            else:
+                reserva = reservar(
+                    chave,
+                    lambda: carregar(conteudo, chave, ao_ler_bloco=previa.atualizar),
+                    "Lendo planilha..."
+                )
+            previa.limpar()
+        reservas['atual'] = reserva
+
+    if anterior is not None:
+        # Se outra sessão já tinha carregado esta planilha, a tabela de
+        # mudanças é montada aqui (uma vez por par de revisões)
+        ctx.mudancas = reserva.derivado(
+            ('mudancas', anterior.chave),
+            lambda: mudancas_entre(anterior.df, reserva.df)
+        )
+    ctx.reserva = reserva
+    diag.marcar('leitura')
+
+    # Status (o mesmo "hoje", à meia-noite, nos dois painéis)
+    t = time.perf_counter()
+    ctx.hoje = pd.Timestamp.today().normalize()
+    # assign: o df do registro não é alterado, e as outras colunas não são copiadas
+    ctx.df = reserva.df.assign(STATUS=definir_status(reserva.df, ctx.hoje))
+    ctx.tempos_carga = {**reserva.tempos, 'status': time.perf_counter() - t}
+    diag.marcar('status')
+
+    # Retrato do dia no histórico (uma vez por planilha e por dia)
+    def gravar_retrato():
+        with st.spinner("Gravando no histórico..."):
+            return gravar_snapshot(
+                ctx.df, reserva.chave, ctx.hoje, " + ".join(nome for nome, _ in fontes)
+            )
+
+    ctx.snapshot = reserva.derivado('historico', gravar_retrato, ctx.hoje)
+    diag.marcar('historico')
+
+def mostrar_carga(ctx):
+    df = ctx.df
+    if 'ORIGEM' in df.columns:
+        st.success(
+            f"✅ {len(df)} atividades carregadas de "
+            f"{df['ORIGEM'].nunique()} planilhas"
+        )
+    else:
+        st.success(f"✅ {len(df)} atividades carregadas")
+
+    with st.sidebar.expander("⏱️ Tempos de carga"):
+        st.caption(f"Origem: {ctx.tempos_carga['origem']}")
+        for etapa, seg in ctx.tempos_carga.items():
+            if etapa != 'origem':
+                st.caption(f"{etapa}: {seg * 1000:.0f} ms")
+
+    if ctx.mudancas is not None:
+        mudancas = ctx.mudancas
+        with st.expander(f"🔁 O que mudou desde a última planilha ({len(mudancas)})"):
+            resumo = mudancas['MUDANÇA'].value_counts()
+            st.caption(" | ".join(f"{k}: {v}" for k, v in resumo.items()))
+            st.dataframe(mudancas, use_container_width=True, hide_index=True)
+
+# =====================================================
+# FILTROS E KPIs
+# =====================================================
+def filtros_sidebar(ctx):
+    st.sidebar.markdown("---")
+    st.sidebar.header("🔎 Filtros")
+
+    # Com várias planilhas, dá para filtrar também pela planilha de origem
+    filtros = FILTROS
+    if 'ORIGEM' in ctx.df.columns:
+        filtros = {**FILTROS, 'ORIGEM': "Planilha"}
+
+    if st.sidebar.button("🔄 Limpar Filtros", use_container_width=True):
+        for col in filtros:
+            st.session_state[f"filtro_{col}"] = []
+        st.rerun()
+
+    indice = indice_filtros(ctx.reserva, filtros)
+
+    # Seleções atuais (da interação anterior), usadas para as opções em cascata
+    selecoes = {col: st.session_state.get(f"filtro_{col}", []) for col in filtros}
+
+    for col, label in filtros.items():
+        opcoes = indice.opcoes(col, selecoes)
+        chave_widget = f"filtro_{col}"
+        if chave_widget in st.session_state:
+            st.session_state[chave_widget] = [
+                v for v in st.session_state[chave_widget] if v in opcoes
+            ]
+        selecoes[col] = st.sidebar.multiselect(
+            label,
+            list(opcoes),
+            format_func=lambda v, opcoes=opcoes: f"{v} ({opcoes[v]})",
+            key=chave_widget
+        )
+
+    ctx.indice = indice
+    ctx.selecoes = selecoes
+    ctx.linhas_filtro = indice.linhas(selecoes)
+    ctx.df_filtrado = indice.filtrar(ctx.df, selecoes)
+    ctx.diag.marcar('filtros')
+
+def avaliar_prazos(ctx):
+    # Refeito a cada execução sobre as linhas filtradas (só colunas e groupby)
+    ctx.risco_os, ctx.risco_atividades = avaliar_risco(ctx.df_filtrado, ctx.hoje)
+    ctx.diag.marcar('risco')
+
+def mostrar_kpis(ctx):
+    kpis = calcular_kpis(ctx.df_filtrado)
+    colunas = st.columns(5)
+    for coluna, (rotulo, valor) in zip(colunas, kpis.items()):
+        coluna.metric(rotulo, valor)
+
+    riscos = ctx.risco_os['RISCO'].value_counts()
+    colunas[4].metric(
+        "OS que atrasarão", int(riscos["Atrasará"]),
+        delta=f"{int(riscos['Em risco'])} em risco", delta_color="off"
+    )
+    ctx.diag.marcar('kpis')
+
+def mostrar_prazos(ctx):
+    criticas = ctx.risco_os[ctx.risco_os['RISCO'].isin(["Atrasará", "Em risco"])]
+    with st.expander(f"⚠️ Prazo contratual por OS ({len(criticas)} em atenção)"):
+        st.caption(
+            "Fim projetado pelo trabalho que falta (LT OPERAÇÃO × % restante) "
+            "a partir de hoje; no Gantt, em vermelho, as atividades que "
+            "passam da data contratual."
+        )
+        tabela = criticas.head(100).assign(**{
+            col: criticas[col].head(100).dt.strftime('%d/%m/%Y')
+            for col in ['DATA CONTRATUAL', 'FIM PROJETADO']
+        })
+        st.dataframe(tabela, use_container_width=True, hide_index=True)
+
+# =====================================================
+# VISÕES CONSOLIDADAS
+# =====================================================
+def visoes_consolidadas(ctx, escalas):
+    """Mapas de calor; `escalas` dá a escala de cores de cada visão."""
+    st.markdown("---")
+    st.subheader("🗺️ Visões consolidadas")
+
+    granularidade = st.radio(
+        "Granularidade", list(GRANULARIDADES), horizontal=True, key="granularidade"
+    )
+    freq = GRANULARIDADES[granularidade]
+    filtrado = any(ctx.selecoes.values())
+
+    visoes = {
+        "Carga por área": (
+            agregacao(ctx, carga_por_area, freq, filtrado),
+            "Carga por área (soma de LT OPERAÇÃO)", escalas['carga'], '.1f', ''
+        ),
+        "Atrasadas por supervisor": (
+            agregacao(ctx, atrasadas_por_supervisor, freq, filtrado, ctx.hoje),
+            "Atividades atrasadas por supervisor (pelo DT FIM)",
+            escalas['atrasadas'], '.0f', ''
+        ),
+        "Progresso por cliente": (
+            agregacao(ctx, progresso_por_cliente, freq, filtrado),
+            "% concluído médio por cliente (pelo DT FIM)",
+            escalas['progresso'], '.0f', '%'
+        ),
+        "Ocupação e sobrecarga": (
+            agregacao(ctx, simultaneas_por_area, freq, filtrado, indice=ctx.datas),
+            "Atividades em execução por área (pico do período)",
+            escalas['ocupacao'], '.0f', ''
+        ),
+    }
+    ctx.diag.marcar('agregacoes')
+
+    for aba, (nome, (quadro, titulo, escala, formato, unidade)) in zip(
+        st.tabs(list(visoes)), visoes.items()
+    ):
+        with aba:
+            if quadro.empty:
+                st.info("Sem dados para esta visão")
+                continue
+            st.plotly_chart(
+                figura_mapa_calor(quadro, titulo, escala, formato, unidade),
+                use_container_width=True,
+                config={"displaylogo": False}
+            )
+            if nome == "Ocupação e sobrecarga":
+                capacidade = st.number_input(
+                    "Capacidade por área (atividades simultâneas)",
+                    min_value=1,
+                    value=capacidade_sugerida(quadro),
+                    key="capacidade"
+                )
+                excesso = sobrecarga(quadro, capacidade)
+                if excesso.empty:
+                    st.success("Nenhuma área acima da capacidade")
+                else:
+                    st.warning(
+                        f"⚠️ {len(excesso)} período(s) com área acima da capacidade"
+                    )
+                    st.dataframe(excesso, use_container_width=True, hide_index=True)
+    ctx.diag.contar(celulas_agregacoes=sum(v[0].size for v in visoes.values()))
+    ctx.diag.marcar('mapas_calor')
+
+# =====================================================
+# HISTÓRICO
+# =====================================================
+# Tendências a partir dos retratos gravados no SQLite (historico.py)
+PERIODOS_HISTORICO = {"3 meses": 3, "6 meses": 6, "12 meses": 12, "Tudo": None}
+
+# O corpo do expander roda a cada rerun, mesmo fechado. As consultas ficam
+# em cache até um retrato novo ser gravado (`ultimo_id` só entra na chave).
+@st.cache_data(max_entries=64, show_spinner=False)
+def tendencia_em_cache(desde, selecoes, por_semana, ultimo_id):
+    return tendencia(desde, selecoes, por_semana)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def evolucao_os_em_cache(os_, desde, ultimo_id):
+    return evolucao_os(os_, desde)
+
+def historico_tendencias(ctx):
+    n, primeira, ultima, ultimo_id = resumo()
+    rotulo = f"📈 Histórico ({n} retrato(s)"
+    if n:
+        rotulo += f", de {pd.Timestamp(primeira):%d/%m/%Y} a {pd.Timestamp(ultima):%d/%m/%Y}"
+    with st.expander(rotulo + ")"):
+        if ctx.snapshot is None:
+            st.warning("Não foi possível gravar esta planilha no histórico")
+        if n < 2:
+            st.info("As tendências aparecem a partir do segundo retrato (um por planilha e dia)")
+            return
+
+        col1, col2 = st.columns(2)
+        periodo = col1.radio(
+            "Período", list(PERIODOS_HISTORICO), index=1, horizontal=True,
+            key="historico_periodo"
+        )
+        por_semana = col2.checkbox(
+            "Só o último retrato de cada semana", True, key="historico_semana"
+        )
+        meses = PERIODOS_HISTORICO[periodo]
+        desde = None if meses is None else ctx.hoje - pd.DateOffset(months=meses)
+
+        tabela = tendencia_em_cache(desde, ctx.selecoes, por_semana, ultimo_id)
+        ctx.diag.marcar('historico_consulta')
+        if tabela.empty:
+            st.info("Sem retratos no período para os filtros atuais")
+            return
+        st.plotly_chart(
+            figura_tendencia(tabela, "Atividades atrasadas e concluídas por retrato"),
+            use_container_width=True
+        )
+
+        # Com uma OS só nos filtros, a evolução dela retrato a retrato
+        os_filtradas = ctx.selecoes.get('OS') or []
+        if len(os_filtradas) == 1:
+            st.markdown(f"**Evolução da OS {os_filtradas[0]}**")
+            evolucao = evolucao_os_em_cache(os_filtradas[0], desde, ultimo_id)
+            evolucao['DATA'] = evolucao['DATA'].dt.strftime('%d/%m/%Y')
+            evolucao['ÚLTIMO DT FIM'] = evolucao['ÚLTIMO DT FIM'].dt.strftime('%d/%m/%Y')
+            st.dataframe(evolucao, use_container_width=True, hide_index=True)
+    ctx.diag.marcar('historico_tendencias')
+
+# =====================================================
+# TABELA DE ATIVIDADES
+# =====================================================
+# Busca, ordenação e paginação no servidor: só a página visível é enviada
+def tabela_atividades(ctx):
+    st.markdown("---")
+    st.subheader("📋 Atividades")
+
+    col1, col2, col3 = st.columns([3, 2, 1])
+    termo = col1.text_input("🔍 Buscar na descrição", key="busca")
+    ordenar_por = col2.selectbox(
+        "Ordenar por", ["Ordem da planilha"] + COLUNAS_TABELA, key="ordenar_por"
+    )
+    decrescente = col3.checkbox("Decrescente", key="decrescente")
+
+    selecao = indice_tabela(ctx.reserva).selecionar(
+        ctx.df,
+        ctx.linhas_filtro,
+        termo,
+        None if ordenar_por == "Ordem da planilha" else ordenar_por,
+        decrescente
+    )
+    ctx.diag.marcar('tabela_busca')
+
+    if len(selecao) == 0:
+        st.info("Nenhuma atividade encontrada")
+    else:
+        por_pagina = LINHAS_POR_PAGINA_TABELA
+        n_paginas = -(-len(selecao) // por_pagina)
+        numero = 1
+        if n_paginas > 1:
+            # A busca ou os filtros podem ter reduzido o nº de páginas
+            st.session_state["pagina_tabela"] = min(
+                st.session_state.get("pagina_tabela", 1), n_paginas
+            )
+            numero = st.number_input(
+                f"Página da tabela (de {n_paginas})",
+                min_value=1, max_value=n_paginas, key="pagina_tabela"
+            )
+        inicio = (numero - 1) * por_pagina
+        st.caption(
+            f"Linhas {inicio + 1}–{min(inicio + por_pagina, len(selecao))} "
+            f"de {len(selecao)}"
+        )
+        st.dataframe(
+            pagina(ctx.df, selecao, numero, por_pagina),
+            use_container_width=True,
+            hide_index=True
+        )
+    ctx.diag.marcar('tabela')
+
+def exportar_filtrado(ctx):
+    """Download das atividades filtradas, com % CONCLUÍDO e STATUS.
+
+    O arquivo só é gerado no clique, numa thread à parte da execução do
+    script (o data do download_button é uma função).
+    """
+    col1, col2 = st.columns([1, 3], vertical_alignment="bottom")
+    formato = col1.selectbox(
+        "📥 Exportar as atividades filtradas", list(FORMATOS),
+        format_func=lambda f: FORMATOS[f][0], key="formato_exportacao"
+    )
+    _, extensao, mime = FORMATOS[formato]
+    df, linhas = ctx.df, ctx.linhas_filtro
+    col2.download_button(
+        f"Baixar {len(ctx.df_filtrado)} atividade(s)",
+        data=lambda: exportar(df, linhas, formato),
+        file_name=f"programacao_filtrada_{ctx.hoje:%Y%m%d}.{extensao}",
+        mime=mime,
+        on_click='ignore',
+        key="baixar_filtrado"
+    )
+
+# =====================================================
+# MEMÓRIA E DIAGNÓSTICO
+# =====================================================
+# Planilhas das reservas da sessão, pelo nome em ctx.reservas
+ROTULOS_RESERVAS = {
+    'atual': "Planilha",
+    'anterior': "Revisão anterior",
+    'varias': "Planilhas combinadas",
+}
+
+def mostrar_memoria(ctx, **extras):
+    # As planilhas ficam no registro, uma vez para todas as sessões: contam
+    # à parte. Da sessão são só o STATUS (as outras colunas de ctx.df são as
+    # do registro) e os recortes dela
+    compartilhados = {
+        ROTULOS_RESERVAS.get(nome, nome): reserva.df
+        for nome, reserva in ctx.reservas.items()
+    }
+    da_sessao = {
+        "STATUS": ctx.df[['STATUS']],
+        "Filtrado": None if ctx.df_filtrado is ctx.df else ctx.df_filtrado,
+        **extras,
+    }
+    with st.sidebar.expander("💾 Memória da sessão"):
+        for nome, d in da_sessao.items():
+            if d is not None:
+                st.caption(f"{nome}: {memoria_mb(d):.1f} MB")
+        st.caption(f"Total da sessão: {memoria_mb(*da_sessao.values()):.1f} MB")
+        for nome, d in compartilhados.items():
+            st.caption(f"{nome} (compartilhada): {memoria_mb(d):.1f} MB")
+        resumo = registro_planilhas().resumo()
+        st.caption(
+            f"Registro do servidor: {resumo['planilhas']} planilha(s), "
+            f"{resumo['memoria_mb']:.1f} MB, {resumo['reservas']} reserva(s)"
+        )
+
+def mostrar_diagnostico(ctx):
+    diag = ctx.diag
+    with st.sidebar.expander("🩺 Diagnóstico", expanded=True):
+        st.caption(f"Total: {diag.total * 1000:.0f} ms")
+        for etapa, seg in diag.etapas.items():
+            st.caption(f"{etapa}: {seg * 1000:.0f} ms")
+        for nome, valor in diag.contagens.items():
+            st.caption(f"{nome}: {valor:,}".replace(",", "."))
+        figuras = cache_figuras().resumo()
+        st.caption(
+            f"Cache de figuras: {figuras['figuras']} figura(s), "
+            f"{figuras['memoria_mb']:.1f} MB, {figuras['acertos']} acerto(s) e "
+            f"{figuras['faltas']} falta(s) ({figuras['taxa_acertos']:.0%})"
+        )
+        if st.checkbox("Gravar em log (JSONL)", key="diagnostico_log"):
+            caminho = diag.gravar(carga_s=ctx.tempos_carga, cache_figuras=figuras)
+            st.caption(f"Gravado em {caminho}")
+
+# =====================================================
+# PAINEL
+# =====================================================
+def executar(estilo):
+    """Monta o painel inteiro com o renderizador de Gantt de `estilo`."""
+    renderizador = importlib.import_module(ESTILOS[estilo])
+
+    st.set_page_config(
+        page_title="Programação Oficina",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    st.title("PAINEL DE CONTROLE: PROGRAMAÇÃO MTR")
+    st.markdown("### Programação semanal")
+    st.markdown("---")
+
+    fontes, diag = ler_fontes(renderizador.APP)
+    if not fontes:
+        st.info("Por favor, faça o upload da planilha na barra lateral.")
+        st.stop()
+
+    ctx = Contexto(diag)
+    try:
+        carregar_sessao(ctx, fontes)
+    except PlanilhaInvalida as e:
+        st.error(f"❌ Planilha fora do formato esperado: {e}")
+        st.stop()
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar a planilha: {e}")
+        st.stop()
+    mostrar_carga(ctx)
+
+    filtros_sidebar(ctx)
+    avaliar_prazos(ctx)
+    mostrar_kpis(ctx)
+    mostrar_prazos(ctx)
+    visoes_consolidadas(ctx, renderizador.ESCALAS)
+    historico_tendencias(ctx)
+
+    st.markdown("---")
+    df_gantt = renderizador.gantt(ctx)
+
+    tabela_atividades(ctx)
+    exportar_filtrado(ctx)
+
+    st.markdown("---")
+    st.caption(renderizador.RODAPE)
+
+    mostrar_memoria(ctx, Gantt=df_gantt)
+    if diag.ativo:
+        mostrar_diagnostico(ctx)
@@ -0,0 +1,127 @@
+# =====================================================
+# TABELA PAGINADA DE ATIVIDADES
+# =====================================================
+# Montado uma vez por planilha. A descrição é guardada normalizada (sem
+# acentos, minúsculas) para a busca por trecho, e a ordem de cada coluna
+# (argsort estável) é calculada na primeira vez em que se ordena por ela.
+# Busca, ordenação e paginação trabalham só com posições: apenas as linhas
+# da página visível viram DataFrame e vão para o navegador.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+COLUNA_BUSCA = 'PROGRAMAÇÃO | PROG. DETALHADA'
+
+COLUNAS_TABELA = [
+    'OS', 'PROG.', 'PROGRAMAÇÃO | PROG. DETALHADA', 'DT INICIO', 'DT FIM',
+    '% CONCLUÍDO', 'STATUS',
+]
+
+
+def normalizar_texto(serie):
+    """Texto sem acentos e em minúsculas, para comparar na busca."""
+    return (
+        serie.astype(object).fillna('').astype(str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .astype('str')
+    )
+
+
+class IndiceTabela:
+    def __init__(self, df, col_busca=COLUNA_BUSCA, max_buscas=16):
+        self.n = len(df)
+        self.df = df
+        self.texto = normalizar_texto(df[col_busca]).reset_index(drop=True)
+        self.max_buscas = max_buscas
+        self._ordens = {}
+        self._buscas = OrderedDict()   # termo -> posições (buscas recentes)
+        self._trava = threading.Lock()
+
+    def buscar(self, termo):
+        """Posições (ordenadas) das linhas cuja descrição contém `termo`."""
+        termo = normalizar_texto(pd.Series([termo])).iloc[0].strip()
+        if not termo:
+            return None
+
+        with self._trava:
+            if termo in self._buscas:
+                self._buscas.move_to_end(termo)
+                return self._buscas[termo]
+            # Digitando: o termo novo contém um já buscado, então só as
+            # linhas que bateram com ele precisam ser conferidas
+            base = max(
+                (t for t in self._buscas if t in termo), key=len, default=None
+            )
+            candidatas = None if base is None else self._buscas[base]
+
+        if candidatas is None:
+            achou = self.texto.str.contains(termo, regex=False).to_numpy(dtype=bool)
+            posicoes = np.flatnonzero(achou)
+        else:
+            achou = self.texto.iloc[candidatas].str.contains(termo, regex=False)
+            posicoes = candidatas[achou.to_numpy(dtype=bool)]
+
+        with self._trava:
+            self._buscas[termo] = posicoes
+            while len(self._buscas) > self.max_buscas:
+                self._buscas.popitem(last=False)
+        return posicoes
+
+    def ordem(self, df, coluna, decrescente=False):
+        """Posições de todas as linhas ordenadas por `coluna` (vazios no fim).
+
+        Colunas da planilha do índice ficam guardadas; as calculadas a cada
+        execução (ex.: STATUS) são ordenadas na hora, a partir de `df`.
+        """
+        chave = (coluna, decrescente)
+        with self._trava:
+            if chave in self._ordens:
+                return self._ordens[chave]
+
+        fixa = coluna in self.df.columns
+        serie = (self.df if fixa else df)[coluna].reset_index(drop=True)
+        ordem = serie.sort_values(
+            ascending=not decrescente, na_position='last', kind='stable'
+        ).index.to_numpy()
+        if fixa:
+            with self._trava:
+                self._ordens[chave] = ordem
+        return ordem
+
+    def selecionar(self, df, linhas=None, termo='', coluna=None,
+                   decrescente=False):
+        """Posições das linhas da tabela, na ordem em que aparecem.
+
+        `linhas` são as posições que passaram pelos filtros (None = todas);
+        `termo` filtra pela descrição e `coluna` ordena.
+        """
+        mascara = None
+        if linhas is not None:
+            mascara = np.zeros(self.n, dtype=bool)
+            mascara[linhas] = True
+        achadas = self.buscar(termo) if termo else None
+        if achadas is not None:
+            na_busca = np.zeros(self.n, dtype=bool)
+            na_busca[achadas] = True
+            mascara = na_busca if mascara is None else mascara & na_busca
+
+        if coluna:
+            selecao = self.ordem(df, coluna, decrescente)
+            if mascara is not None:
+                selecao = selecao[mascara[selecao]]
+            return selecao
+        if mascara is not None:
+            return np.flatnonzero(mascara)
+        return np.arange(self.n)
+
+
+def pagina(df, selecao, numero, por_pagina=50, colunas=None):
+    """DataFrame só com as linhas da página `numero` (a partir de 1)."""
+    inicio = (numero - 1) * por_pagina
+    colunas = [c for c in (colunas or COLUNAS_TABELA) if c in df.columns]
+    return df.iloc[selecao[inicio:inicio + por_pagina]][colunas]
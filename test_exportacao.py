@@ -0,0 +1,101 @@
+# =====================================================
+# TESTES: EXPORTAÇÃO EM XLSX
+# =====================================================
+# O xlsx escrito direto (exportacao.py) é lido de volta com o openpyxl e
+# comparado com o df: tipos, datas, textos com XML e os casos de borda.
+import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from exportacao import ABA_EXPORTACAO, COLUNAS_INTERNAS, MAX_TEXTO_CELULA, exportar
+
+
+def recorte():
+    inicio = pd.Timestamp('2024-06-10')
+    return pd.DataFrame({
+        'OS': [1001.0, 1002.0, np.nan, 1004.0],
+        'PROG.': pd.Categorical(['USINAGEM', 'PINTURA', None, 'USINAGEM']),
+        'DESCRIÇÃO': ['Eixo <Ø 50> & "flange"', "Peça 'A'\x01\x0b com\tTAB", None, 'ok'],
+        'DT INICIO': pd.Series([inicio, inicio + pd.Timedelta(days=1), pd.NaT, inicio]),
+        'DT FIM': pd.Series([
+            inicio + pd.Timedelta(hours=7, minutes=30), pd.NaT,
+            inicio + pd.Timedelta(days=2, hours=17), inicio,
+        ]),
+        '% CONCLUÍDO': [12.3, 99.999999, 0.0, 100.0],
+        '% CONCLUÍDO_ORIGINAL': [np.nan] * 4,
+    })
+
+
+def ler_de_volta(arquivo):
+    wb = openpyxl.load_workbook(arquivo)
+    assert wb.sheetnames == [ABA_EXPORTACAO]
+    linhas = list(wb[ABA_EXPORTACAO].iter_rows(values_only=True))
+    return wb[ABA_EXPORTACAO], list(linhas[0]), [list(linha) for linha in linhas[1:]]
+
+
+def test_valores_voltam_iguais():
+    df = recorte()
+    _, cabecalho, linhas = ler_de_volta(exportar(df, linhas_por_bloco=3))
+    assert cabecalho == [c for c in df.columns if c not in COLUNAS_INTERNAS]
+    assert linhas == [
+        [1001, 'USINAGEM', 'Eixo <Ø 50> & "flange"', datetime.datetime(2024, 6, 10),
+         datetime.datetime(2024, 6, 10, 7, 30), 12.3],
+        [1002, 'PINTURA', "Peça 'A' com\tTAB", datetime.datetime(2024, 6, 11), None, 99.999999],
+        [None, None, None, None, datetime.datetime(2024, 6, 12, 17), 0],
+        [1004, 'USINAGEM', 'ok', datetime.datetime(2024, 6, 10),
+         datetime.datetime(2024, 6, 10), 100],
+    ]
+
+
+def test_formato_das_datas():
+    aba, _, _ = ler_de_volta(exportar(recorte()))
+    # Coluna só com datas sai como data; com horas, como data e hora
+    assert aba['D2'].number_format == 'dd/mm/yyyy'
+    assert aba['E2'].number_format == 'dd/mm/yyyy hh:mm'
+    assert aba['A1'].font.b
+
+
+def test_linhas_selecionadas_em_blocos():
+    df = recorte()
+    _, _, linhas = ler_de_volta(exportar(df, linhas=[3, 0], linhas_por_bloco=1))
+    assert [linha[0] for linha in linhas] == [1004, 1001]
+
+
+def test_selecao_vazia():
+    df = recorte()
+    aba, cabecalho, linhas = ler_de_volta(exportar(df, linhas=np.array([], dtype=int)))
+    assert cabecalho == [c for c in df.columns if c not in COLUNAS_INTERNAS]
+    assert linhas == []
+    assert aba.max_row == 1
+
+
+def test_colunas_depois_do_z():
+    df = pd.DataFrame({f'C{i}': [float(i), np.nan if i < 59 else 1.5] for i in range(60)})
+    aba, cabecalho, linhas = ler_de_volta(exportar(df))
+    assert cabecalho == list(df.columns)
+    assert linhas[0] == list(range(60))
+    assert linhas[1] == [None] * 59 + [1.5]
+    assert aba['AA2'].value == 26 and aba['BH2'].value == 59
+
+
+def test_texto_longo_cortado():
+    df = pd.DataFrame({'TEXTO': ['x' * (MAX_TEXTO_CELULA + 10)]})
+    _, _, linhas = ler_de_volta(exportar(df))
+    assert len(linhas[0][0]) == MAX_TEXTO_CELULA
+
+
+@pytest.mark.parametrize('formato', ['parquet', 'csv'])
+def test_outros_formatos(formato):
+    df = recorte()
+    arquivo = exportar(df, linhas=[0, 2], formato=formato, linhas_por_bloco=1)
+    if formato == 'parquet':
+        lido = pd.read_parquet(arquivo)
+        esperado = df.drop(columns=COLUNAS_INTERNAS).iloc[[0, 2]].reset_index(drop=True)
+        pd.testing.assert_frame_equal(lido, esperado, check_dtype=False)
+    else:
+        texto = arquivo.getvalue().decode('utf-8-sig').splitlines()
+        assert len(texto) == 3
+        assert texto[1].startswith('1001,0;USINAGEM;')
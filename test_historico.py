@@ -0,0 +1,82 @@
+# =====================================================
+# TESTES: HISTÓRICO (SQLITE)
+# =====================================================
+# Tendência semanal com várias planilhas, o caminho com filtros igual ao
+# dos totais gravados e o esquema criado uma vez por banco.
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import historico
+from historico import conectar, gravar_snapshot, tendencia
+
+
+def retrato(n, atrasadas, cliente='VALE', pct=50.0):
+    return pd.DataFrame({
+        'OS': [str(1000 + i % 3) for i in range(n)],
+        'CLIENTE': [cliente] * n,
+        'DT FIM': pd.to_datetime(['2026-03-01'] * n),
+        '% CONCLUÍDO': [pct] * n,
+        'STATUS': ['Atrasado'] * atrasadas + ['Em Andamento'] * (n - atrasadas),
+    })
+
+
+@pytest.fixture
+def banco(tmp_path):
+    return str(tmp_path / 'historico.sqlite')
+
+
+def test_semana_soma_o_ultimo_retrato_de_cada_planilha(banco):
+    # Semana de 02/03 a 08/03/2026: duas revisões da planilha A (chaves
+    # diferentes) e uma da planilha B
+    gravar_snapshot(retrato(10, 1), 'a1', '2026-03-02', 'oficina_a.xlsx', banco)
+    gravar_snapshot(retrato(12, 3), 'a2', '2026-03-05', 'oficina_a.xlsx', banco)
+    gravar_snapshot(retrato(4, 2, 'PETRO', 100.0), 'b1', '2026-03-03', 'oficina_b.xlsx', banco)
+    # Semana seguinte: só a planilha A
+    gravar_snapshot(retrato(8, 0), 'a3', '2026-03-10', 'oficina_a.xlsx', banco)
+
+    semanal = tendencia(banco=banco)
+    assert semanal['DATA'].dt.strftime('%Y-%m-%d').tolist() == ['2026-03-05', '2026-03-10']
+    assert semanal['ATIVIDADES'].tolist() == [12 + 4, 8]
+    assert semanal['ATRASADAS'].tolist() == [3 + 2, 0]
+    assert semanal['OS'].tolist() == [3 + 3, 3]
+    assert semanal['% CONCLUÍDO MÉDIO'].tolist() == pytest.approx(
+        [(12 * 50 + 4 * 100) / 16, 50.0]
+    )
+
+    # Sem agrupar por semana: um retrato por linha
+    assert tendencia(por_semana=False, banco=banco)['ATIVIDADES'].tolist() == [10, 4, 12, 8]
+
+    # Com filtros, as mesmas contas sobre as atividades
+    filtrada = tendencia(selecoes={'CLIENTE': ['VALE']}, banco=banco)
+    assert filtrada['ATIVIDADES'].tolist() == [12, 8]
+    tudo = tendencia(selecoes={'CLIENTE': ['VALE', 'PETRO']}, banco=banco)
+    pd.testing.assert_frame_equal(tudo, semanal, check_dtype=False)
+
+
+def test_esquema_criado_uma_vez(banco, monkeypatch):
+    chamadas = []
+    completar = historico._completar_totais
+    monkeypatch.setattr(
+        historico, '_completar_totais', lambda con: chamadas.append(1) or completar(con)
+    )
+    for _ in range(3):
+        conectar(banco).close()
+    assert len(chamadas) == 1
+
+    # Cada conexão ainda liga as chaves estrangeiras (o ON DELETE CASCADE)
+    con = conectar(banco)
+    assert con.execute("PRAGMA foreign_keys").fetchone() == (1,)
+    assert con.execute("PRAGMA journal_mode").fetchone() == ('wal',)
+    con.close()
+
+
+def test_banco_apagado_e_recriado(banco):
+    gravar_snapshot(retrato(5, 1), 'a1', '2026-03-02', 'a.xlsx', banco)
+    for sufixo in ['', '-wal', '-shm']:
+        if os.path.exists(banco + sufixo):
+            os.remove(banco + sufixo)
+    assert gravar_snapshot(retrato(5, 1), 'a1', '2026-03-02', 'a.xlsx', banco) is not None
+    assert np.array_equal(tendencia(banco=banco)['ATIVIDADES'], [5])
@@ -0,0 +1,120 @@
+# =====================================================
+# TESTES: ÍNDICE DE INTERVALOS
+# =====================================================
+# As buscas do IndiceIntervalos são comparadas com a conferência direta
+# (máscara sobre o df inteiro), inclusive com atividades longas, DT FIM
+# digitado anos à frente, fim antes do início e datas vazias.
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregacoes import carga_por_area, simultaneas_por_area
+from intervalos import IndiceIntervalos, faixa_continua
+
+INICIO = pd.Timestamp('2024-06-01')
+
+
+def atividades(semente, n=3000, erros=True):
+    rng = np.random.default_rng(semente)
+    inicio = INICIO + pd.to_timedelta(rng.integers(0, 120 * 24, n), unit='h')
+    fim = inicio + pd.to_timedelta(rng.integers(0, 15 * 24, n), unit='h')
+    df = pd.DataFrame({
+        'DT INICIO': inicio,
+        'DT FIM': fim,
+        'PROG.': rng.choice(['USINAGEM', 'PINTURA', 'CALDEIRARIA', None], n),
+        'LT OPERAÇÃO': rng.choice([4.0, 8.0, 16.0], n),
+    })
+    if erros:
+        df.loc[0, 'DT FIM'] = pd.Timestamp('2204-06-01')     # ano digitado errado
+        df.loc[1, 'DT INICIO'] = pd.Timestamp('1924-06-01')
+        df.loc[2, 'DT FIM'] = df.loc[2, 'DT INICIO'] - pd.Timedelta(days=3)
+        df.loc[3, 'DT FIM'] = df.loc[3, 'DT INICIO'] + pd.Timedelta(days=200)
+        df.loc[4:9, 'DT INICIO'] = pd.NaT
+        df.loc[10:12, 'DT FIM'] = pd.NaT
+    return df
+
+
+def cruzam(df, a, b):
+    # Fim antes do início conta como um instante só (o próprio início);
+    # datas vazias ficam de fora
+    fim = df['DT FIM'].where(df['DT FIM'] >= df['DT INICIO'], df['DT INICIO'])
+    return np.flatnonzero((df['DT INICIO'] <= b) & (fim >= a) & df['DT FIM'].notna())
+
+
+@pytest.mark.parametrize('semente', range(3))
+@pytest.mark.parametrize('erros', [False, True])
+def test_sobrepoe_igual_a_conferencia_direta(semente, erros):
+    df = atividades(semente, erros=erros)
+    indice = IndiceIntervalos(df)
+    rng = np.random.default_rng(semente + 10)
+    for _ in range(100):
+        a = INICIO + pd.Timedelta(hours=int(rng.integers(-30 * 24, 150 * 24)))
+        b = a + pd.Timedelta(hours=int(rng.integers(0, 30 * 24)))
+        esperado = cruzam(df, a, b)
+        np.testing.assert_array_equal(indice.sobrepoe(a, b), esperado)
+        assert indice.contar(a, b) == len(esperado)
+    dia = INICIO + pd.Timedelta(days=40)
+    np.testing.assert_array_equal(
+        indice.ativas_em(dia + pd.Timedelta(hours=15)),
+        cruzam(df, dia, dia + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns'))
+    )
+
+
+def test_atividade_longa_fica_na_classe_dela():
+    indice = IndiceIntervalos(atividades(0))
+    # A busca de cada classe olha só as que começam até a maior duração dela
+    # antes de `a`: a de 180 anos não alarga a busca das outras
+    maiores = [maior for _, _, _, maior in indice.classes]
+    assert maiores == sorted(maiores)
+    assert sum(len(posicoes) for _, _, posicoes, _ in indice.classes) == len(indice)
+    _, _, posicoes, _ = indice.classes[-1]
+    assert set(posicoes) <= {0, 1, 3}
+
+
+def test_indice_vazio():
+    df = atividades(0).iloc[:0]
+    indice = IndiceIntervalos(df)
+    assert len(indice.sobrepoe(INICIO, INICIO + pd.Timedelta(days=7))) == 0
+    assert simultaneas_por_area(df, 'D', indice=indice).empty
+
+
+def test_faixa_continua_ignora_datas_isoladas():
+    df = atividades(0).dropna(subset=['DT INICIO', 'DT FIM'])
+    primeiro, ultimo = faixa_continua(df['DT INICIO'], df['DT FIM'])
+    assert primeiro == df['DT INICIO'].iloc[3:].min().normalize()
+    assert INICIO + pd.Timedelta(days=120) < ultimo < INICIO + pd.Timedelta(days=400)
+    sem_erros = atividades(0, erros=False)
+    assert faixa_continua(sem_erros['DT INICIO'], sem_erros['DT FIM']) == (
+        sem_erros['DT INICIO'].min().normalize(), sem_erros['DT FIM'].max().normalize()
+    )
+
+
+@pytest.mark.parametrize('erros', [False, True])
+def test_simultaneas_por_dia(erros):
+    df = atividades(1, erros=erros)
+    quadro = simultaneas_por_area(df, 'D', indice=IndiceIntervalos(df))
+    # Um DT FIM em 2204 não vira 65 mil colunas
+    assert quadro.shape[1] < 500
+    for dia in quadro.columns[::7]:
+        ativas = df.iloc[cruzam(df, dia, dia + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns'))]
+        esperado = ativas['PROG.'].value_counts().reindex(quadro.index, fill_value=0)
+        np.testing.assert_array_equal(quadro[dia].to_numpy(), esperado.to_numpy())
+
+
+def test_carga_por_area_na_grade():
+    df = atividades(2)
+    quadro = carga_por_area(df, 'D')
+    assert quadro.shape[1] < 500
+    # Carga de um dia da grade: cada atividade ativa nele contribui com
+    # LT / nº de dias dela, mesmo a que termina fora da grade
+    validas = df.dropna(subset=['DT INICIO', 'DT FIM', 'PROG.'])
+    inicio = validas['DT INICIO'].dt.normalize()
+    fim = np.maximum(validas['DT FIM'].dt.normalize(), inicio)
+    taxa = validas['LT OPERAÇÃO'] / ((fim - inicio).dt.days + 1)
+    for dia in quadro.columns[::11]:
+        ativas = (inicio <= dia) & (fim >= dia)
+        esperado = taxa[ativas].groupby(validas['PROG.'][ativas]).sum()
+        np.testing.assert_allclose(
+            quadro[dia].to_numpy(), esperado.reindex(quadro.index, fill_value=0).to_numpy(),
+            atol=1e-9
+        )
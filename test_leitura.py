@@ -0,0 +1,241 @@
+# =====================================================
+# TESTES: LEITURA EM BLOCOS DO XLSX
+# =====================================================
+# O leitor próprio (leitura em blocos) tem de devolver o mesmo df que o
+# pandas.read_excel com openpyxl e com calamine, inclusive nas planilhas
+# fora do padrão: datas no sistema de 1904 e partes do pacote em outro lugar.
+import datetime
+import io
+import os
+import re
+import time
+import zipfile
+
+import openpyxl
+import pandas as pd
+import pytest
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+import leitura
+from leitura import (
+    ABA, COLUNAS, LINHA_CABECALHO, PlanilhaInvalida, _ler_em_blocos, _ler_excel,
+    engine_excel, ler_em_blocos, validar_planilha
+)
+
+ENGINES = ['openpyxl'] + (['calamine'] if engine_excel() == 'calamine' else [])
+
+
+# ---------------- DADOS ----------------
+def linhas_de_dados():
+    inicio = datetime.datetime(2024, 6, 10, 7, 30)
+    linhas = []
+    for i in range(40):
+        linhas.append([
+            1000 + i // 3 if i % 7 else f"OS-{i}",          # número e texto
+            f"WK{24 + i % 3}",
+            ['USINAGEM', 'PINTURA', None, 'CALDEIRARIA'][i % 4],
+            'ANA & BRUNO' if i % 2 else '<CARLA>',
+            'VALE',
+            f"Atividade {i} — descrição com acento" if i % 5 else None,
+            inicio + datetime.timedelta(days=i, hours=i % 5),
+            # Data digitada como texto em algumas linhas
+            '2024-07-01' if i % 9 == 0 else inicio + datetime.timedelta(days=i + 3),
+            None if i % 6 == 0 else datetime.datetime(2024, 8, 1),
+            i % 4 + 0.5 if i % 3 else i,
+            [0, 4, 8.5, None][i % 4],
+            [None, 0, 50, 100, 120, 'n/a'][i % 6],
+        ])
+    return linhas
+
+
+def planilha(data1904=False, linhas=None):
+    wb = openpyxl.Workbook()
+    if data1904:
+        wb.epoch = CALENDAR_MAC_1904
+    ws = wb.active
+    ws.title = ABA
+    ws['A1'] = "PROGRAMAÇÃO DA OFICINA"
+    ws['B3'] = "Atualizado em"
+    # Cabeçalho com quebras de linha e espaços, como vem da planilha real
+    for coluna, nome in enumerate(COLUNAS, start=1):
+        ws.cell(LINHA_CABECALHO + 1, coluna, nome.replace(' | ', ' |\n') + ' ')
+    ws.cell(LINHA_CABECALHO + 1, len(COLUNAS) + 1, 'OBS')
+    for numero, valores in enumerate(linhas or linhas_de_dados(), start=LINHA_CABECALHO + 2):
+        # Uma linha em branco no meio dos dados
+        if numero == LINHA_CABECALHO + 12:
+            continue
+        for coluna, valor in enumerate(valores, start=1):
+            ws.cell(numero, coluna, valor)
+    wb.create_sheet("Resumo")['A1'] = "outra aba"
+    saida = io.BytesIO()
+    wb.save(saida)
+    return saida.getvalue()
+
+
+def compartilhar_textos(conteudo, destino='xl/sharedStrings.xml'):
+    # O openpyxl grava os textos dentro das células (inlineStr); o Excel os
+    # guarda no sharedStrings. Refaz o pacote assim, com a parte em `destino`
+    # (só as relações e o [Content_Types] dizem onde ela está)
+    textos = []
+
+    def compartilhar(achado):
+        textos.append(achado.group(2))
+        return achado.group(1) + b't="s"><v>' + str(len(textos) - 1).encode() + b'</v></c>'
+
+    saida = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as origem, \
+            zipfile.ZipFile(saida, 'w', zipfile.ZIP_DEFLATED) as novo:
+        partes = {nome: origem.read(nome) for nome in origem.namelist()}
+        for nome, dados in partes.items():
+            if nome.startswith('xl/worksheets/'):
+                partes[nome] = re.sub(
+                    rb'(<c [^>]*)t="inlineStr"><is>(.*?)</is></c>', compartilhar, dados,
+                    flags=re.DOTALL
+                )
+        partes[destino] = (
+            b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            + b''.join(b'<si>' + t + b'</si>' for t in textos) + b'</sst>'
+        )
+        partes['xl/_rels/workbook.xml.rels'] = partes['xl/_rels/workbook.xml.rels'].replace(
+            b'</Relationships>',
+            b'<Relationship Id="rIdTextos" Target="/' + destino.encode() + b'" Type="http://'
+            b'schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/>'
+            b'</Relationships>'
+        )
+        partes['[Content_Types].xml'] = partes['[Content_Types].xml'].replace(
+            b'</Types>',
+            b'<Override PartName="/' + destino.encode() + b'" ContentType="application/'
+            b'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>'
+        )
+        for nome, dados in partes.items():
+            novo.writestr(nome, dados)
+    return saida.getvalue()
+
+
+def comparar(obtido, esperado):
+    pd.testing.assert_frame_equal(
+        obtido.reset_index(drop=True), esperado.reset_index(drop=True),
+        check_dtype=False
+    )
+
+
+# ---------------- TESTES ----------------
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('data1904', [False, True])
+def test_blocos_igual_ao_read_excel(engine, data1904):
+    conteudo = planilha(data1904)
+    esperado = _ler_excel(conteudo, engine)
+    comparar(_ler_em_blocos(conteudo), esperado)
+
+
+def test_datas_no_sistema_1904():
+    df = _ler_em_blocos(planilha(data1904=True))
+    assert df['DT INICIO'].iloc[0] == pd.Timestamp('2024-06-10 07:30')
+    assert df['DATA CONTRATUAL'].dropna().eq(pd.Timestamp('2024-08-01')).all()
+
+
+@pytest.mark.parametrize('engine, destino', [
+    (engine, 'xl/sharedStrings.xml') for engine in ENGINES
+] + [('openpyxl', 'xl/textos/compartilhados.xml')])
+def test_textos_compartilhados(engine, destino):
+    conteudo = compartilhar_textos(planilha(), destino)
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as xlsx:
+        assert b'inlineStr' not in xlsx.read('xl/worksheets/sheet1.xml')
+    esperado = _ler_excel(conteudo, engine)
+    assert esperado['PROG.'].notna().any()
+    comparar(_ler_em_blocos(conteudo), esperado)
+
+
+def test_blocos_pequenos(monkeypatch):
+    conteudo = planilha()
+    inteiro = _ler_em_blocos(conteudo)
+    monkeypatch.setattr(leitura, 'LINHAS_POR_BLOCO', 7)
+    recebidos = []
+    df = _ler_em_blocos(conteudo, lambda bloco, lidas: recebidos.append((bloco, lidas)))
+    comparar(df, inteiro)
+    assert [len(b) for b, _ in recebidos] == [7] * 5 + [5]
+    assert recebidos[-1][1] == len(df)
+    comparar(pd.concat([b for b, _ in recebidos]), df)
+    comparar(pd.concat(ler_em_blocos(conteudo, 10)), df)
+
+
+def test_validar_planilha():
+    assert list(validar_planilha(planilha())) == COLUNAS
+
+    with pytest.raises(PlanilhaInvalida, match='não é uma planilha .xlsx'):
+        validar_planilha(b'nao e um zip')
+    with pytest.raises(PlanilhaInvalida, match='Abas da planilha: "Programação Detalhada"'):
+        validar_planilha(planilha(), aba="Outra")
+    with pytest.raises(PlanilhaInvalida, match='está na linha 7, mas deve estar na linha 6'):
+        validar_planilha(planilha(), linha_cabecalho=LINHA_CABECALHO - 1)
+
+    wb = openpyxl.load_workbook(io.BytesIO(planilha()))
+    wb[ABA].cell(LINHA_CABECALHO + 1, COLUNAS.index('CLIENTE') + 1).value = None
+    saida = io.BytesIO()
+    wb.save(saida)
+    with pytest.raises(PlanilhaInvalida, match='Faltam colunas .*: CLIENTE'):
+        validar_planilha(saida.getvalue())
+
+
+def test_ler_programacao_com_textos_fora_do_lugar():
+    # O calamine não acha o sharedStrings fora de xl/: a leitura cai no
+    # leitor em blocos, que segue as relações do pacote
+    conteudo = compartilhar_textos(planilha(), 'xl/textos/compartilhados.xml')
+    df, tempos = leitura.ler_programacao(conteudo, usar_sidecar=False)
+    comparar(df, _ler_excel(conteudo, 'openpyxl'))
+    assert tempos['origem'] == ('blocos' if 'calamine' in ENGINES else 'openpyxl')
+
+
+@pytest.mark.skipif('calamine' not in ENGINES, reason="prévia só com o calamine")
+def test_previa_so_nas_planilhas_grandes(monkeypatch):
+    conteudo = planilha()
+    recebidos = []
+    df, tempos = leitura.ler_programacao(
+        conteudo, usar_sidecar=False, ao_ler_bloco=lambda b, lidas: recebidos.append(lidas)
+    )
+    # Pequena: sem prévia, só a validação e a leitura inteira
+    assert not leitura.mostra_previa(conteudo)
+    assert recebidos == [] and 'previa' not in tempos
+
+    monkeypatch.setattr(leitura, 'TAMANHO_MIN_PREVIA', 0)
+    monkeypatch.setattr(leitura, 'LINHAS_PREVIA', 10)
+    df_previa, tempos = leitura.ler_programacao(
+        conteudo, usar_sidecar=False, ao_ler_bloco=lambda b, lidas: recebidos.append(lidas)
+    )
+    assert recebidos == [10] and 'previa' in tempos
+    comparar(df_previa, df)
+
+
+def test_limpar_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(leitura, 'PASTA_CACHE', str(tmp_path))
+    agora = time.time()
+
+    def sidecar(nome, mb, horas_sem_uso):
+        caminho = tmp_path / nome
+        caminho.write_bytes(b'x' * int(mb * 1e6))
+        os.utime(caminho, (agora - horas_sem_uso * 3600,) * 2)
+
+    versao = f"_v{leitura.VERSAO_SIDECAR}.parquet"
+    sidecar('antigo' + versao, 1, 24 * 40)          # sem uso há 40 dias
+    sidecar('a' + versao, 1, 30)
+    sidecar('b' + versao, 1, 20)
+    sidecar('c' + versao, 1, 10)
+    sidecar('em_uso' + versao, 1, 0)                # acabou de ser gravado
+    sidecar('velho_v0.parquet', 0.1, 1)             # de outra versão
+    sidecar('x_v1.parquet.123.tmp', 0.1, 2)         # gravação interrompida
+    sidecar('outro.txt', 0.1, 24 * 100)             # não é da pasta de sidecars
+
+    assert leitura.limpar_cache(max_mb=2.5, max_dias=30) == 5
+    assert sorted(os.listdir(tmp_path)) == ['c' + versao, 'em_uso' + versao, 'outro.txt']
+
+
+def test_sidecar_lido_conta_como_uso(tmp_path, monkeypatch):
+    monkeypatch.setattr(leitura, 'PASTA_CACHE', str(tmp_path))
+    conteudo = planilha()
+    df, tempos = leitura.ler_programacao(conteudo, 'chave')
+    caminho = leitura._caminho_sidecar('chave')
+    os.utime(caminho, (time.time() - 86400,) * 2)
+    lido, tempos = leitura.ler_programacao(conteudo, 'chave')
+    assert tempos['origem'] == 'sidecar'
+    assert time.time() - os.path.getmtime(caminho) < 60
+    comparar(lido, df)
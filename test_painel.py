@@ -0,0 +1,201 @@
+# =====================================================
+# TESTES: % CONCLUÍDO E STATUS VETORIZADOS
+# =====================================================
+# As versões vetorizadas de painel.py são comparadas com as funções linha a
+# linha que os apps usavam com df.apply, mantidas aqui como referência.
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import leitura
+from painel import (
+    AREA_VAZIA, CORES_POWERBI, STATUS_CATEGORIAS, calcular_percentual, carregar,
+    carregar_revisao, compactar, definir_status, derivar_colunas, figura_gantt,
+    figura_gantt_powerbi, mapa_cores, preparar_gantt, preparar_planilha, textos_gantt
+)
+
+HOJE = pd.Timestamp('2024-06-15')
+
+
+# ---------------- REFERÊNCIA (df.apply) ----------------
+def calcular_percentual_linha(row):
+    if pd.notna(row['% CONCLUÍDO_ORIGINAL']):
+        return row['% CONCLUÍDO_ORIGINAL']
+    if pd.notna(row['LT OPERAÇÃO']) and row['LT OPERAÇÃO'] > 0:
+        return (row['ATUALIZAÇÃO'] / row['LT OPERAÇÃO']) * 100
+    return 0
+
+def definir_status_linha(df, hoje):
+    def status(row):
+        if pd.isna(row['DT FIM']):
+            return "Planejado"
+        if row['DT FIM'] < hoje:
+            return "Concluído" if row['% CONCLUÍDO'] >= 100 else "Atrasado"
+        return "Em Andamento" if row['% CONCLUÍDO'] > 0 else "Planejado"
+
+    return df.apply(status, axis=1)
+
+
+# ---------------- DADOS ----------------
+def planilha_aleatoria(semente, n=2000):
+    rng = np.random.default_rng(semente)
+
+    def com_nan(valores, fracao=0.1):
+        valores = valores.astype('float64')
+        valores[rng.random(n) < fracao] = np.nan
+        return valores
+
+    lt = rng.choice([0.0, -2.0, 1.0, 5.0, 8.0, 40.0], n)
+    fim = HOJE + pd.to_timedelta(rng.integers(-30, 30, n), unit='D')
+    fim = pd.Series(fim).mask(rng.random(n) < 0.1)     # NaT
+    return pd.DataFrame({
+        'ATUALIZAÇÃO': com_nan(rng.integers(0, 60, n)),
+        'LT OPERAÇÃO': com_nan(lt),
+        '% CONCLUÍDO_ORIGINAL': com_nan(
+            rng.choice([0.0, 50.0, 99.9, 100.0, 120.0, -5.0], n), 0.6
+        ),
+        'DT FIM': fim,
+    })
+
+def casos_de_borda():
+    nan = np.nan
+    return pd.DataFrame({
+        # LT e saldo NaN, LT == 0, saldo > LT, limite de 100%
+        'ATUALIZAÇÃO':          [nan, 5.0, 5.0, 12.0, 10.0, 10.0, 3.0, nan],
+        'LT OPERAÇÃO':          [8.0, nan, 0.0, 10.0, 10.0, 10.0, 10.0, nan],
+        '% CONCLUÍDO_ORIGINAL': [nan, nan, nan, nan, nan, 100.0, 99.99, nan],
+        'DT FIM': pd.to_datetime([
+            '2024-06-01', None, '2024-06-01', '2024-06-01', '2024-06-15',
+            '2024-06-14', '2024-06-14', None,
+        ]),
+    })
+
+
+def com_percentual(df):
+    df = df.copy()
+    df['% CONCLUÍDO'] = calcular_percentual(df).clip(0, 100)
+    return df
+
+
+# ---------------- TESTES ----------------
+@pytest.mark.parametrize('semente', range(5))
+def test_percentual_igual_ao_apply(semente):
+    df = planilha_aleatoria(semente)
+    esperado = df.apply(calcular_percentual_linha, axis=1).astype('float64')
+    pd.testing.assert_series_equal(calcular_percentual(df), esperado)
+
+@pytest.mark.parametrize('semente', range(5))
+def test_status_igual_ao_apply(semente):
+    df = com_percentual(planilha_aleatoria(semente))
+    esperado = definir_status_linha(df, HOJE)
+    obtido = definir_status(df, HOJE)
+    assert list(obtido.cat.categories) == STATUS_CATEGORIAS
+    pd.testing.assert_series_equal(obtido.astype(str), esperado.astype(str))
+
+def test_casos_de_borda():
+    df = com_percentual(casos_de_borda())
+    esperado = df.apply(calcular_percentual_linha, axis=1).astype('float64')
+    pd.testing.assert_series_equal(calcular_percentual(df), esperado)
+    pd.testing.assert_series_equal(
+        definir_status(df, HOJE).astype(str),
+        definir_status_linha(df, HOJE).astype(str),
+    )
+
+    assert np.isnan(calcular_percentual(df).iloc[0])    # saldo NaN com LT
+    assert df['% CONCLUÍDO'].iloc[1:3].tolist() == [0.0, 0.0]   # LT NaN / 0
+    assert df['% CONCLUÍDO'].iloc[3] == 100.0           # saldo > LT: limita
+    assert definir_status(df, HOJE).tolist() == [
+        "Atrasado",         # % NaN não conta como concluída
+        "Planejado",        # sem DT FIM
+        "Atrasado",
+        "Concluído",
+        "Em Andamento",     # termina hoje: ainda não venceu
+        "Concluído",        # exatamente 100%
+        "Atrasado",         # 99,99% não é concluída
+        "Planejado",
+    ]
+
+
+def test_compactar_nao_arredonda_para_100():
+    # 99.999999% (lido ou calculado) não pode virar 100% no df compacto
+    df = pd.DataFrame({
+        'ATUALIZAÇÃO': [0.0, 7.9999999],
+        'LT OPERAÇÃO': [8.0, 8.0],
+        '% CONCLUÍDO_ORIGINAL': [99.999999, np.nan],
+        'DT FIM': pd.to_datetime(['2024-06-01', '2024-06-01']),
+    })
+    df = compactar(derivar_colunas(df))
+    assert (df['% CONCLUÍDO'] < 100).all()
+    assert definir_status(df, HOJE).tolist() == ["Atrasado", "Atrasado"]
+    # O recálculo das revisões parte do df já compactado
+    assert (calcular_percentual(compactar(df)) < 100).all()
+
+
+def test_mapa_cores_ignora_area_vazia():
+    # PROG. em branco chega como NaN junto com as áreas em texto
+    cores = mapa_cores(pd.array(['USINAGEM', np.nan, 'CALDEIRARIA'], dtype='str'))
+    assert cores == {'CALDEIRARIA': CORES_POWERBI[0], 'USINAGEM': CORES_POWERBI[1]}
+
+
+def bruta_com_vazios():
+    # Como sai da leitura, com PROG. e descrição em branco em algumas linhas
+    inicio = pd.to_datetime(['2024-06-10', '2024-06-12', '2024-06-14', '2024-06-16'])
+    return pd.DataFrame({
+        'OS': [1001.0, 1001.0, 1002.0, 1002.0],
+        'WK': ['WK24'] * 4,
+        'PROG.': ['USINAGEM', None, 'PINTURA', None],
+        'SUPERVISÃO': ['ANA'] * 4,
+        'CLIENTE': ['VALE'] * 4,
+        'PROGRAMAÇÃO | PROG. DETALHADA': ['Tornear eixo', 'Soldar base', None, 'Pintar'],
+        'DT INICIO': inicio,
+        'DT FIM': inicio + pd.Timedelta(days=3),
+        'DATA CONTRATUAL': inicio + pd.Timedelta(days=30),
+        'ATUALIZAÇÃO': [1.0, 2.0, 0.0, 5.0],
+        'LT OPERAÇÃO': [4.0, 4.0, 8.0, 5.0],
+        '% CONCLUÍDO': [np.nan] * 4,
+    })
+
+def planilha_com_vazios():
+    df = compactar(derivar_colunas(preparar_planilha(bruta_com_vazios())))
+    return df.assign(STATUS=definir_status(df, HOJE))
+
+def test_textos_gantt_sem_nan():
+    textos = textos_gantt(planilha_com_vazios())
+    assert not textos.isna().any().any()
+    assert textos['AREA GANTT'].tolist() == ['USINAGEM', AREA_VAZIA, 'PINTURA', AREA_VAZIA]
+
+@pytest.mark.parametrize('agrupar_por_os', [False, True])
+def test_gantt_com_area_vazia(agrupar_por_os):
+    df = planilha_com_vazios()
+    df_gantt, rotulos = preparar_gantt(df, agrupar_por_os)
+    assert not pd.isna(rotulos).any()
+    cores = mapa_cores(df_gantt['PROG.'].unique())
+    assert AREA_VAZIA in cores
+    figura_gantt(df_gantt, rotulos, cores, True, HOJE)
+
+    fig, _ = figura_gantt_powerbi(df, agrupar_por_os, True, HOJE, 21)
+    assert len(fig.data)
+
+
+def xlsx(df):
+    saida = io.BytesIO()
+    df.to_excel(saida, sheet_name=leitura.ABA, startrow=leitura.LINHA_CABECALHO, index=False)
+    return saida.getvalue()
+
+def test_revisao_igual_a_carga_completa(tmp_path, monkeypatch):
+    monkeypatch.setattr(leitura, 'PASTA_CACHE', str(tmp_path))
+    anterior = bruta_com_vazios()
+    atual = anterior.copy()
+    atual.loc[0, 'ATUALIZAÇÃO'] = 4.0                  # alterada
+    atual = atual.drop(index=3)                         # removida
+    atual.loc[9] = atual.loc[1].copy()                  # inserida
+    atual.loc[9, 'PROGRAMAÇÃO | PROG. DETALHADA'] = 'Nova atividade'
+
+    df_anterior, _ = carregar(xlsx(anterior))
+    df, tempos, tabela = carregar_revisao(xlsx(atual), 'revisao', df_anterior)
+    pd.testing.assert_frame_equal(df, carregar(xlsx(atual), 'completa')[0])
+    assert 'comparacao' in tempos
+    assert sorted(tabela['MUDANÇA']) == ['Alterada', 'Inserida', 'Removida']
+    assert df['% CONCLUÍDO'].iloc[0] == 100.0
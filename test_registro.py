@@ -0,0 +1,125 @@
+# =====================================================
+# TESTES: REGISTRO DE PLANILHAS
+# =====================================================
+# Contagem de reservas, saída das planilhas sem reserva (LRU), carga única
+# com várias sessões ao mesmo tempo e os derivados de cada planilha.
+import gc
+import threading
+import time
+
+import pandas as pd
+
+from registro import RegistroDatasets
+
+
+def carga(nome, contagem=None):
+    def carregar():
+        if contagem is not None:
+            contagem.append(nome)
+        return pd.DataFrame({'OS': [1.0, 2.0]}), {'origem': nome}
+    return carregar
+
+
+def test_reservas_seguram_a_planilha():
+    registro = RegistroDatasets(max_entradas=1)
+    a1 = registro.obter('a', carga('a'))
+    a2 = registro.obter('a', carga('a'))
+    assert a1.conjunto is a2.conjunto
+    assert registro.resumo()['reservas'] == 2
+
+    # Acima do limite, mas 'a' ainda tem reserva: fica
+    b = registro.obter('b', carga('b'))
+    assert 'a' in registro and 'b' in registro
+
+    del a1
+    gc.collect()
+    assert registro.resumo()['reservas'] == 2
+    assert 'a' in registro
+    del a2
+    gc.collect()
+    # Sem reservas, 'a' sai na hora (o registro estava acima do limite)
+    assert 'a' not in registro and 'b' in registro
+    resumo = registro.resumo()
+    assert (resumo['planilhas'], resumo['reservas']) == (1, 1)
+    assert b.tempos == {'origem': 'b'}
+
+
+def test_sai_a_usada_ha_mais_tempo():
+    registro = RegistroDatasets(max_entradas=2)
+    for chave in 'abc':
+        registro.obter(chave, carga(chave))
+    assert 'a' not in registro and len(registro) == 2
+
+    # Usar 'b' de novo a torna a mais recente: sai 'c'
+    registro.obter('b', carga('b'))
+    registro.obter('d', carga('d'))
+    assert 'b' in registro and 'd' in registro and 'c' not in registro
+
+
+def test_carga_unica_com_varias_sessoes():
+    registro = RegistroDatasets()
+    cargas = []
+    reservas = []
+
+    def carregar_devagar():
+        time.sleep(0.05)
+        return carga('a', cargas)()
+
+    threads = [
+        threading.Thread(target=lambda: reservas.append(registro.obter('a', carregar_devagar)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cargas == ['a']
+    assert len({id(r.conjunto) for r in reservas}) == 1
+    assert registro.resumo()['reservas'] == 8
+    # Nenhuma trava de carga fica para trás
+    assert registro._carregando == {}
+
+
+def test_derivado_calculado_uma_vez_e_trocado_na_versao_nova():
+    reserva = RegistroDatasets().obter('a', carga('a'))
+    calculos = []
+
+    def calcular(valor):
+        def calc():
+            calculos.append(valor)
+            return valor
+        return calc
+
+    assert reserva.derivado('hist', calcular(1), '2024-06-14') == 1
+    assert reserva.derivado('hist', calcular(2), '2024-06-14') == 1
+    assert reserva.derivado('hist', calcular(3), '2024-06-15') == 3
+    assert calculos == [1, 3]
+    # Só a versão nova fica guardada
+    assert reserva.conjunto._derivados['hist'] == ('2024-06-15', 3)
+
+
+def test_derivado_nao_trava_os_outros():
+    # Um cálculo demorado de um derivado não segura os outros nomes, e duas
+    # sessões pedindo o mesmo nome ainda esperam um único cálculo
+    reserva = RegistroDatasets().obter('a', carga('a'))
+    liberar = threading.Event()
+    calculos = []
+
+    def demorado():
+        calculos.append('lento')
+        assert liberar.wait(5)
+        return 'lento'
+
+    threads = [
+        threading.Thread(target=reserva.derivado, args=('lento', demorado))
+        for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    assert reserva.derivado('rapido', lambda: 'rapido') == 'rapido'
+    liberar.set()
+    for t in threads:
+        t.join()
+    assert calculos == ['lento']
+    assert reserva.derivado('lento', demorado) == 'lento'
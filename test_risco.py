@@ -0,0 +1,90 @@
+# =====================================================
+# TESTES: RISCO DE PRAZO CONTRATUAL
+# =====================================================
+# Fim projetado de cada atividade (concluída, futura, atrasada, sem LT ou
+# % preenchido) e a classificação das OS pela menor folga, nos limites da
+# margem e com datas contratuais vazias.
+import numpy as np
+import pandas as pd
+import pytest
+
+from risco import RISCOS, avaliar_risco, projetar_fim
+
+HOJE = pd.Timestamp('2024-06-10')
+
+
+def atividades():
+    d = pd.Timestamp
+    return pd.DataFrame({
+        'OS': [1.0, 1.0, 2.0, 3.0, 3.0, 4.0, 5.0],
+        'CLIENTE': ['VALE', 'VALE', 'CSN', 'GERDAU', 'GERDAU', 'VALE', 'CSN'],
+        'DT INICIO': [d('2024-06-01'), d('2024-06-01'), d('2024-06-20'), d('2024-06-10'),
+                      d('2024-06-11'), d('2024-06-03'), d('2024-06-01')],
+        'DT FIM': [d('2024-06-05'), d('2024-06-12'), d('2024-06-25'), d('2024-06-10'),
+                   d('2024-06-11'), d('2024-06-08'), d('2024-06-20')],
+        'DATA CONTRATUAL': [d('2024-06-30'), d('2024-06-15'), d('2024-06-30'), d('2024-08-01'),
+                            pd.NaT, pd.NaT, d('2024-06-27')],
+        'LT OPERAÇÃO': [40.0, 80.0, 16.0, 9.0, 8.0, np.nan, 8.0],
+        '% CONCLUÍDO': [100.0, 0.0, 50.0, 0.0, 0.0, np.nan, 120.0],
+    })
+
+
+def test_fim_projetado():
+    fim = projetar_fim(atividades(), HOJE)
+    assert fim.dt.strftime('%Y-%m-%d').tolist() == [
+        '2024-06-05',   # concluída: o DT FIM
+        '2024-06-20',   # atrasada: hoje + 10 dias de trabalho, depois do DT FIM
+        '2024-06-25',   # futura: início + 1 dia, mas não antes do DT FIM
+        '2024-06-12',   # 9 h com 8 h por dia: 2 dias
+        '2024-06-12',   # começa amanhã: 1 dia depois do início
+        '2024-06-10',   # sem LT nem %: não termina antes de hoje
+        '2024-06-20',   # % acima de 100 conta como concluída
+    ]
+    # Mais horas por dia, menos dias de trabalho
+    assert projetar_fim(atividades(), HOJE, horas_por_dia=16).iloc[1] == pd.Timestamp('2024-06-15')
+
+
+@pytest.mark.parametrize('categoria', [False, True])
+def test_risco_por_os(categoria):
+    df = atividades()
+    if categoria:
+        # Como fica depois do compactar: OS e CLIENTE como categorias, com
+        # uma OS sem atividades no recorte
+        df['OS'] = pd.Categorical(df['OS'], categories=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        df['CLIENTE'] = df['CLIENTE'].astype('category')
+    por_os, linhas = avaliar_risco(df, HOJE)
+
+    assert por_os['OS'].astype(float).tolist() == [1.0, 2.0, 5.0, 3.0, 4.0]
+    assert por_os['FOLGA (DIAS)'].tolist() == [-5, 5, 7, 50, pd.NA]
+    assert por_os['RISCO'].tolist() == [
+        "Atrasará", "Em risco", "Em risco", "No prazo", "Sem data contratual"
+    ]
+    assert list(por_os['RISCO'].cat.categories) == RISCOS
+    assert por_os['ATIVIDADES'].tolist() == [2, 1, 1, 2, 1]
+    assert por_os['ATIVIDADES CRÍTICAS'].tolist() == [1, 0, 0, 0, 0]
+    primeira = por_os.iloc[0]
+    assert primeira['CLIENTE'] == 'VALE'
+    assert primeira['DATA CONTRATUAL'] == pd.Timestamp('2024-06-15')
+    assert primeira['FIM PROJETADO'] == pd.Timestamp('2024-06-20')
+
+    # Por atividade, alinhado ao df: só a que passa da data contratual é causa
+    assert linhas.index.equals(df.index)
+    assert linhas['CAUSA ATRASO'].tolist() == [False, True, False, False, False, False, False]
+    assert linhas['FOLGA (DIAS)'].iloc[0] == 25
+    assert np.isnan(linhas['FOLGA (DIAS)'].iloc[4])
+
+
+def test_margem():
+    por_os, _ = avaliar_risco(atividades(), HOJE, margem_dias=4)
+    risco = dict(zip(por_os['OS'], por_os['RISCO']))
+    assert risco[2.0] == "No prazo" and risco[5.0] == "No prazo"
+    assert risco[1.0] == "Atrasará"
+
+
+def test_recorte_vazio():
+    por_os, linhas = avaliar_risco(atividades().iloc[:0], HOJE)
+    assert por_os.empty and linhas.empty
+    assert list(por_os.columns) == [
+        'OS', 'CLIENTE', 'DATA CONTRATUAL', 'FIM PROJETADO', 'FOLGA (DIAS)',
+        'ATIVIDADES', 'ATIVIDADES CRÍTICAS', 'RISCO'
+    ]